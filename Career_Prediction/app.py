@@ -1,11 +1,10 @@
 import streamlit as st
-import random
-import pandas as pd
-import joblib          
-import numpy as np      
-from datetime import datetime
-import plotly.graph_objects as go
-import plotly.express as px
+import metrics
+from quiz_bank import new_quiz_state, quiz_questions, score_quiz
+
+# numpy, plotly dan modul model di-import di dalam fungsi yang memakainya (halaman hasil),
+# sehingga halaman home dan quiz tidak membayar biaya import library berat.
+# Dicek oleh tests/test_import_time.py (profil lengkap: python check_import_time.py)
 
 # Initialize session state
 if 'page' not in st.session_state:
@@ -18,57 +17,64 @@ if 'user_name' not in st.session_state:
 def back_home():
     st.session_state.page = 'home'
 
-def calculate_score(answers, selected_questions=None, scoring_type='percentage'):
-    """Calculate quiz score based on answers"""
-    if not answers or not selected_questions:
-        return 0
-    
-    if scoring_type == 'percentage_correct': # New scoring type for quizzes with explicit correct answers
-        correct_answers_count = 0
-        for i, answer_index in enumerate(answers):
-            if 'correct' in selected_questions[i] and answer_index == selected_questions[i]['correct']:
-                correct_answers_count += 1
-        return (correct_answers_count / len(selected_questions)) * 100
-    
-    elif scoring_type == 'weighted':
-        # Weight answers based on quality (first option = 100%, second = 50%, third = 25%)
-        # This assumes the first option is always the "best" for SJT/Soft Skills
-        total_score = 0
-        for answer_index in answers:
-            if answer_index == 0:  # First option
-                total_score += 100
-            elif answer_index == 1:  # Second option
-                total_score += 50
-            elif answer_index == 2:  # Third option
-                total_score += 25
-        return total_score / len(answers)
-    else:
-        return 0 # Default to 0 if scoring_type is not recognized
-
 def predict_career(sjt_score, personality_score, tech_score, soft_score):
     """Predict career using KNN model"""
+    import numpy as np
+    import knn_engine
+    from model_loader import load_model_bundle, load_knn_artifact, load_prediction_table
+    from prediction_table import lookup
+
     try:
-        # Load model artifacts
-        knn = joblib.load("knn_model.joblib")
-        le = joblib.load("label_encoder.joblib")
-        scaler = joblib.load("scaler.joblib")
-        
         # Prepare features (sesuaikan urutan dengan training data)
         # Ensure the order of features matches the training data: tech_score, soft_score, sjt_score, personality_score
         features = np.array([[tech_score, soft_score, sjt_score, personality_score]])
-        features_scaled = scaler.transform(features)
+        
+        # Artifact gabungan (mmap) + engine NumPy, tanpa memuat sklearn
+        try:
+            with metrics.timer("career_model_stage_seconds", stage="load", backend="engine"):
+                artifact = load_knn_artifact()
+        except FileNotFoundError:
+            artifact = None # Model dari training lama belum punya knn_model.bin
+        if artifact is not None:
+            # Skor quiz hanya punya sedikit nilai yang mungkin: cukup lookup tabel prediksi
+            with metrics.timer("career_model_stage_seconds", stage="load", backend="table"):
+                table = load_prediction_table()
+            with metrics.timer("career_model_stage_seconds", stage="lookup", backend="table"):
+                career = lookup(table, tech_score, soft_score, sjt_score, personality_score)
+            if career is not None:
+                metrics.inc("career_predictions_total", path="table")
+                return career
+            with metrics.timer("career_model_stage_seconds", stage="scale", backend="engine"):
+                features_scaled = knn_engine.transform(artifact, features)
+            with metrics.timer("career_model_stage_seconds", stage="neighbors", backend="engine"):
+                proba = knn_engine.predict_proba_scaled(artifact, features_scaled)
+            with metrics.timer("career_model_stage_seconds", stage="decode", backend="engine"):
+                career = artifact.classes[np.argmax(proba, axis=1)][0]
+            metrics.inc("career_predictions_total", path="engine")
+            return career
+        
+        # Load model artifacts (di-cache sekali per proses, dimuat ulang jika file berubah)
+        with metrics.timer("career_model_stage_seconds", stage="load", backend="sklearn"):
+            knn, le, scaler, _ = load_model_bundle()
+        with metrics.timer("career_model_stage_seconds", stage="scale", backend="sklearn"):
+            features_scaled = scaler.transform(features)
         
         # Predict using KNN
-        prediction = knn.predict(features_scaled)
-        career = le.inverse_transform(prediction)[0]
+        with metrics.timer("career_model_stage_seconds", stage="neighbors", backend="sklearn"):
+            prediction = knn.predict(features_scaled)
+        with metrics.timer("career_model_stage_seconds", stage="decode", backend="sklearn"):
+            career = le.inverse_transform(prediction)[0]
+        metrics.inc("career_predictions_total", path="sklearn")
         
         return career
         
     except FileNotFoundError:
         # Fallback to original rule-based prediction if model files not found
+        metrics.inc("career_prediction_fallbacks_total", reason="model_not_found")
         st.warning("Model KNN tidak ditemukan, menggunakan prediksi berbasis aturan")
         return predict_career_fallback(sjt_score, personality_score, tech_score, soft_score)
     except Exception as e:
+        metrics.inc("career_prediction_fallbacks_total", reason=type(e).__name__)
         st.error(f"Error dalam prediksi KNN: {str(e)}")
         return predict_career_fallback(sjt_score, personality_score, tech_score, soft_score)
 
@@ -101,14 +107,50 @@ def predict_career_fallback(sjt_score, personality_score, tech_score, soft_score
 
 def show_model_evaluation():
     """Display model evaluation metrics"""
+    from view_cache import load_evaluation
+
     try:
-        with open("models/model_evaluation_detailed.txt", "r") as f: # <--- Baris yang sudah diperbaiki
-            metrics = f.read()
-        st.text(metrics)
+        evaluation = load_evaluation() # Di-cache per mtime file, tidak dibaca ulang setiap klik
     except FileNotFoundError:
         st.info("File evaluasi model tidak ditemukan. Pastikan train_knn_model.py sudah dijalankan.") # Pesan lebih informatif
+        return
     except Exception as e:
         st.error(f"Error saat menampilkan evaluasi model: {str(e)}")
+        return
+
+    if "accuracy" not in evaluation:
+        st.text(evaluation["text"]) # Model lama: hanya ada evaluasi teks
+        return
+
+    st.metric("Akurasi", f"{evaluation['accuracy']*100:.2f}%")
+    st.caption(f"Versi model {evaluation['model_version']} · k={evaluation['params']['n_neighbors']} "
+               f"({evaluation['params']['weights']}) · {evaluation['params']['n_train']} baris training, "
+               f"{evaluation['params']['n_test']} baris test")
+    st.markdown("**Metrik per Karir**")
+    per_class = evaluation["per_class"]
+    st.dataframe({
+        "Karir": list(per_class),
+        "Precision": [m["precision"] for m in per_class.values()],
+        "Recall": [m["recall"] for m in per_class.values()],
+        "F1": [m["f1"] for m in per_class.values()],
+        "Support": [m["support"] for m in per_class.values()],
+    }, hide_index=True)
+    st.markdown("**Confusion Matrix** (baris = karir sebenarnya, kolom = prediksi)")
+    st.dataframe({"Karir": evaluation["classes"],
+                  **{career: column for career, column in zip(evaluation["classes"], zip(*evaluation["confusion_matrix"]))}},
+                 hide_index=True)
+    if evaluation.get("quantization"):
+        quantization = evaluation["quantization"]
+        st.caption(f"Metrik di atas dari artifact terkuantisasi {quantization['dtype']} yang dipakai untuk prediksi; "
+                   f"model float: akurasi {quantization['accuracy_float']*100:.2f}%, "
+                   f"prediksi sama {quantization['agreement']*100:.2f}%")
+    if evaluation.get("reduction"):
+        reduction = evaluation["reduction"]
+        st.caption(f"Reduksi prototipe {reduction['method']}: {reduction['n_before']} -> {reduction['n_after']} baris referensi")
+    if evaluation.get("ensemble"):
+        ensemble = evaluation["ensemble"]
+        st.caption(f"Ensemble bagging {ensemble['n_estimators']} anggota KNN ({ensemble['max_features']} fitur per anggota): "
+                   f"akurasi out-of-bag {ensemble['oob_accuracy']*100:.2f}%")
 
 def get_career_recommendations(predicted_career, scores):
     """Get personalized career recommendations"""
@@ -193,28 +235,10 @@ def display_results():
     # Radar chart for visualization
     st.markdown("## Profil Kompetensi")
     
-    categories = ['SJT', 'Personality', 'Technical', 'Soft Skills']
-    values = [sjt_score, personality_score, tech_score, soft_score]
-    
-    fig = go.Figure()
-    fig.add_trace(go.Scatterpolar(
-        r=values,
-        theta=categories,
-        fill='toself',
-        name='Your Profile',
-        line=dict(color='#667eea')
-    ))
-    
-    fig.update_layout(
-        polar=dict(
-            radialaxis=dict(
-                visible=True,
-                range=[0, 100]
-            )),
-        showlegend=True,
-        title="Profil Kompetensi Anda",
-        height=400
-    )
+    from view_cache import radar_figure
+
+    # Figure di-cache per kombinasi skor (dibulatkan 1 desimal), tidak dibangun ulang setiap rerun
+    fig = radar_figure(sjt_score, personality_score, tech_score, soft_score)
     
     st.plotly_chart(fig, use_container_width=True)
     
@@ -222,6 +246,7 @@ def display_results():
     st.markdown("## Prediksi Karir")
     
     # Check if all quizzes are completed before attempting prediction
+    predicted_career = None
     if 'sjt' in results and 'personality' in results and 'tech' in results and 'soft' in results:
         predicted_career = predict_career(sjt_score, personality_score, tech_score, soft_score)
         
@@ -282,6 +307,14 @@ def display_results():
         st.info("Silakan selesaikan semua quiz (SJT, Personality, Technical, Soft Skills) untuk melihat prediksi karir Anda.")
     
     if st.button("Simpan Hasil"):
+        from model_loader import model_version
+        from result_store import get_result_store
+        try:
+            version = model_version() if predicted_career is not None else None
+        except FileNotFoundError:
+            version = None # Prediksi berasal dari fallback berbasis aturan
+        # Ditulis oleh thread background secara batch, tombol tidak menunggu disk
+        get_result_store().save(st.session_state.user_name, results, predicted_career, version)
         st.success("Hasil telah disimpan!")
         
     if st.button("Kembali ke Home"):
@@ -389,246 +422,167 @@ def home_page():
             st.session_state.page = 'soft'
             st.rerun()
 
-# Quiz data
-sjt_questions = [
-    {"q": "Atasan meminta kamu lembur padahal kamu memiliki rencana pribadi, apa yang kamu lakukan?", "options": ["Diskusi dan negosiasi", "Menolak", "Langsung lembur"]},
-    {"q": "Rekan kerja sering terlambat mengirim data yang kamu butuhkan, tindakanmu?", "options": ["Mengingatkan baik-baik", "Membiarkan saja", "Melapor atasan"]},
-    {"q": "Kamu melihat kesalahan prosedur yang dilakukan tim, tindakanmu?", "options": ["Memberi masukan", "Diam saja", "Mengikuti kesalahan"]},
-    {"q": "Saat meeting, ide kamu ditolak tim, apa sikapmu?", "options": ["Menerima dan diskusi", "Kesal", "Diam saja"]},
-    {"q": "Kamu mendapat tugas di luar jobdesc, apa yang kamu lakukan?", "options": ["Mengerjakan sambil diskusi", "Menolak", "Meninggalkan"]},
-    {"q": "Klien meminta revisi mendadak, apa yang kamu lakukan?", "options": ["Prioritaskan revisi", "Menunda", "Menolak"]},
-    {"q": "Rekan kerja meminta bantuan saat kamu sibuk, apa tindakanmu?", "options": ["Bantu jika bisa", "Menolak", "Menghindar"]},
-    {"q": "Atasan marah padamu karena kesalahan tim, tindakanmu?", "options": ["Menjelaskan", "Diam", "Menyalahkan tim"]},
-    {"q": "Kamu melihat rekan kerja melanggar aturan kantor, apa tindakanmu?", "options": ["Menegur baik-baik", "Membiarkan", "Melaporkan"]},
-    {"q": "Kamu ditugaskan project baru mendadak, apa yang kamu lakukan?", "options": ["Mengatur prioritas", "Menolak", "Mengeluh"]},
-]
-
-personality_questions = [
-    {"q": "Saya merasa senang bekerja dengan banyak orang.", "correct": 0}, 
-    {"q": "Saya suka membuat rencana kerja sebelum memulai tugas.", "correct": 0}, 
-    {"q": "Saya lebih suka pekerjaan yang stabil daripada yang penuh risiko.", "correct": 1}, 
-    {"q": "Saya senang belajar hal baru untuk pengembangan diri.", "correct": 0}, 
-    {"q": "Saya merasa nyaman ketika berbicara di depan banyak orang.", "correct": 0}, 
-    {"q": "Saya senang memimpin kelompok atau tim.", "correct": 0}, 
-    {"q": "Saya biasanya menyelesaikan pekerjaan tepat waktu.", "correct": 0}, 
-    {"q": "Saya merasa nyaman bekerja dalam kondisi tekanan.", "correct": 0}, 
-    {"q": "Saya suka menyelesaikan masalah yang kompleks.", "correct": 0}, 
-    {"q": "Saya suka bekerja dengan detail dan ketelitian tinggi.", "correct": 0}, 
-]
-
-tech_questions = [
-    {"q": "Apa itu Python?", "options": ["Bahasa Pemrograman", "Framework", "Database"], "correct": 0},
-    {"q": "Manakah yang termasuk database?", "options": ["MySQL", "Photoshop", "Premiere"], "correct": 0},
-    {"q": "Apa itu Git?", "options": ["Version Control", "Editor", "Bahasa Pemrograman"], "correct": 0},
-    {"q": "HTML digunakan untuk?", "options": ["Membuat tampilan web", "Database", "Analisis data"], "correct": 0},
-    {"q": "CSS digunakan untuk?", "options": ["Mengatur tampilan web", "Server", "Keamanan"], "correct": 0},
-    {"q": "JavaScript digunakan untuk?", "options": ["Interaktif website", "Mengatur server", "Membuat database"], "correct": 0},
-    {"q": "Framework untuk Machine Learning?", "options": ["TensorFlow", "Laravel", "Vue"], "correct": 0},
-    {"q": "Apa itu API?", "options": ["Interface komunikasi aplikasi", "Bahasa pemrograman", "Framework"], "correct": 0},
-    {"q": "Contoh NoSQL Database?", "options": ["MongoDB", "MySQL", "Oracle"], "correct": 0},
-    {"q": "IDE adalah?", "options": ["Lingkungan pengembangan", "Bahasa pemrograman", "Framework"], "correct": 0},
-    {"q": "Bahasa pemrograman untuk Data Science?", "options": ["Python", "HTML", "CSS"], "correct": 0},
-    {"q": "Untuk desain antarmuka biasa digunakan?", "options": ["Figma", "SQL", "TensorFlow"], "correct": 0},
-    {"q": "Untuk analisis data besar digunakan?", "options": ["Python", "Photoshop", "CorelDraw"], "correct": 0},
-    {"q": "Framework backend populer?", "options": ["Django", "Vue", "React"], "correct": 0},
-    {"q": "Manakah yang bukan bahasa pemrograman?", "options": ["Photoshop", "Python", "Java"], "correct": 0},
-    {"q": "Untuk pengolahan data digunakan?", "options": ["Pandas", "HTML", "CSS"], "correct": 0},
-    {"q": "Firebase digunakan untuk?", "options": ["Backend dan database", "Editor gambar", "Framework CSS"], "correct": 0},
-    {"q": "Untuk testing code digunakan?", "options": ["PyTest", "Premiere", "Figma"], "correct": 0},
-    {"q": "Bahasa untuk pengembangan Android?", "options": ["Kotlin", "HTML", "CSS"], "correct": 0},
-    {"q": "Untuk membuat REST API digunakan?", "options": ["Flask/Django", "HTML", "CSS"], "correct": 0},
-]
-
-soft_questions = [
-    {"q": "Bagaimana kamu menangani kritik?", "options": ["Menerima", "Menolak", "Menghindar"]},
-    {"q": "Bagaimana kamu menyelesaikan konflik tim?", "options": ["Diskusi solusi", "Menghindar", "Diam saja"]},
-    {"q": "Apa sikapmu terhadap deadline?", "options": ["Tepat waktu", "Menunda", "Menghindar"]},
-    {"q": "Bagaimana kamu beradaptasi dengan perubahan?", "options": ["Fleksibel", "Menolak", "Sulit beradaptasi"]},
-    {"q": "Bagaimana kamu mengatur waktu?", "options": ["Prioritas", "Menunda", "Acak"]},
-    {"q": "Bagaimana kamu mengatasi tekanan kerja?", "options": ["Tetap tenang", "Panik", "Mengeluh"]},
-    {"q": "Bagaimana kamu bekerja dalam tim?", "options": ["Kolaboratif", "Individu", "Menolak"]},
-    {"q": "Bagaimana kamu meningkatkan diri?", "options": ["Belajar hal baru", "Diam saja", "Menunda"]},
-    {"q": "Bagaimana kamu mengambil keputusan sulit?", "options": ["Analisis terlebih dahulu", "Asal memutuskan", "Menunda"]},
-    {"q": "Bagaimana kamu menghadapi kritik negatif?", "options": ["Evaluasi dan perbaikan", "Kesal", "Menolak"]},
-    {"q": "Bagaimana cara kamu memberi masukan pada teman kerja?", "options": ["Sopan dan jelas", "Menyindir", "Diam"]},
-    {"q": "Bagaimana kamu berkomunikasi dalam tim?", "options": ["Terbuka dan efektif", "Tertutup", "Pasif"]},
-    {"q": "Bagaimana kamu menyelesaikan masalah kompleks?", "options": ["Analisis dan diskusi", "Menghindar", "Menunda"]},
-    {"q": "Bagaimana kamu memimpin tim?", "options": ["Memberi contoh baik", "Memaksa", "Diam"]},
-    {"q": "Bagaimana kamu belajar hal baru?", "options": ["Inisiatif", "Menunda", "Menghindar"]},
-    {"q": "Bagaimana kamu menjaga hubungan dengan rekan kerja?", "options": ["Komunikasi baik", "Menjauh", "Pasif"]},
-    {"q": "Bagaimana kamu menangani tugas mendadak?", "options": ["Prioritaskan", "Mengeluh", "Menunda"]},
-    {"q": "Bagaimana kamu mengevaluasi diri?", "options": ["Refleksi rutin", "Mengabaikan", "Menunda"]},
-    {"q": "Bagaimana kamu memberi kritik membangun?", "options": ["Sopan dan jelas", "Menyindir", "Diam"]},
-    {"q": "Bagaimana kamu menghadapi ketidakpastian?", "options": ["Fleksibel dan siap", "Menolak", "Mengeluh"]},
-]
-
 # Main application logic
-if st.session_state.page == 'home':
-    home_page()
+# Durasi setiap rerun dicatat per halaman (no-op jika metrics tidak aktif)
+with metrics.timer("career_page_render_seconds", page=st.session_state.page):
+    if st.session_state.page == 'home':
+        home_page()
 
-elif st.session_state.page == 'results':
-    display_results()
+    elif st.session_state.page == 'results':
+        display_results()
 
-elif st.session_state.page == 'sjt':
-    st.markdown("""
-    <div style='text-align: center; padding: 15px; background: #e9f5ff; border-radius: 8px; margin-bottom: 20px;'>
-        <h2 style='color: #495057; margin: 0;'>Situational Judgment Test (SJT)</h2>
-        <p style='color: #6c757d; margin: 5px 0 0 0;'>Simulasi situasi nyata di tempat kerja</p>
-    </div>
-    """, unsafe_allow_html=True)
-    
-    if 'sjt_selected_questions' not in st.session_state:
-        st.session_state.sjt_selected_questions = random.sample(sjt_questions, 5)
-    
-    answers = []
-    for idx, q in enumerate(st.session_state.sjt_selected_questions):
-        st.markdown(f"**{idx+1}. {q['q']}**")
-        answer = st.radio("Pilih jawaban:", q['options'], key=f"sjt_{idx}", index=None)
-        if answer is not None:
-            answers.append(q['options'].index(answer))
-        st.markdown("---")
-    
-    col1, col2 = st.columns(2)
-    with col1:
-        if st.button("Kembali ke Home", use_container_width=True):
-            st.session_state.page = 'home'
-            st.rerun()
-    
-    with col2:
-        if st.button("Selesai & Simpan Hasil", use_container_width=True):
-            if len(answers) == len(st.session_state.sjt_selected_questions):
-                score = calculate_score(answers, st.session_state.sjt_selected_questions, scoring_type='weighted')
+    elif st.session_state.page == 'sjt':
+        st.markdown("""
+        <div style='text-align: center; padding: 15px; background: #e9f5ff; border-radius: 8px; margin-bottom: 20px;'>
+            <h2 style='color: #495057; margin: 0;'>Situational Judgment Test (SJT)</h2>
+            <p style='color: #6c757d; margin: 5px 0 0 0;'>Simulasi situasi nyata di tempat kerja</p>
+        </div>
+        """, unsafe_allow_html=True)
+        
+        # Session state hanya menyimpan id soal dan urutan opsi (bytes); teks soal diambil dari bank bersama
+        if 'sjt_quiz_state' not in st.session_state:
+            st.session_state.sjt_quiz_state = new_quiz_state('sjt')
+        questions = quiz_questions('sjt', st.session_state.sjt_quiz_state)
+        
+        answers = []
+        # Form: pilihan radio tidak memicu rerun, jawaban dikirim sekali saat submit
+        with st.form("sjt_form"):
+            for idx, (question, options) in enumerate(questions):
+                st.markdown(f"**{idx+1}. {question}**")
+                answer = st.radio("Pilih jawaban:", options, key=f"sjt_{idx}", index=None)
+                if answer is not None:
+                    answers.append(options.index(answer))
+                st.markdown("---")
+            submitted = st.form_submit_button("Selesai & Simpan Hasil", use_container_width=True)
+        
+        if submitted:
+            if len(answers) == len(questions):
+                score = score_quiz('sjt', st.session_state.sjt_quiz_state, answers)
                 st.session_state.quiz_results['sjt'] = score
                 st.success(f"SJT selesai! Skor Anda: {score:.1f}%")
-                del st.session_state.sjt_selected_questions 
+                del st.session_state.sjt_quiz_state
                 st.session_state.page = 'results'
                 st.rerun()
             else:
                 st.error("Harap jawab semua pertanyaan!")
-
-elif st.session_state.page == 'personality':
-    st.markdown("""
-    <div style='text-align: center; padding: 15px; background: #e9f5ff; border-radius: 8px; margin-bottom: 20px;'>
-        <h2 style='color: #495057; margin: 0;'>Personality Test</h2>
-        <p style='color: #6c757d; margin: 5px 0 0 0;'>Penilaian karakteristik kepribadian</p>
-    </div>
-    """, unsafe_allow_html=True)
-    
-    if 'personality_selected_questions' not in st.session_state:
-        st.session_state.personality_selected_questions = random.sample(personality_questions, 5)
-    
-    answers = []
-    for idx, q in enumerate(st.session_state.personality_selected_questions):
-        st.markdown(f"**{idx+1}. {q['q']}**")
-        answer_options = ["Setuju", "Tidak Setuju"]
-        answer = st.radio("Pilih jawaban:", answer_options, key=f"pers_{idx}", index=None)
-        if answer is not None:
-            answers.append(answer_options.index(answer))
-        st.markdown("---")
-    
-    col1, col2 = st.columns(2)
-    with col1:
+        
         if st.button("Kembali ke Home", use_container_width=True):
             st.session_state.page = 'home'
             st.rerun()
-    with col2:
-        if st.button("Selesai & Simpan Hasil", use_container_width=True):
-            if len(answers) == len(st.session_state.personality_selected_questions):
-                score = calculate_score(answers, st.session_state.personality_selected_questions, scoring_type='percentage_correct')
+
+    elif st.session_state.page == 'personality':
+        st.markdown("""
+        <div style='text-align: center; padding: 15px; background: #e9f5ff; border-radius: 8px; margin-bottom: 20px;'>
+            <h2 style='color: #495057; margin: 0;'>Personality Test</h2>
+            <p style='color: #6c757d; margin: 5px 0 0 0;'>Penilaian karakteristik kepribadian</p>
+        </div>
+        """, unsafe_allow_html=True)
+        
+        # Session state hanya menyimpan id soal dan urutan opsi (bytes); teks soal diambil dari bank bersama
+        if 'personality_quiz_state' not in st.session_state:
+            st.session_state.personality_quiz_state = new_quiz_state('personality')
+        questions = quiz_questions('personality', st.session_state.personality_quiz_state)
+        
+        answers = []
+        # Form: pilihan radio tidak memicu rerun, jawaban dikirim sekali saat submit
+        with st.form("personality_form"):
+            for idx, (question, options) in enumerate(questions):
+                st.markdown(f"**{idx+1}. {question}**")
+                answer = st.radio("Pilih jawaban:", options, key=f"pers_{idx}", index=None)
+                if answer is not None:
+                    answers.append(options.index(answer))
+                st.markdown("---")
+            submitted = st.form_submit_button("Selesai & Simpan Hasil", use_container_width=True)
+        
+        if submitted:
+            if len(answers) == len(questions):
+                score = score_quiz('personality', st.session_state.personality_quiz_state, answers)
                 st.session_state.quiz_results['personality'] = score
                 st.success(f"Personality Test selesai! Skor Anda: {score:.1f}%")
-                del st.session_state.personality_selected_questions
+                del st.session_state.personality_quiz_state
                 st.session_state.page = 'results'
                 st.rerun()
             else:
                 st.error("Harap jawab semua pertanyaan!")
-
-elif st.session_state.page == 'tech':
-    st.markdown("""
-    <div style='text-align: center; padding: 15px; background: #e9f5ff; border-radius: 8px; margin-bottom: 20px;'>
-        <h2 style='color: #495057; margin: 0;'>Technical Skill Quiz</h2>
-        <p style='color: #6c757d; margin: 5px 0 0 0;'>Tes pengetahuan teknologi dan programming</p>
-    </div>
-    """, unsafe_allow_html=True)
-    
-    if 'tech_selected_questions' not in st.session_state:
-        st.session_state.tech_selected_questions = []
-        selected_raw_questions = random.sample(tech_questions, 10)
         
-        for q_raw in selected_raw_questions:
-            # Create a mutable copy of the question to avoid modifying the original list
-            q_copy = q_raw.copy()
-            
-            # Get the correct answer text before shuffling
-            correct_answer_text = q_copy['options'][q_copy['correct']]
-            
-            # Shuffle the options list in place
-            random.shuffle(q_copy['options'])
-            
-            # Find the new index of the correct answer in the shuffled list
-            q_copy['correct'] = q_copy['options'].index(correct_answer_text)
-            
-            st.session_state.tech_selected_questions.append(q_copy)
-    
-    answers = []
-    for idx, q in enumerate(st.session_state.tech_selected_questions):
-        st.markdown(f"**{idx+1}. {q['q']}**")
-        answer = st.radio("Pilih jawaban:", q['options'], key=f"tech_{idx}", index=None)
-        if answer is not None:
-            answers.append(q['options'].index(answer))
-        st.markdown("---")
-    
-    col1, col2 = st.columns(2)
-    with col1:
         if st.button("Kembali ke Home", use_container_width=True):
             st.session_state.page = 'home'
             st.rerun()
-    
-    with col2:
-        if st.button("Selesai & Simpan Hasil", use_container_width=True):
-            if len(answers) == len(st.session_state.tech_selected_questions):
-                score = calculate_score(answers, st.session_state.tech_selected_questions, scoring_type='percentage_correct')
+
+    elif st.session_state.page == 'tech':
+        st.markdown("""
+        <div style='text-align: center; padding: 15px; background: #e9f5ff; border-radius: 8px; margin-bottom: 20px;'>
+            <h2 style='color: #495057; margin: 0;'>Technical Skill Quiz</h2>
+            <p style='color: #6c757d; margin: 5px 0 0 0;'>Tes pengetahuan teknologi dan programming</p>
+        </div>
+        """, unsafe_allow_html=True)
+        
+        # Session state hanya menyimpan id soal dan urutan opsi (bytes); teks soal diambil dari bank bersama
+        if 'tech_quiz_state' not in st.session_state:
+            st.session_state.tech_quiz_state = new_quiz_state('tech')
+        questions = quiz_questions('tech', st.session_state.tech_quiz_state)
+        
+        answers = []
+        # Form: pilihan radio tidak memicu rerun, jawaban dikirim sekali saat submit
+        with st.form("tech_form"):
+            for idx, (question, options) in enumerate(questions):
+                st.markdown(f"**{idx+1}. {question}**")
+                answer = st.radio("Pilih jawaban:", options, key=f"tech_{idx}", index=None)
+                if answer is not None:
+                    answers.append(options.index(answer))
+                st.markdown("---")
+            submitted = st.form_submit_button("Selesai & Simpan Hasil", use_container_width=True)
+        
+        if submitted:
+            if len(answers) == len(questions):
+                score = score_quiz('tech', st.session_state.tech_quiz_state, answers)
                 st.session_state.quiz_results['tech'] = score
                 st.success(f"Tech Quiz selesai! Skor Anda: {score:.1f}%")
-                del st.session_state.tech_selected_questions
+                del st.session_state.tech_quiz_state
                 st.session_state.page = 'results'
                 st.rerun()
             else:
                 st.error("Harap jawab semua pertanyaan!")
-
-elif st.session_state.page == 'soft':
-    st.markdown("""
-    <div style='text-align: center; padding: 15px; background: #e9f5ff; border-radius: 8px; margin-bottom: 20px;'>
-        <h2 style='color: #495057; margin: 0;'>Soft Skills Assessment</h2>
-        <p style='color: #6c757d; margin: 5px 0 0 0;'>Evaluasi kemampuan interpersonal dan adaptabilitas</p>
-    </div>
-    """, unsafe_allow_html=True)
-    
-    if 'soft_selected_questions' not in st.session_state:
-        st.session_state.soft_selected_questions = random.sample(soft_questions, 10)
-    
-    answers = []
-    for idx, q in enumerate(st.session_state.soft_selected_questions):
-        st.markdown(f"**{idx+1}. {q['q']}**")
-        answer = st.radio("Pilih jawaban:", q['options'], key=f"soft_{idx}", index=None)
-        if answer is not None:
-            answers.append(q['options'].index(answer))
-        st.markdown("---")
-    
-    col1, col2 = st.columns(2)
-    with col1:
+        
         if st.button("Kembali ke Home", use_container_width=True):
             st.session_state.page = 'home'
             st.rerun()
-    
-    with col2:
-        if st.button("Selesai & Simpan Hasil", use_container_width=True):
-            if len(answers) == len(st.session_state.soft_selected_questions):
-                score = calculate_score(answers, st.session_state.soft_selected_questions, scoring_type='weighted')
+
+    elif st.session_state.page == 'soft':
+        st.markdown("""
+        <div style='text-align: center; padding: 15px; background: #e9f5ff; border-radius: 8px; margin-bottom: 20px;'>
+            <h2 style='color: #495057; margin: 0;'>Soft Skills Assessment</h2>
+            <p style='color: #6c757d; margin: 5px 0 0 0;'>Evaluasi kemampuan interpersonal dan adaptabilitas</p>
+        </div>
+        """, unsafe_allow_html=True)
+        
+        # Session state hanya menyimpan id soal dan urutan opsi (bytes); teks soal diambil dari bank bersama
+        if 'soft_quiz_state' not in st.session_state:
+            st.session_state.soft_quiz_state = new_quiz_state('soft')
+        questions = quiz_questions('soft', st.session_state.soft_quiz_state)
+        
+        answers = []
+        # Form: pilihan radio tidak memicu rerun, jawaban dikirim sekali saat submit
+        with st.form("soft_form"):
+            for idx, (question, options) in enumerate(questions):
+                st.markdown(f"**{idx+1}. {question}**")
+                answer = st.radio("Pilih jawaban:", options, key=f"soft_{idx}", index=None)
+                if answer is not None:
+                    answers.append(options.index(answer))
+                st.markdown("---")
+            submitted = st.form_submit_button("Selesai & Simpan Hasil", use_container_width=True)
+        
+        if submitted:
+            if len(answers) == len(questions):
+                score = score_quiz('soft', st.session_state.soft_quiz_state, answers)
                 st.session_state.quiz_results['soft'] = score
                 st.success(f"Soft Skills Assessment selesai! Skor Anda: {score:.1f}%")
-                del st.session_state.soft_selected_questions
+                del st.session_state.soft_quiz_state
                 st.session_state.page = 'results'
                 st.rerun()
             else:
-                st.error("Harap jawab semua pertanyaan!")
\ No newline at end of file
+                st.error("Harap jawab semua pertanyaan!")
+        
+        if st.button("Kembali ke Home", use_container_width=True):
+            st.session_state.page = 'home'
+            st.rerun()
\ No newline at end of file
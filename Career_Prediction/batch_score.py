@@ -0,0 +1,186 @@
+"""Score a whole cohort file offline with the trained KNN model.
+
+Reads a CSV or Parquet file that has the four score columns of
+``data/combined_career_dataset.csv`` in fixed-size chunks, runs vectorized
+``scaler.transform`` + ``knn.predict_proba`` per chunk and streams the input
+rows plus the predicted career and top-k probabilities to the output file.
+Memory stays bounded by ``--chunksize`` times the number of in-flight chunks.
+
+The prediction is written to ``predicted_career``, so a ``career`` column of
+the input (the dataset's ground truth) is kept. Rows with a missing,
+non-numeric or out-of-range score are not scored: they are written with
+empty predictions and the offending values in ``error``, and the run
+continues. Score columns are written as numbers (empty when not numeric), so
+every chunk of a Parquet output has the same schema.
+
+Contoh:
+    python batch_score.py kandidat.csv hasil.csv --chunksize 200000 --workers 4
+"""
+import argparse
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from model_artifact import SCORE_RANGE
+from model_loader import MODELS_DIR, load_model_bundle
+
+FEATURE_COLUMNS = ['tech_score', 'soft_score', 'sjt_score', 'personality_score']
+PREDICTION_COLUMN = 'predicted_career'
+ERROR_COLUMN = 'error'
+
+
+def _is_parquet(path):
+    return path.lower().endswith((".parquet", ".pq"))
+
+
+def read_chunks(path, chunksize):
+    """Yield DataFrame chunks of at most chunksize rows from a CSV or Parquet file"""
+    if _is_parquet(path):
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, chunksize=chunksize)
+
+
+def _check_columns(chunk):
+    missing = [c for c in FEATURE_COLUMNS if c not in chunk.columns]
+    if missing:
+        raise ValueError(f"Kolom skor tidak ditemukan di file input: {', '.join(missing)}")
+
+
+def validate_scores(chunk):
+    """(float64 scores, error message per row or None); non-numeric scores become NaN"""
+    scores = chunk[FEATURE_COLUMNS].apply(pd.to_numeric, errors="coerce").to_numpy(dtype=np.float64, copy=True)
+    low, high = SCORE_RANGE
+    with np.errstate(invalid="ignore"):
+        bad = ~np.isfinite(scores) | (scores < low) | (scores > high)
+    errors = np.full(len(chunk), None, dtype=object)
+    for i in np.flatnonzero(bad.any(axis=1)):
+        values = ", ".join(f"{c}={chunk[c].iloc[i]}" for c, b in zip(FEATURE_COLUMNS, bad[i]) if b)
+        errors[i] = f"skor harus angka {low:g}..{high:g}: {values}"
+    return scores, errors
+
+
+def score_chunk(chunk, top_k, models_dir=MODELS_DIR):
+    """Append predicted career, top-k class probabilities and a per-row error to a chunk"""
+    knn, le, scaler, _ = load_model_bundle(models_dir)
+    scores, errors = validate_scores(chunk)
+    valid = np.flatnonzero([e is None for e in errors])
+    proba = np.full((len(chunk), len(le.classes_)), np.nan)
+    if len(valid):
+        proba[valid] = knn.predict_proba(scaler.transform(pd.DataFrame(scores[valid], columns=FEATURE_COLUMNS)))
+
+    # predict() untuk weights='distance' adalah argmax dari predict_proba, jadi cukup dihitung sekali
+    top = np.argsort(-proba[valid], axis=1, kind="stable")[:, :top_k]
+    result = chunk.copy()
+    # Kolom skor ditulis sebagai angka (nilai aslinya yang tidak valid ada di kolom error)
+    result[FEATURE_COLUMNS] = scores
+
+    def column(values, dtype):
+        # Baris tidak valid kosong; dtype tetap agar skema Parquet sama di semua chunk
+        full = np.full(len(chunk), None if dtype == "string" else np.nan, dtype=object if dtype == "string" else dtype)
+        full[valid] = values
+        return pd.array(full, dtype=dtype)
+
+    result[PREDICTION_COLUMN] = column(le.classes_[top[:, 0]], "string")
+    for rank in range(top_k):
+        result[f'career_{rank + 1}'] = column(le.classes_[top[:, rank]], "string")
+        result[f'proba_{rank + 1}'] = column(np.take_along_axis(proba[valid], top[:, rank:rank + 1], axis=1)[:, 0],
+                                             "float64")
+    result[ERROR_COLUMN] = pd.array(errors, dtype="string")
+    return result
+
+
+class OutputWriter:
+    """Streams scored chunks to CSV or Parquet without holding them in memory"""
+
+    def __init__(self, path):
+        self.path = path
+        self._parquet_writer = None
+        self._csv_header_written = False
+
+    def write(self, chunk):
+        if _is_parquet(self.path):
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if self._parquet_writer is None:
+                self._parquet_writer = pq.ParquetWriter(self.path, table.schema)
+            self._parquet_writer.write_table(table)
+        else:
+            chunk.to_csv(self.path, mode="a" if self._csv_header_written else "w",
+                         header=not self._csv_header_written, index=False)
+            self._csv_header_written = True
+
+    def close(self):
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+
+
+def run(input_path, output_path, chunksize=100_000, top_k=3, workers=1, models_dir=MODELS_DIR, log=sys.stderr):
+    """Score input_path into output_path and return (rows, invalid rows, seconds)"""
+    n_classes = len(load_model_bundle(models_dir).le.classes_)
+    top_k = max(1, min(top_k, n_classes))
+    writer = OutputWriter(output_path)
+    rows = invalid = 0
+    start = time.perf_counter()
+
+    def report(chunk):
+        nonlocal rows, invalid
+        writer.write(chunk)
+        rows += len(chunk)
+        invalid += int(chunk[ERROR_COLUMN].notna().sum())
+        elapsed = time.perf_counter() - start
+        print(f"{rows:,} baris diproses ({rows / elapsed:,.0f} baris/detik, {invalid:,} tidak valid)", file=log)
+
+    try:
+        if workers <= 1:
+            for chunk in read_chunks(input_path, chunksize):
+                _check_columns(chunk)
+                report(score_chunk(chunk, top_k, models_dir))
+        else:
+            # Jumlah chunk yang sedang diproses dibatasi agar memori tidak ikut membesar dengan ukuran input
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                pending = deque()
+                for chunk in read_chunks(input_path, chunksize):
+                    _check_columns(chunk)
+                    pending.append(pool.submit(score_chunk, chunk, top_k, models_dir))
+                    if len(pending) >= 2 * workers:
+                        report(pending.popleft().result())
+                while pending:
+                    report(pending.popleft().result())
+    finally:
+        writer.close()
+
+    return rows, invalid, time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Batch scoring karir untuk file kandidat (CSV/Parquet)")
+    parser.add_argument("input", help="File input .csv atau .parquet dengan kolom " + ", ".join(FEATURE_COLUMNS))
+    parser.add_argument("output", help="File output .csv atau .parquet")
+    parser.add_argument("--chunksize", type=int, default=100_000, help="Jumlah baris per chunk (default: 100000)")
+    parser.add_argument("--top-k", type=int, default=3, help="Jumlah probabilitas karir teratas yang ditulis (default: 3)")
+    parser.add_argument("--workers", type=int, default=1, help="Jumlah proses paralel (default: 1)")
+    parser.add_argument("--models-dir", default=MODELS_DIR, help="Folder artifact model (default: models/)")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.input):
+        parser.error(f"File input tidak ditemukan: {args.input}")
+    try:
+        rows, invalid, seconds = run(args.input, args.output, args.chunksize, args.top_k, args.workers, args.models_dir)
+    except ValueError as e:
+        parser.error(str(e))
+    print(f"Selesai: {rows:,} baris dalam {seconds:.2f} detik ({rows / max(seconds, 1e-9):,.0f} baris/detik) -> {args.output}")
+    if invalid:
+        print(f"{invalid:,} baris tidak diprediksi karena skornya tidak valid (lihat kolom {ERROR_COLUMN})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,298 @@
+"""Benchmark suite for the scoring, prediction and model fitting hot paths.
+
+Cases:
+    calculate_score/<scoring_type>      one completed quiz, per call
+    score_answers/<quiz>/<rows>         quiz_scoring.score_answers on a batch of submissions
+    predict_career/cold, /warm          app.py predict_career in a fresh interpreter (first call) and after it
+    batch_predict/<backend>/<rows>      knn_engine (artifact) and batch_score.score_chunk (sklearn)
+    fit_evaluate/<rows>                 fit_knn + evaluate_knn on a resampled copy of the dataset
+                                        (model fit and test-set scoring only: no loading, plots or export)
+
+Every case reports the median and min seconds per call over several repeats
+(``timeit`` autorange per repeat). Results are written as JSON and compared to
+a stored baseline; a case whose median is slower than the baseline by more
+than ``--threshold`` is a regression and the script exits with status 1.
+Everything runs offline on CPU from the files in this folder.
+
+``benchmarks/baseline.json`` is committed and was produced with
+``--quick --save-baseline``; timings depend on the machine, so regenerate it
+on the hardware that runs the comparison (e.g. the CI runner) before relying
+on the regression check. Cases missing from the baseline are not compared.
+
+Contoh:
+    python benchmark.py --save-baseline
+    python benchmark.py --output bench_hasil.json --threshold 0.25
+    python benchmark.py --quick
+    python benchmark.py --quick --save-baseline
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import timeit
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from model_loader import BASE_DIR, MODELS_DIR
+
+DATASET_PATH = os.path.join(BASE_DIR, "data", "combined_career_dataset.csv")
+BASELINE_PATH = os.path.join(BASE_DIR, "benchmarks", "baseline.json")
+FEATURE_COLUMNS = ['tech_score', 'soft_score', 'sjt_score', 'personality_score']
+
+BATCH_SIZES = (1, 100, 10_000, 1_000_000)
+FIT_SIZES = (1_500, 15_000, 150_000)
+QUICK_BATCH_SIZES = (1, 100, 10_000)
+QUICK_FIT_SIZES = (1_500, 15_000)
+SCORE_BATCH_ROWS = 100_000
+
+_PREDICT_BOOTSTRAP = """
+import json, logging, runpy, sys, time
+import streamlit as st
+logging.disable(logging.WARNING)
+st.session_state.page = "home"
+app = runpy.run_path({app!r}, run_name="__main__")
+scores = (80.0, 60.0, 90.0, 70.0)
+start = time.perf_counter()
+app["predict_career"](*scores)
+cold = time.perf_counter() - start
+warm = []
+for _ in range({warm_calls}):
+    start = time.perf_counter()
+    app["predict_career"](*scores)
+    warm.append(time.perf_counter() - start)
+print(json.dumps({{"cold": cold, "warm": warm}}))
+"""
+
+
+def _summary(per_call, **extra):
+    return {"median_s": statistics.median(per_call), "min_s": min(per_call), "repeats": len(per_call), **extra}
+
+
+def measure(fn, repeat=5, max_case_seconds=30.0):
+    """Median/min seconds per call of fn(), using timeit autorange for the loop count"""
+    timer = timeit.Timer(fn)
+    number, elapsed = timer.autorange()
+    per_call = [elapsed / number]
+    # Kasus berat (mis. 1 juta baris) dibatasi supaya satu kasus tidak lebih dari max_case_seconds
+    repeat = max(1, min(repeat, int(max_case_seconds / max(elapsed, 1e-9))))
+    per_call += [t / number for t in timer.repeat(repeat=repeat - 1, number=number)]
+    return _summary(per_call, number=number)
+
+
+def bench_calculate_score(repeat):
+    from quiz_bank import QUIZZES, calculate_score
+
+    results = {}
+    rng = np.random.default_rng(0)
+    for scoring_type in ('weighted', 'percentage_correct'):
+        quiz = next(q for q in QUIZZES.values() if q['scoring_type'] == scoring_type)
+        questions = quiz['questions'][:quiz['n_questions']]
+        answers = [int(a) for a in rng.integers(0, 2, size=len(questions))]
+        results[f"calculate_score/{scoring_type}"] = measure(
+            lambda: calculate_score(answers, questions, scoring_type=scoring_type), repeat)
+    results.update(bench_score_answers(repeat))
+    return results
+
+
+def bench_score_answers(repeat, n_rows=SCORE_BATCH_ROWS):
+    from quiz_bank import QUIZZES
+    from quiz_scoring import compile_bank, score_answers
+
+    results = {}
+    rng = np.random.default_rng(0)
+    for quiz_type, quiz in QUIZZES.items():
+        bank = compile_bank(quiz_type)
+        question_ids = rng.random((n_rows, len(bank.n_options))).argsort(axis=1)[:, :quiz['n_questions']]
+        answers = rng.integers(0, bank.n_options.min(), size=question_ids.shape)
+        permutations = rng.random(question_ids.shape + (bank.option_weights.shape[1],)).argsort(axis=2)
+        results[f"score_answers/{quiz_type}/{n_rows}"] = measure(
+            lambda: score_answers(quiz_type, question_ids, answers, permutations), repeat) | {"rows": n_rows}
+    return results
+
+
+def bench_predict_career(repeat, warm_calls=200):
+    """Cold = first predict_career call in a fresh process (imports + model load), warm = calls after it"""
+    code = _PREDICT_BOOTSTRAP.format(app=os.path.join(BASE_DIR, "app.py"), warm_calls=warm_calls)
+    cold, warm = [], []
+    for _ in range(repeat):
+        proc = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, cwd=BASE_DIR)
+        if proc.returncode != 0:
+            raise RuntimeError(f"predict_career gagal dijalankan:\n{proc.stderr[-2000:]}")
+        timings = json.loads(proc.stdout.strip().splitlines()[-1])
+        cold.append(timings["cold"])
+        warm.append(statistics.median(timings["warm"]))
+    return {"predict_career/cold": _summary(cold), "predict_career/warm": _summary(warm, number=warm_calls)}
+
+
+def bench_batch_predict(sizes, repeat, models_dir, max_case_seconds):
+    import knn_engine
+    from batch_score import score_chunk
+    from model_loader import load_knn_artifact, load_model_bundle
+
+    results = {}
+    rng = np.random.default_rng(0)
+    try:
+        artifact = load_knn_artifact(models_dir)
+    except FileNotFoundError:
+        artifact = None
+        print("  batch_predict/engine dilewati: knn_model.bin belum ada (jalankan train_knn_model.py)")
+    load_model_bundle(models_dir) # Muat sekali di luar pengukuran
+
+    for n in sizes:
+        X = rng.uniform(0, 100, size=(n, len(FEATURE_COLUMNS)))
+        chunk = pd.DataFrame(X, columns=FEATURE_COLUMNS)
+        if artifact is not None:
+            results[f"batch_predict/engine/{n}"] = measure(
+                lambda: knn_engine.predict_proba(artifact, X), repeat, max_case_seconds) | {"rows": n}
+        results[f"batch_predict/sklearn/{n}"] = measure(
+            lambda: score_chunk(chunk, 3, models_dir), repeat, max_case_seconds) | {"rows": n}
+    return results
+
+
+def resample_dataset(df, n_rows, seed=0):
+    """Bootstrap-resample df to n_rows with small score jitter, so larger sizes are not exact duplicates"""
+    rng = np.random.default_rng(seed)
+    sample = df.iloc[rng.integers(0, len(df), size=n_rows)].reset_index(drop=True)
+    noise = rng.normal(0.0, 0.5, size=(n_rows, len(FEATURE_COLUMNS))).astype(np.float32)
+    sample[FEATURE_COLUMNS] = np.clip(sample[FEATURE_COLUMNS].to_numpy() + noise, 0, 100)
+    return sample
+
+
+def bench_fit_evaluate(sizes, repeat, max_case_seconds):
+    from train_knn_model import encode_labels, evaluate_knn, fit_knn, load_dataset, scale_features, split_data
+
+    df = load_dataset(DATASET_PATH)
+    results = {}
+    for n in sizes:
+        data = df if n == len(df) else resample_dataset(df, n)
+        with contextlib.redirect_stdout(io.StringIO()):
+            encoded = encode_labels(data)
+        split = split_data(scale_features(data), encoded, test_size=0.2, random_state=42)
+
+        def fit_evaluate():
+            evaluate_knn(fit_knn(split, n_neighbors=5, weights='distance'), split, encoded)
+
+        results[f"fit_evaluate/{n}"] = measure(fit_evaluate, repeat, max_case_seconds) | {"rows": n}
+    return results
+
+
+def environment(models_dir):
+    import sklearn
+    from model_loader import model_version
+
+    try:
+        version = model_version(models_dir)
+    except FileNotFoundError:
+        version = None
+    return {
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "sklearn": sklearn.__version__,
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "model_version": version,
+    }
+
+
+def compare(results, baseline, threshold):
+    """Per-case ratio current/baseline median; ratio > 1 + threshold is a regression"""
+    comparison = {}
+    for case, current in results.items():
+        base = baseline.get("results", {}).get(case)
+        if base is None:
+            continue
+        ratio = current["median_s"] / base["median_s"] if base["median_s"] > 0 else float("inf")
+        comparison[case] = {"baseline_median_s": base["median_s"], "ratio": ratio, "regression": ratio > 1 + threshold}
+    return comparison
+
+
+def _format_seconds(seconds):
+    for unit, scale in (("s", 1.0), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:8.2f} {unit}"
+    return f"{seconds / 1e-9:8.2f} ns"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark scoring, prediksi, dan fit model KNN")
+    parser.add_argument("--output", help="Simpan hasil ke file JSON")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="File baseline JSON (default: benchmarks/baseline.json)")
+    parser.add_argument("--save-baseline", action="store_true", help="Simpan hasil run ini sebagai baseline baru")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="Batas regresi relatif terhadap median baseline (default: 0.2 = 20%% lebih lambat)")
+    parser.add_argument("--repeat", type=int, default=5, help="Jumlah pengulangan per kasus (default: 5)")
+    parser.add_argument("--max-case-seconds", type=float, default=30.0,
+                        help="Batas waktu kira-kira per kasus; kasus berat diulang lebih sedikit")
+    parser.add_argument("--quick", action="store_true", help="Lewati ukuran terbesar (1 juta baris, fit_evaluate 150 ribu baris)")
+    parser.add_argument("--only", nargs="+", choices=["calculate_score", "predict_career", "batch_predict", "fit_evaluate"],
+                        help="Hanya jalankan grup kasus ini")
+    parser.add_argument("--models-dir", default=MODELS_DIR)
+    args = parser.parse_args(argv)
+
+    groups = args.only or ["calculate_score", "predict_career", "batch_predict", "fit_evaluate"]
+    results = {}
+    started = time.perf_counter()
+    for group in groups:
+        print(f"[{group}]")
+        if group == "calculate_score":
+            group_results = bench_calculate_score(args.repeat)
+        elif group == "predict_career":
+            group_results = bench_predict_career(args.repeat)
+        elif group == "batch_predict":
+            group_results = bench_batch_predict(QUICK_BATCH_SIZES if args.quick else BATCH_SIZES,
+                                                args.repeat, args.models_dir, args.max_case_seconds)
+        else:
+            group_results = bench_fit_evaluate(QUICK_FIT_SIZES if args.quick else FIT_SIZES,
+                                        args.repeat, args.max_case_seconds)
+        for case, result in group_results.items():
+            print(f"  {case:<36} median {_format_seconds(result['median_s'])}  min {_format_seconds(result['min_s'])}")
+        results.update(group_results)
+
+    report = {"environment": environment(args.models_dir), "results": results,
+              "elapsed_s": time.perf_counter() - started}
+
+    regressions = []
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        report["baseline"] = {"path": args.baseline, "environment": baseline.get("environment"),
+                              "threshold": args.threshold}
+        report["comparison"] = compare(results, baseline, args.threshold)
+        if baseline.get("environment", {}).get("model_version") != report["environment"]["model_version"]:
+            print("Catatan: baseline diukur dengan versi model yang berbeda")
+        print(f"\nPerbandingan dengan baseline ({args.baseline}):")
+        for case, item in report["comparison"].items():
+            flag = "REGRESI" if item["regression"] else "ok"
+            print(f"  {case:<36} x{item['ratio']:.2f}  {flag}")
+            if item["regression"]:
+                regressions.append(case)
+    elif not args.save_baseline:
+        print(f"\nBaseline belum ada di {args.baseline}; buat dengan --save-baseline")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nBaseline disimpan ke {args.baseline}")
+
+    for case in regressions:
+        print(f"GAGAL: {case} lebih lambat dari baseline melebihi {args.threshold:.0%}")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""Import-time regression check for app.py (``python -X importtime`` per page).
+
+Runs app.py in Streamlit bare mode once per page in a fresh interpreter,
+parses the ``-X importtime`` output and reports the import cost that app.py
+adds on top of ``import streamlit``. Exits with status 1 when a home/quiz
+page imports one of HEAVY_MODULES or exceeds its budget.
+
+The heavy-module rule is also enforced by tests/test_import_time.py, so it
+runs with the test suite; the millisecond budget depends on the machine and
+is only checked here.
+
+Contoh:
+    python check_import_time.py
+    python check_import_time.py --json importtime_profile.json
+"""
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+
+# Halaman home dan quiz tidak boleh memuat library ini (hanya halaman hasil / model)
+HEAVY_MODULES = ("numpy", "pandas", "sklearn", "joblib", "scipy", "plotly", "matplotlib", "seaborn", "pyarrow")
+LIGHT_PAGES = ("home", "sjt", "tech", "soft", "personality")
+PAGES = LIGHT_PAGES + ("results",)
+
+# Anggaran waktu import tambahan (di luar streamlit) per halaman ringan, dalam milidetik
+LIGHT_PAGE_BUDGET_MS = 50.0
+
+_BOOTSTRAP = """
+import logging, runpy
+import streamlit as st
+logging.disable(logging.WARNING)
+st.session_state.page = {page!r}
+st.session_state.quiz_results = {results!r}
+runpy.run_path({app!r}, run_name="__main__")
+"""
+_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def profile_page(page):
+    """Return (total_ms, {module: cumulative_ms}) for top-level imports done by app.py on a page"""
+    results = {'sjt': 80.0, 'personality': 60.0, 'tech': 90.0, 'soft': 70.0} if page == "results" else {}
+    code = _BOOTSTRAP.format(page=page, results=results, app=APP_PATH)
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                          capture_output=True, text=True, cwd=os.path.dirname(APP_PATH))
+    if proc.returncode != 0:
+        raise RuntimeError(f"app.py gagal dijalankan untuk halaman '{page}':\n{proc.stderr[-2000:]}")
+
+    modules = {}
+    after_streamlit = False
+    for line in proc.stderr.splitlines():
+        match = _LINE.match(line)
+        if not match:
+            continue
+        cumulative_us, indent, name = int(match.group(2)), match.group(3), match.group(4)
+        if after_streamlit:
+            modules[name] = cumulative_us / 1000.0
+            if len(indent) <= 1:
+                modules.setdefault("__top__", 0.0)
+                modules["__top__"] += cumulative_us / 1000.0
+        elif name == "streamlit" and len(indent) <= 1:
+            after_streamlit = True
+    total_ms = modules.pop("__top__", 0.0)
+    return total_ms, modules
+
+
+def heavy_imports(modules):
+    """HEAVY_MODULES (or their submodules) found in a profile_page module dict"""
+    return [m for m in HEAVY_MODULES if any(name == m or name.startswith(f"{m}.") for name in modules)]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cek regresi waktu import app.py per halaman")
+    parser.add_argument("--json", help="Simpan profil import per halaman ke file JSON")
+    parser.add_argument("--top", type=int, default=5, help="Jumlah import terlama yang ditampilkan per halaman")
+    args = parser.parse_args(argv)
+
+    profile = {}
+    failures = []
+    for page in PAGES:
+        total_ms, modules = profile_page(page)
+        profile[page] = {"total_ms": round(total_ms, 2), "modules": {k: round(v, 2) for k, v in modules.items()}}
+        slowest = sorted(modules.items(), key=lambda item: -item[1])[:args.top]
+        print(f"{page:>12}: {total_ms:8.1f} ms  " + ", ".join(f"{name} {ms:.1f}" for name, ms in slowest))
+
+        if page in LIGHT_PAGES:
+            heavy = heavy_imports(modules)
+            if heavy:
+                failures.append(f"halaman '{page}' memuat modul berat: {', '.join(heavy)}")
+            if total_ms > LIGHT_PAGE_BUDGET_MS:
+                failures.append(f"halaman '{page}' butuh {total_ms:.1f} ms import (anggaran {LIGHT_PAGE_BUDGET_MS:.0f} ms)")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(profile, f, indent=2)
+
+    for failure in failures:
+        print(f"GAGAL: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
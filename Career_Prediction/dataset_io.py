@@ -0,0 +1,139 @@
+"""Typed ingestion and columnar cache for the training dataset.
+
+The source (CSV or Parquet) is parsed once with a declared schema (float32
+scores, categorical career) and converted to ``.npy`` files next to a small JSON manifest:
+
+    <cache_dir>/<name>-<sha16>/features.npy   float32, shape (n, 4)
+    <cache_dir>/<name>-<sha16>/labels.npy     int16 category codes, shape (n,)
+    <cache_dir>/<name>-<sha16>/manifest.json  source hash, classes, row count
+
+The directory name contains the SHA-256 of the source file, so editing the CSV
+invalidates the cache automatically. Conversion streams the source in chunks and
+appends raw bytes, so it works for files larger than memory; the cached arrays
+are opened with ``mmap_mode='r'``. A row without a career label stops the
+conversion (there is no code for "unknown"), so the cache never holds a label
+the source does not have.
+"""
+import json
+import os
+import shutil
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from pipeline_cache import file_hash
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DATASET_CACHE_DIR = os.path.join(BASE_DIR, ".cache", "datasets")
+
+FEATURE_COLUMNS = ['tech_score', 'soft_score', 'sjt_score', 'personality_score']
+LABEL_COLUMN = 'career'
+SCHEMA = {**{column: np.float32 for column in FEATURE_COLUMNS}, LABEL_COLUMN: 'category'}
+
+Dataset = namedtuple("Dataset", ["features", "labels", "classes", "source_hash"])
+
+# Naikkan jika isi cache berubah; cache versi lain dikonversi ulang dari file sumber
+CACHE_FORMAT = 2
+
+
+def read_chunks(path, chunksize=1_000_000):
+    """Yield typed DataFrame chunks (float32 scores, categorical career) from a CSV or Parquet file"""
+    if path.lower().endswith((".parquet", ".pq")):
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize, columns=list(SCHEMA)):
+            yield batch.to_pandas().astype(SCHEMA)
+    else:
+        yield from pd.read_csv(path, usecols=list(SCHEMA), dtype=SCHEMA, chunksize=chunksize)
+
+
+def _write_npy(path, raw_path, dtype, shape):
+    """Wrap a raw little-endian buffer file into a .npy file without loading it"""
+    with open(path, "wb") as out, open(raw_path, "rb") as raw:
+        np.lib.format.write_array_header_1_0(out, {"descr": np.dtype(dtype).str, "fortran_order": False, "shape": shape})
+        shutil.copyfileobj(raw, out, 1 << 20)
+    os.remove(raw_path)
+
+
+def convert_source(path, out_dir, source_hash, chunksize=1_000_000):
+    """One-time streaming conversion of the source file into the columnar cache"""
+    tmp_dir = f"{out_dir}.tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    labels_seen = {}
+    n_rows = 0
+    missing_rows = []
+    features_raw = os.path.join(tmp_dir, "features.raw")
+    labels_raw = os.path.join(tmp_dir, "labels.raw")
+    with open(features_raw, "wb") as f_out, open(labels_raw, "wb") as l_out:
+        for chunk in read_chunks(path, chunksize):
+            f_out.write(np.ascontiguousarray(chunk[FEATURE_COLUMNS].to_numpy(dtype="<f4")).tobytes())
+            # Kode sementara per urutan kemunculan; dipetakan ulang ke urutan alfabet setelah semua chunk dibaca
+            codes = np.array([labels_seen.setdefault(label, len(labels_seen)) for label in chunk[LABEL_COLUMN].cat.categories],
+                             dtype="<i2")
+            chunk_codes = chunk[LABEL_COLUMN].cat.codes.to_numpy()
+            # Kode -1 = label kosong; codes[-1] akan diam-diam memberi karir terakhir
+            missing = np.flatnonzero(chunk_codes < 0)
+            if len(missing):
+                missing_rows.extend((n_rows + missing + 1).tolist())
+            l_out.write(codes[np.maximum(chunk_codes, 0)].tobytes() if len(codes) else np.zeros(len(chunk), "<i2").tobytes())
+            n_rows += len(chunk)
+    if missing_rows:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        shown = ", ".join(map(str, missing_rows[:10])) + (", ..." if len(missing_rows) > 10 else "")
+        raise ValueError(f"{path}: {len(missing_rows)} baris tanpa label {LABEL_COLUMN} (baris data ke-{shown})")
+
+    # Urutkan kelas seperti LabelEncoder / pandas Categorical (alfabet)
+    classes = sorted(labels_seen)
+    remap = np.empty(len(classes), dtype="<i2")
+    for label, code in labels_seen.items():
+        remap[code] = classes.index(label)
+    _write_npy(os.path.join(tmp_dir, "features.npy"), features_raw, "<f4", (n_rows, len(FEATURE_COLUMNS)))
+    _write_npy(os.path.join(tmp_dir, "labels.npy"), labels_raw, "<i2", (n_rows,))
+    labels = np.load(os.path.join(tmp_dir, "labels.npy"), mmap_mode="r+")
+    for start in range(0, n_rows, chunksize):
+        labels[start:start + chunksize] = remap[labels[start:start + chunksize]]
+    labels.flush()
+    del labels
+
+    with open(os.path.join(tmp_dir, "manifest.json"), "w") as f:
+        json.dump({"format": CACHE_FORMAT, "source": os.path.abspath(path), "source_hash": source_hash, "rows": n_rows,
+                   "feature_columns": FEATURE_COLUMNS, "classes": classes}, f, indent=2)
+    shutil.rmtree(out_dir, ignore_errors=True)
+    os.replace(tmp_dir, out_dir)
+
+
+def open_dataset(path, cache_dir=DATASET_CACHE_DIR, chunksize=1_000_000):
+    """Return the memory-mapped columnar copy of path, converting it first if needed"""
+    source_hash = file_hash(path)
+    name = os.path.splitext(os.path.basename(path))[0]
+    out_dir = os.path.join(cache_dir, f"{name}-{source_hash[:16]}")
+    manifest_path = os.path.join(out_dir, "manifest.json")
+    manifest = None
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+    if manifest is None or manifest.get("format") != CACHE_FORMAT:
+        convert_source(path, out_dir, source_hash, chunksize)
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+    return Dataset(
+        features=np.load(os.path.join(out_dir, "features.npy"), mmap_mode="r"),
+        labels=np.load(os.path.join(out_dir, "labels.npy"), mmap_mode="r"),
+        classes=manifest["classes"],
+        source_hash=source_hash,
+    )
+
+
+def to_frame(dataset, start=0, stop=None):
+    """Typed DataFrame (float32 scores, categorical career) for rows [start, stop)"""
+    df = pd.DataFrame(np.asarray(dataset.features[start:stop]), columns=FEATURE_COLUMNS)
+    df[LABEL_COLUMN] = pd.Categorical.from_codes(np.asarray(dataset.labels[start:stop]), categories=dataset.classes)
+    return df
+
+
+def iter_frames(dataset, chunksize=1_000_000):
+    """Yield typed DataFrame chunks from the columnar cache for out-of-core processing"""
+    for start in range(0, len(dataset.labels), chunksize):
+        yield to_frame(dataset, start, start + chunksize)
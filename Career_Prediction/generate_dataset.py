@@ -0,0 +1,177 @@
+"""Synthetic dataset generator matching the distribution of combined_career_dataset.csv.
+
+Per career, the generator resamples rows of the source CSV (a smoothed
+bootstrap): each synthetic row copies the four scores of a random source row
+of its career and adds Gaussian noise of ``--jitter`` score points to the
+scores strictly inside (0, 100), reflected at the bounds. Scores are
+discrete and repeated in the source (two thirds of its rows are duplicates,
+most tech scores are exactly 100), so resampling keeps those point masses and
+the correlation between the scores; clipping a fitted Gaussian did not.
+
+``--overlap`` mixes careers instead of moving them: with probability
+``overlap`` a row of a career in ``--overlap-classes`` is drawn from the pooled
+rows of all those careers, so at 1.0 they share one score distribution.
+
+Output is written in chunks by a process pool. Chunk ``i`` is generated from
+``default_rng([seed, i])``, so the same seed and chunk size give an identical
+file for any number of workers.
+
+Contoh:
+    python generate_dataset.py data/synthetic_1m.csv --rows 1000000 --workers 4
+    python generate_dataset.py data/synthetic.parquet --rows 5000000 --seed 7
+    python generate_dataset.py data/imbalanced.csv --rows 100000 --class-weights "Software Developer=5" \\
+        --overlap 0.5 --overlap-classes "Software Developer" "Technical Specialist"
+"""
+import argparse
+import os
+import sys
+import time
+from collections import deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from batch_score import OutputWriter
+from dataset_io import FEATURE_COLUMNS, LABEL_COLUMN, read_chunks
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DATASET_PATH = os.path.join(BASE_DIR, "data", "combined_career_dataset.csv")
+SCORE_MIN, SCORE_MAX = 0.0, 100.0
+JITTER = 0.25
+
+# rows: skor sumber diurutkan per karir, baris karir c = rows[offsets[c]:offsets[c + 1]]
+ClassModel = namedtuple("ClassModel", ["classes", "weights", "rows", "offsets", "jitter", "overlap", "overlap_group"])
+
+
+def fit_class_model(df, jitter=JITTER):
+    """Per-career source rows and class frequencies of df"""
+    labels = df[LABEL_COLUMN].astype(str).to_numpy()
+    classes = sorted(set(labels))
+    groups = [df.loc[labels == career, FEATURE_COLUMNS].to_numpy(dtype=np.float64) for career in classes]
+    sizes = np.array([len(X) for X in groups], dtype=np.float64)
+    return ClassModel(classes, sizes / sizes.sum(), np.concatenate(groups), np.cumsum([0] + [len(X) for X in groups]),
+                      jitter, 0.0, np.zeros(len(classes), dtype=bool))
+
+
+def adjust_model(model, class_weights=None, overlap=0.0, overlap_classes=None):
+    """Apply class imbalance (relative weight per career) and overlap (mix rows between careers)"""
+    weights = model.weights.copy()
+    for career, factor in (class_weights or {}).items():
+        if career not in model.classes:
+            raise ValueError(f"Karir tidak dikenal: {career}")
+        weights[model.classes.index(career)] *= factor
+    weights /= weights.sum()
+
+    group = np.zeros(len(model.classes), dtype=bool)
+    if overlap:
+        for career in overlap_classes or model.classes:
+            if career not in model.classes:
+                raise ValueError(f"Karir tidak dikenal: {career}")
+            group[model.classes.index(career)] = True
+        if group.sum() < 2:
+            raise ValueError("--overlap-classes butuh minimal dua karir")
+    return model._replace(weights=weights, overlap=overlap, overlap_group=group)
+
+
+def generate_chunk(model, n_rows, seed, chunk_index):
+    """Generate one chunk deterministically from (seed, chunk_index)"""
+    rng = np.random.default_rng([seed, chunk_index])
+    labels = rng.choice(len(model.classes), size=n_rows, p=model.weights)
+    # overlap=0: baris dari karir sendiri, overlap=1: dari gabungan baris semua karir di grup overlap
+    source = labels.copy()
+    if model.overlap:
+        mixed = model.overlap_group[labels] & (rng.random(n_rows) < model.overlap)
+        source[mixed] = rng.choice(np.flatnonzero(model.overlap_group), size=int(mixed.sum()))
+    counts = np.diff(model.offsets)
+    X = model.rows[model.offsets[source] + (rng.random(n_rows) * counts[source]).astype(np.int64)]
+
+    if model.jitter:
+        # Skor tepat 0/100 adalah massa titik di data asli dan tidak digeser; sisanya dipantulkan di batas
+        interior = (X > SCORE_MIN) & (X < SCORE_MAX)
+        X = np.where(interior, X + rng.normal(0.0, model.jitter, X.shape), X)
+        X = np.where(X > SCORE_MAX, 2 * SCORE_MAX - X, X)
+        X = np.where(X < SCORE_MIN, 2 * SCORE_MIN - X, X)
+
+    chunk = pd.DataFrame(X, columns=FEATURE_COLUMNS)
+    chunk[LABEL_COLUMN] = pd.Categorical.from_codes(labels, categories=model.classes)
+    return chunk
+
+
+def run(output_path, n_rows, model, seed=42, chunksize=500_000, workers=1, log=sys.stderr):
+    """Write n_rows synthetic rows to output_path (CSV or Parquet) and return seconds taken"""
+    sizes = [min(chunksize, n_rows - start) for start in range(0, n_rows, chunksize)]
+    writer = OutputWriter(output_path)
+    written = 0
+    start = time.perf_counter()
+
+    def report(chunk):
+        nonlocal written
+        # Parquet/CSV ditulis dengan label string agar skema sama dengan dataset asli
+        writer.write(chunk.astype({LABEL_COLUMN: str}))
+        written += len(chunk)
+        print(f"{written:,}/{n_rows:,} baris ditulis ({written / (time.perf_counter() - start):,.0f} baris/detik)", file=log)
+
+    try:
+        if workers <= 1:
+            for i, size in enumerate(sizes):
+                report(generate_chunk(model, size, seed, i))
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                pending = deque()
+                for i, size in enumerate(sizes):
+                    pending.append(pool.submit(generate_chunk, model, size, seed, i))
+                    if len(pending) >= 2 * workers:
+                        report(pending.popleft().result())
+                while pending:
+                    report(pending.popleft().result())
+    finally:
+        writer.close()
+    return time.perf_counter() - start
+
+
+def _parse_class_weights(items):
+    weights = {}
+    for item in items or []:
+        for part in item.split(","):
+            career, _, factor = part.rpartition("=")
+            if not career:
+                raise ValueError(f"Format --class-weights harus 'Karir=bobot': {part}")
+            weights[career.strip()] = float(factor)
+    return weights
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Buat dataset sintetis dengan distribusi per karir dari dataset asli")
+    parser.add_argument("output", help="File output .csv atau .parquet")
+    parser.add_argument("--rows", type=int, required=True, help="Jumlah baris yang dibuat")
+    parser.add_argument("--source", default=DATASET_PATH, help="Dataset acuan (default: data/combined_career_dataset.csv)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--chunksize", type=int, default=500_000, help="Jumlah baris per chunk (default: 500000)")
+    parser.add_argument("--workers", type=int, default=1, help="Jumlah proses paralel (default: 1)")
+    parser.add_argument("--class-weights", nargs="+",
+                        help="Bobot relatif per karir untuk imbalance, mis. 'Software Developer=5' 'Project Manager=0.2'")
+    parser.add_argument("--jitter", type=float, default=JITTER,
+                        help=f"Simpangan baku noise pada skor yang diambil ulang, dalam poin skor (default: {JITTER})")
+    parser.add_argument("--overlap", type=float, default=0.0,
+                        help="0..1, peluang baris diambil dari gabungan karir --overlap-classes (default: 0 = distribusi asli)")
+    parser.add_argument("--overlap-classes", nargs="+", help="Karir yang dibuat saling tumpang tindih (default: semua)")
+    args = parser.parse_args(argv)
+
+    if not 0.0 <= args.overlap <= 1.0:
+        parser.error("--overlap harus di antara 0 dan 1")
+    if args.jitter < 0:
+        parser.error("--jitter tidak boleh negatif")
+    source = pd.concat(read_chunks(args.source))
+    try:
+        model = adjust_model(fit_class_model(source, args.jitter), _parse_class_weights(args.class_weights),
+                             args.overlap, args.overlap_classes)
+    except ValueError as e:
+        parser.error(str(e))
+
+    seconds = run(args.output, args.rows, model, args.seed, args.chunksize, args.workers)
+    print(f"Selesai: {args.rows:,} baris dalam {seconds:.2f} detik -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+"""Pure-NumPy KNN inference over the fused artifact written by train_knn_model.py.
+
+Reproduces ``StandardScaler.transform`` followed by
+``KNeighborsClassifier(weights='distance').predict`` / ``predict_proba`` with
+euclidean distance, without importing scikit-learn. Every function accepts a
+single query (shape ``(4,)``) or a batch (shape ``(n, 4)``) with the features
+in training order: tech_score, soft_score, sjt_score, personality_score.
+Quantized artifacts (float16, or uint8 codes with per-feature scale/offset)
+are searched in their stored form. Bagged ensemble artifacts (knn_ensemble.py)
+average the probabilities of their members, each searching its own reference
+rows and features.
+
+Tie-breaking deviates from sklearn on purpose: when several reference rows are
+at the distance of the k-th neighbour (the dataset has many exact duplicates),
+the ones with the smallest index are taken, while sklearn's KD-tree takes them
+in an order that depends on the tree layout. Both choices are valid k nearest
+neighbours, but their labels can differ, so predictions on such queries may
+differ from ``knn.predict`` (6 of the 29,700 points of the prediction table
+for the bundled model). ``train_knn_model.index_order_proba`` applies the
+engine's rule to sklearn's distances; tests/test_knn_engine.py checks the
+engine against it.
+"""
+import numpy as np
+
+from model_artifact import UINT8_LEVELS as _UINT8_LEVELS, dequantize
+
+# Batas jumlah sel matriks jarak per potongan query agar memori tetap kecil
+_MAX_DISTANCE_CELLS = 1 << 22
+
+
+def _as_batch(X):
+    X = np.asarray(X, dtype=np.float64)
+    return X.reshape(1, -1) if X.ndim == 1 else X
+
+
+def transform(artifact, X):
+    """Standardize raw scores with the fitted scaler statistics"""
+    return (_as_batch(X) - artifact.scaler_mean) / artifact.scaler_scale
+
+
+def _is_uint8(artifact):
+    quantization = artifact.header.get("quantization")
+    return bool(quantization) and quantization["dtype"] == "uint8"
+
+
+def _squared_distances_float(artifact, q, state, cols=None):
+    """||q - r||^2 = ||q||^2 + ||r||^2 - 2 q.r over a float32/float16 reference matrix"""
+    key = ("ref", cols)
+    if key not in state:
+        ref = artifact.X_ref.astype(np.float64)
+        if cols is not None:
+            ref = np.ascontiguousarray(ref[:, list(cols)])
+        state[key] = ref, np.einsum("ij,ij->i", ref, ref)
+    ref, ref_sq = state[key]
+    if cols is not None:
+        q = q[:, list(cols)]
+    return np.einsum("ij,ij->i", q, q)[:, None] + ref_sq[None, :] - 2.0 * (q @ ref.T)
+
+
+def _squared_distances_uint8(artifact, q, state, cols=None):
+    """Squared distances read from per-query lookup tables over the uint8 codes (no dequantized copy)"""
+    if "scale" not in state:
+        quantization = artifact.header["quantization"]
+        state["scale"] = np.array(quantization["scale"])
+        state["offset"] = np.array(quantization["offset"])
+        state["levels"] = np.arange(_UINT8_LEVELS + 1)
+    scale = state["scale"]
+    # table[i, f, c] = (q_if - (c * scale_f + offset_f))^2 untuk setiap kode c
+    u = (q - state["offset"]) / scale
+    table = (scale[None, :, None] * (u[:, :, None] - state["levels"][None, None, :])) ** 2
+    first, *rest = range(q.shape[1]) if cols is None else cols
+    sq = table[:, first, artifact.X_ref[:, first]]
+    for f in rest:
+        sq += table[:, f, artifact.X_ref[:, f]]
+    return sq
+
+
+def _members(artifact):
+    """(reference rows, feature columns) per ensemble member; None means all of them"""
+    if artifact.member_offsets is None:
+        return [(None, None)]
+    n_features = artifact.X_ref.shape[1]
+    members = []
+    for m in range(len(artifact.member_offsets) - 1):
+        rows = artifact.member_rows[artifact.member_offsets[m]:artifact.member_offsets[m + 1]]
+        cols = tuple(np.flatnonzero(artifact.member_features[m]).tolist())
+        members.append((rows, None if len(cols) == n_features else cols))
+    return members
+
+
+def _nearest(artifact, q, sq, k, rows, cols):
+    """k nearest candidates of one query chunk, given its squared distances to the candidate rows"""
+    cand = np.argpartition(sq, k - 1, axis=1)[:, :k]
+    kth = np.take_along_axis(sq, cand[:, k - 1:k], axis=1)
+
+    # Baris dengan seri di jarak ke-k: ambil semua yang < jarak ke-k, sisanya yang == jarak ke-k
+    # dengan indeks terkecil. Baris tanpa seri langsung memakai hasil argpartition.
+    tied = np.flatnonzero(np.count_nonzero(sq <= kth, axis=1) > k)
+    if len(tied):
+        sq_t, kth_t = sq[tied], kth[tied]
+        below = sq_t < kth_t
+        at_kth = sq_t == kth_t
+        n_free = k - np.count_nonzero(below, axis=1, keepdims=True)
+        chosen = below | (at_kth & (np.cumsum(at_kth, axis=1) <= n_free))
+        cand[tied] = np.nonzero(chosen)[1].reshape(len(tied), k)
+    if rows is not None:
+        cand = rows[cand] # Kolom kandidat -> indeks baris X_ref
+
+    # Jarak final dihitung langsung dari selisih agar sama dengan sklearn
+    diff = q[:, None, :] - dequantize(artifact, cand)
+    if cols is not None:
+        diff = diff[:, :, list(cols)]
+    dist = np.sqrt((diff ** 2).sum(axis=2))
+    order = np.argsort(dist, axis=1, kind="stable")
+    return np.take_along_axis(dist, order, axis=1), np.take_along_axis(cand, order, axis=1)
+
+
+def _search(artifact, X_scaled, k, members):
+    """Yield (query slice, member position, distances, indices) for every query chunk and member.
+
+    Members sharing a feature subset reuse one distance matrix per chunk and
+    only gather their own reference columns from it.
+    """
+    n_ref = len(artifact.y_ref)
+    squared_distances = _squared_distances_uint8 if _is_uint8(artifact) else _squared_distances_float
+    groups = {}
+    for m, (rows, cols) in enumerate(members):
+        groups.setdefault(cols, []).append(m)
+
+    n_queries = X_scaled.shape[0]
+    chunk = max(1, _MAX_DISTANCE_CELLS // max(n_ref, _UINT8_LEVELS * X_scaled.shape[1]))
+    state = {}
+    for start in range(0, n_queries, chunk):
+        q = X_scaled[start:start + chunk]
+        for cols, positions in groups.items():
+            sq_all = squared_distances(artifact, q, state, cols)
+            for m in positions:
+                rows = members[m][0]
+                sq = sq_all if rows is None else sq_all[:, rows]
+                yield slice(start, start + len(q)), m, *_nearest(artifact, q, sq, min(k, sq.shape[1]), rows, cols)
+
+
+def kneighbors(artifact, X_scaled, n_neighbors=None, member=None):
+    """Return (distances, indices) of the nearest reference rows, sorted by distance.
+
+    Equidistant reference rows (the dataset has many exact duplicates) are
+    taken in index order, so results are deterministic where sklearn's
+    KD-tree order is arbitrary (see the module docstring). For an ensemble artifact, member selects
+    whose reference rows and features are searched.
+    """
+    X_scaled = _as_batch(X_scaled)
+    k = n_neighbors or artifact.header["params"]["n_neighbors"]
+    members = _members(artifact)
+    if member is None and len(members) > 1:
+        raise ValueError("Artifact ensemble: tentukan member yang dicari")
+    rows, cols = members[member or 0]
+    k = min(k, len(artifact.y_ref) if rows is None else len(rows))
+
+    n_queries = X_scaled.shape[0]
+    distances = np.empty((n_queries, k))
+    indices = np.empty((n_queries, k), dtype=np.intp)
+    for chunk, _, dist, idx in _search(artifact, X_scaled, k, [(rows, cols)]):
+        distances[chunk] = dist
+        indices[chunk] = idx
+    return distances, indices
+
+
+def _neighbor_weights(distances, weights):
+    """Mirror sklearn's weighting, including exact matches at distance 0"""
+    if weights == "uniform":
+        return np.ones_like(distances)
+    with np.errstate(divide="ignore"):
+        w = 1.0 / distances
+    inf_mask = np.isinf(w)
+    inf_row = inf_mask.any(axis=1)
+    w[inf_row] = inf_mask[inf_row]
+    return w
+
+
+def predict_proba(artifact, X):
+    """Class probabilities for raw scores, columns ordered like artifact.classes"""
+    return predict_proba_scaled(artifact, transform(artifact, X))
+
+
+def predict_proba_scaled(artifact, X_scaled):
+    """predict_proba for rows already standardized with transform().
+
+    For an ensemble artifact this is the mean of the member probabilities,
+    computed for the whole batch in this one call.
+    """
+    X_scaled = _as_batch(X_scaled)
+    params = artifact.header["params"]
+    members = _members(artifact)
+    n_classes = len(artifact.classes)
+    proba = np.zeros((len(X_scaled), n_classes))
+    for chunk, _, distances, indices in _search(artifact, X_scaled, params["n_neighbors"], members):
+        w = _neighbor_weights(distances, params["weights"])
+        neighbor_labels = artifact.y_ref[indices]
+
+        votes = np.zeros((len(indices), n_classes))
+        rows = np.repeat(np.arange(len(indices)), indices.shape[1])
+        np.add.at(votes, (rows, neighbor_labels.ravel()), w.ravel())
+        normalizer = votes.sum(axis=1, keepdims=True)
+        normalizer[normalizer == 0.0] = 1.0
+        proba[chunk] += votes / normalizer
+    if len(members) > 1:
+        proba /= len(members)
+    return proba
+
+
+def predict(artifact, X):
+    """Encoded class predictions (same values as knn.predict)"""
+    return np.argmax(predict_proba(artifact, X), axis=1)
+
+
+def predict_labels(artifact, X):
+    """Decoded career names (same values as le.inverse_transform(knn.predict(...)))"""
+    return artifact.classes[predict(artifact, X)]
@@ -0,0 +1,159 @@
+"""Bagged KNN ensemble for train_knn_model.py (``--ensemble N``).
+
+Each of the N members is a ``KNeighborsClassifier`` fitted on one bootstrap
+sample of the training rows, optionally restricted to a random subset of
+``max_features`` features. Rows drawn more than once are kept once (a copy
+would only add a second neighbour at the same distance), so a member sees
+about 63% of the rows and the tie handling of knn_engine stays the same as
+for the single model.
+
+Members are fitted in worker processes (``workers``); each worker also
+predicts the rows its member did not see, so the out-of-bag accuracy comes
+from the training rows themselves, without a separate holdout pass. Work per
+member is the same, so wall time scales with the number of cores up to N.
+
+The ensemble predicts the mean of the member probabilities (soft voting,
+like sklearn's ``BaggingClassifier``). For serving it is not exported as N
+models: the artifact stores the training rows once plus each member's row
+indices and feature mask (model_artifact.py), and ``knn_engine`` evaluates
+every member for a whole batch in one ``predict_proba`` call.
+"""
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+MemberResult = namedtuple("MemberResult", ["knn", "oob_rows", "oob_proba", "seconds"])
+
+_X = None
+_y = None
+
+
+def _init_worker(X, y):
+    global _X, _y
+    _X, _y = X, y
+
+
+def draw_members(n_rows, n_features, n_estimators, max_features=None, random_state=42):
+    """(row indices, feature indices) per member: distinct rows of a bootstrap sample, sorted"""
+    rng = np.random.default_rng(random_state)
+    max_features = min(max_features or n_features, n_features)
+    members = []
+    for _ in range(n_estimators):
+        rows = np.unique(rng.integers(0, n_rows, n_rows))
+        features = np.arange(n_features) if max_features == n_features else \
+            np.sort(rng.choice(n_features, max_features, replace=False))
+        members.append((rows, features))
+    return members
+
+
+def _member_proba(knn, X, n_classes):
+    # Kelas yang tidak ada di sampel bootstrap anggota ini mendapat probabilitas 0
+    proba = np.zeros((len(X), n_classes))
+    proba[:, knn.classes_] = knn.predict_proba(X)
+    return proba
+
+
+def fit_member(rows, features, n_neighbors, weights, n_classes):
+    """Fit one member and predict its out-of-bag rows (runs in a worker)"""
+    from sklearn.neighbors import KNeighborsClassifier
+
+    start = time.perf_counter()
+    knn = KNeighborsClassifier(n_neighbors=min(n_neighbors, len(rows)), weights=weights)
+    knn.fit(_X[rows][:, features], _y[rows])
+    oob_rows = np.setdiff1d(np.arange(len(_y)), rows, assume_unique=True)
+    oob_proba = _member_proba(knn, _X[oob_rows][:, features], n_classes)
+    return MemberResult(knn, oob_rows, oob_proba, time.perf_counter() - start)
+
+
+class KNNEnsemble:
+    """Soft-voting ensemble of KNN members over row/feature subsets of one training set"""
+
+    def __init__(self, members, rows, features, n_neighbors, weights, n_classes):
+        self.members = members
+        self.rows = rows
+        self.features = features
+        self.n_neighbors = n_neighbors
+        self.weights = weights
+        self.n_classes = n_classes
+        self.classes_ = np.arange(n_classes)
+
+    @property
+    def n_estimators(self):
+        return len(self.members)
+
+    def predict_proba(self, X):
+        X = np.asarray(X)
+        proba = np.zeros((len(X), self.n_classes))
+        for knn, features in zip(self.members, self.features):
+            proba += _member_proba(knn, X[:, features], self.n_classes)
+        return proba / len(self.members)
+
+    def predict(self, X):
+        return np.argmax(self.predict_proba(X), axis=1)
+
+    def kneighbors(self, X, n_neighbors=None):
+        """Per-member (distances, indices into the training rows), shape (n_members, n, k)"""
+        X = np.asarray(X)
+        results = [knn.kneighbors(X[:, features], n_neighbors=n_neighbors)
+                   for knn, features in zip(self.members, self.features)]
+        distances = np.stack([d for d, _ in results])
+        indices = np.stack([rows[i] for (_, i), rows in zip(results, self.rows)])
+        return distances, indices
+
+    def refit(self, X, y):
+        """Same members (rows, features, parameters) fitted on another version of the training rows"""
+        from sklearn.neighbors import KNeighborsClassifier
+
+        members = [KNeighborsClassifier(n_neighbors=knn.n_neighbors, weights=self.weights).fit(X[rows][:, features], y[rows])
+                   for knn, rows, features in zip(self.members, self.rows, self.features)]
+        return KNNEnsemble(members, self.rows, self.features, self.n_neighbors, self.weights, self.n_classes)
+
+
+def fit_ensemble(X, y, n_estimators=10, n_neighbors=5, weights="distance", max_features=None, workers=1,
+                 random_state=42):
+    """Fit n_estimators members in parallel and return the KNNEnsemble.
+
+    Its ``oob_`` dict holds the out-of-bag accuracy and confusion matrix over
+    the training rows that at least one member did not see ("coverage").
+    """
+    X = np.asarray(X, dtype=np.float64)
+    y = np.asarray(y, dtype=np.intp)
+    n_classes = int(y.max()) + 1
+    members = draw_members(len(y), X.shape[1], n_estimators, max_features, random_state)
+    tasks = [(rows, features, n_neighbors, weights, n_classes) for rows, features in members]
+
+    start = time.perf_counter()
+    if workers <= 1:
+        _init_worker(X, y)
+        results = [fit_member(*task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(X, y)) as pool:
+            results = list(pool.map(fit_member, *zip(*tasks)))
+    seconds = time.perf_counter() - start
+
+    # Prediksi out-of-bag: rata-rata probabilitas dari anggota yang tidak melihat baris tersebut
+    oob_sum = np.zeros((len(y), n_classes))
+    oob_votes = np.zeros(len(y), dtype=np.int64)
+    for result in results:
+        oob_sum[result.oob_rows] += result.oob_proba
+        oob_votes[result.oob_rows] += 1
+    covered = oob_votes > 0
+    oob_pred = np.argmax(oob_sum[covered], axis=1)
+    confusion = np.bincount(y[covered] * n_classes + oob_pred, minlength=n_classes * n_classes).reshape(n_classes, n_classes)
+
+    ensemble = KNNEnsemble([r.knn for r in results], [rows for rows, _ in members], [f for _, f in members],
+                           n_neighbors, weights, n_classes)
+    ensemble.oob_ = {
+        "n_estimators": n_estimators,
+        "max_features": int(len(members[0][1])),
+        "rows_per_member": float(np.mean([len(rows) for rows, _ in members])),
+        "oob_accuracy": float(np.trace(confusion) / max(confusion.sum(), 1)),
+        "oob_coverage": float(covered.mean()),
+        "oob_confusion_matrix": confusion,
+        "workers": workers,
+        "fit_seconds": seconds,
+        "member_seconds": float(sum(r.seconds for r in results)),
+    }
+    return ensemble
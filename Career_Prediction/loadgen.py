@@ -0,0 +1,127 @@
+"""Load generator for serve.py: p50/p99 latency and throughput per concurrency level.
+
+Every virtual client keeps one keep-alive connection and sends /predict
+requests back to back with random scores.
+
+Contoh:
+    python loadgen.py --start-server --concurrency 1 8 32 128 --requests 2000
+    python loadgen.py --port 8080 --concurrency 16
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+FEATURE_COLUMNS = ['tech_score', 'soft_score', 'sjt_score', 'personality_score']
+
+
+async def _request(reader, writer, host, method, path, body=b""):
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n\r\n".encode("latin-1") + body
+    )
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.strip().lower() == "content-length":
+            length = int(value)
+    return status, await reader.readexactly(length)
+
+
+async def _client(host, port, n_requests, latencies, rng):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for _ in range(n_requests):
+            body = json.dumps({name: rng.uniform(0, 100) for name in FEATURE_COLUMNS}).encode("utf-8")
+            start = time.perf_counter()
+            status, _ = await _request(reader, writer, host, "POST", "/predict", body)
+            if status != 200:
+                raise RuntimeError(f"/predict mengembalikan status {status}")
+            latencies.append(time.perf_counter() - start)
+    finally:
+        writer.close()
+
+
+async def run_level(host, port, concurrency, total_requests, seed=0):
+    """Run one concurrency level and return (p50_ms, p99_ms, requests_per_sec)"""
+    latencies = []
+    per_client = max(1, total_requests // concurrency)
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        _client(host, port, per_client, latencies, random.Random(seed + i)) for i in range(concurrency)
+    ))
+    elapsed = time.perf_counter() - start
+    latencies_ms = np.array(latencies) * 1000
+    return float(np.percentile(latencies_ms, 50)), float(np.percentile(latencies_ms, 99)), len(latencies) / elapsed
+
+
+async def wait_ready(host, port, timeout=60.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            reader, writer = await asyncio.open_connection(host, port)
+            try:
+                status, _ = await _request(reader, writer, host, "GET", "/readyz")
+            finally:
+                writer.close()
+            if status == 200:
+                return
+        except (ConnectionError, OSError):
+            pass
+        await asyncio.sleep(0.1)
+    raise TimeoutError(f"Server {host}:{port} tidak siap dalam {timeout:.0f} detik")
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def main_async(args):
+    await wait_ready(args.host, args.port)
+    print(f"{'concurrency':>11} {'p50 (ms)':>10} {'p99 (ms)':>10} {'req/detik':>12}")
+    for concurrency in args.concurrency:
+        p50, p99, throughput = await run_level(args.host, args.port, concurrency, args.requests)
+        print(f"{concurrency:>11} {p50:>10.2f} {p99:>10.2f} {throughput:>12,.0f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load generator untuk serve.py")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32, 128],
+                        help="Daftar level concurrency yang diuji (default: 1 8 32 128)")
+    parser.add_argument("--requests", type=int, default=2000, help="Jumlah request per level (default: 2000)")
+    parser.add_argument("--start-server", action="store_true",
+                        help="Jalankan serve.py di port bebas localhost selama pengujian")
+    parser.add_argument("--server-args", default="", help="Argumen tambahan untuk serve.py, mis. '--max-batch-size 32'")
+    args = parser.parse_args(argv)
+
+    server = None
+    if args.start_server:
+        args.port = _free_port()
+        server = subprocess.Popen([sys.executable, "serve.py", "--host", args.host, "--port", str(args.port),
+                                   *args.server_args.split()], cwd=os.path.dirname(os.path.abspath(__file__)))
+    try:
+        asyncio.run(main_async(args))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
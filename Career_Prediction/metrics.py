@@ -0,0 +1,223 @@
+"""Lightweight in-process metrics exported in the Prometheus text format.
+
+Disabled unless one of these environment variables is set (the serving
+script can also call ``enable()``):
+
+    CAREER_METRICS=1            collect metrics in this process
+    CAREER_METRICS_FILE=path    also rewrite this file every few seconds
+                                (e.g. for node_exporter's textfile collector)
+    CAREER_METRICS_PORT=9108    also serve GET /metrics on this port
+    CAREER_METRICS_HOST=0.0.0.0 interface for that port; the default
+                                127.0.0.1 keeps it reachable only locally
+
+When disabled, ``timer()`` returns a shared no-op context manager and
+``inc()`` returns immediately, so instrumented code pays about one function
+call. Only the standard library is imported, so the quiz pages stay light.
+
+Contoh:
+    CAREER_METRICS_PORT=9108 streamlit run app.py
+    curl localhost:9108/metrics
+"""
+import os
+import threading
+import time
+
+# Nama metric -> (tipe Prometheus, deskripsi)
+METRICS = {
+    "career_model_stage_seconds": ("histogram", "Duration of one prediction stage (load, lookup, scale, neighbors, decode)"),
+    "career_predictions_total": ("counter", "Career predictions by the path that produced them"),
+    "career_prediction_fallbacks_total": ("counter", "Rule-based fallback predictions by reason"),
+    "career_page_render_seconds": ("histogram", "Duration of one Streamlit rerun per page"),
+    "career_serve_batches_total": ("counter", "Micro-batches executed by serve.py"),
+    "career_serve_batch_rows_total": ("counter", "Rows predicted by serve.py micro-batches"),
+}
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+EXPORT_INTERVAL_SECONDS = 5.0
+# Endpoint hanya lokal kecuali host lain diminta secara eksplisit
+DEFAULT_HTTP_HOST = "127.0.0.1"
+
+_lock = threading.Lock()
+_counters = {}
+_histograms = {} # key -> [bucket counts..., count, sum]
+_enabled = False
+_exporters_started = False
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class _Timer:
+    __slots__ = ("key", "start")
+
+    def __init__(self, key):
+        self.key = key
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        # Tetap dicatat saat ada exception (mis. st.rerun() di tengah halaman)
+        _observe(self.key, time.perf_counter() - self.start)
+        return False
+
+
+def _key(name, labels):
+    return name, tuple(sorted(labels.items()))
+
+
+def _observe(key, seconds):
+    with _lock:
+        values = _histograms.get(key)
+        if values is None:
+            values = _histograms[key] = [0] * (len(BUCKETS) + 1) + [0.0]
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                values[i] += 1
+        values[-2] += 1
+        values[-1] += seconds
+
+
+def enabled():
+    return _enabled
+
+
+def timer(name, **labels):
+    """Context manager recording its duration in histogram ``name`` (no-op when disabled)"""
+    if not _enabled:
+        return _NULL_TIMER
+    return _Timer(_key(name, labels))
+
+
+def observe(name, seconds, **labels):
+    """Record one duration in histogram ``name``"""
+    if _enabled:
+        _observe(_key(name, labels), seconds)
+
+
+def inc(name, amount=1, **labels):
+    """Add amount to counter ``name``"""
+    if not _enabled:
+        return
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + amount
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels) + "}"
+
+
+def render():
+    """All collected metrics in the Prometheus text exposition format (version 0.0.4)"""
+    with _lock:
+        counters = dict(_counters)
+        histograms = {key: list(values) for key, values in _histograms.items()}
+
+    lines = []
+    for name, (kind, description) in METRICS.items():
+        series = counters if kind == "counter" else histograms
+        keys = sorted(key for key in series if key[0] == name)
+        if not keys:
+            continue
+        lines += [f"# HELP {name} {description}", f"# TYPE {name} {kind}"]
+        for key in keys:
+            labels = key[1]
+            if kind == "counter":
+                lines.append(f"{name}{_format_labels(labels)} {series[key]}")
+                continue
+            values = series[key]
+            for bound, count in zip(BUCKETS, values):
+                lines.append(f"{name}_bucket{_format_labels(labels + (('le', repr(bound)),))} {count}")
+            lines.append(f"{name}_bucket{_format_labels(labels + (('le', '+Inf'),))} {values[-2]}")
+            lines.append(f"{name}_count{_format_labels(labels)} {values[-2]}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {values[-1]!r}")
+    return "\n".join(lines) + "\n"
+
+
+def write_textfile(path):
+    """Atomically replace path with the current metrics"""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(render())
+    os.replace(tmp_path, path)
+
+
+def _export_loop(path, interval):
+    while True:
+        time.sleep(interval)
+        try:
+            write_textfile(path)
+        except OSError:
+            pass # Folder tujuan belum ada / tidak bisa ditulis: coba lagi di interval berikutnya
+
+
+def start_http_server(port, host=DEFAULT_HTTP_HOST):
+    """Serve GET /metrics from a daemon thread; returns the server"""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?", 1)[0] != "/metrics":
+                self.send_error(404)
+                return
+            data = render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
+
+
+def enable(textfile=None, port=None, host=DEFAULT_HTTP_HOST):
+    """Turn collection on and start the requested exporters (once per process)"""
+    global _enabled, _exporters_started
+    with _lock:
+        _enabled = True
+        if _exporters_started or not (textfile or port):
+            return
+        _exporters_started = True
+    if textfile:
+        threading.Thread(target=_export_loop, args=(textfile, EXPORT_INTERVAL_SECONDS),
+                         name="metrics-textfile", daemon=True).start()
+    if port:
+        try:
+            start_http_server(int(port), host)
+        except OSError:
+            pass # Port sudah dipakai proses lain (mis. server Streamlit kedua)
+
+
+def reset():
+    """Drop every collected value"""
+    with _lock:
+        _counters.clear()
+        _histograms.clear()
+
+
+_textfile = os.environ.get("CAREER_METRICS_FILE")
+_port = os.environ.get("CAREER_METRICS_PORT")
+if os.environ.get("CAREER_METRICS", "") not in ("", "0") or _textfile or _port:
+    enable(_textfile, _port, os.environ.get("CAREER_METRICS_HOST") or DEFAULT_HTTP_HOST)
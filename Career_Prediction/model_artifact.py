@@ -0,0 +1,200 @@
+"""Single-file, memory-mappable KNN model artifact.
+
+Layout (little-endian)::
+
+    magic (8 bytes) | format version (uint32) | header length (uint32)
+    JSON header, padded to ALIGN bytes
+    payload sections, each starting on an ALIGN-byte boundary
+
+The JSON header holds the class names, the KNN parameters, the offset /
+dtype / shape of every array section and a SHA-256 of the model: the
+canonical JSON of the header fields that change predictions (classes,
+params, quantization, ensemble, layout) followed by the payload, so two
+models that differ only in e.g. ``n_neighbors`` get different hashes (format
+versions before 4 hash the payload only). Arrays are opened with ``mmap`` so
+every process on a host shares the same physical pages.
+
+The reference matrix is float32 by default. With ``quantize`` it is stored
+as float16, or as uint8 codes with a per-feature scale and offset derived
+from the scaler: the codes cover the raw score range [0, 100] in 255 steps,
+so ``X_scaled = code * scale + offset``. knn_engine computes distances on the
+codes directly (see ``header["quantization"]``).
+
+A bagged ensemble (knn_ensemble.py) stores the reference matrix once plus,
+per member, its row indices into ``X_ref`` (``member_rows`` sliced by
+``member_offsets``) and a feature mask (``member_features``); see
+``header["ensemble"]``.
+"""
+import hashlib
+import json
+import mmap
+import os
+import struct
+from collections import namedtuple
+
+import numpy as np
+
+MAGIC = b"KNNART\x00\x00"
+FORMAT_VERSION = 4
+# Versi 1: tanpa kuantisasi; versi 2: tanpa ensemble; versi 3: sha256 hanya atas payload
+SUPPORTED_VERSIONS = (1, 2, 3, 4)
+# Field header yang ikut di-hash mulai versi 4 (semua yang memengaruhi prediksi)
+HASHED_HEADER_FIELDS = ("feature_names", "classes", "params", "quantization", "ensemble", "sections")
+ALIGN = 64
+_PREAMBLE = struct.Struct("<8sII")
+
+FEATURE_NAMES = ['tech_score', 'soft_score', 'sjt_score', 'personality_score']
+
+QUANTIZATIONS = ("float16", "uint8")
+SCORE_RANGE = (0.0, 100.0)
+UINT8_LEVELS = 255
+
+KNNArtifact = namedtuple("KNNArtifact", ["header", "scaler_mean", "scaler_scale", "X_ref", "y_ref", "classes",
+                                         "member_rows", "member_offsets", "member_features"],
+                         defaults=(None, None, None))
+
+
+def _padding(length):
+    return (-length) % ALIGN
+
+
+def _model_digest(header, version=FORMAT_VERSION):
+    """sha256 object primed with the hashed header fields; the payload sections are added after it"""
+    digest = hashlib.sha256()
+    if version >= 4:
+        fields = {name: header.get(name) for name in HASHED_HEADER_FIELDS}
+        digest.update(json.dumps(fields, sort_keys=True).encode("utf-8"))
+    return digest
+
+
+def uint8_quantization(scaler_mean, scaler_scale):
+    """Per-feature (scale, offset) mapping uint8 codes 0..255 onto raw scores 0..100 in scaled space"""
+    scaler_mean = np.asarray(scaler_mean, dtype=np.float64)
+    scaler_scale = np.asarray(scaler_scale, dtype=np.float64)
+    low, high = SCORE_RANGE
+    return (high - low) / UINT8_LEVELS / scaler_scale, (low - scaler_mean) / scaler_scale
+
+
+def quantize_reference(X_ref, scaler_mean, scaler_scale, quantize=None):
+    """Return (stored X_ref array, quantization header entry or None)"""
+    if quantize is None:
+        return np.ascontiguousarray(X_ref, dtype="<f4"), None
+    if quantize == "float16":
+        return np.ascontiguousarray(X_ref, dtype="<f2"), {"dtype": "float16"}
+    if quantize == "uint8":
+        scale, offset = uint8_quantization(scaler_mean, scaler_scale)
+        codes = np.clip(np.rint((np.asarray(X_ref, dtype=np.float64) - offset) / scale), 0, UINT8_LEVELS)
+        return np.ascontiguousarray(codes, dtype="u1"), {"dtype": "uint8", "scale": scale.tolist(), "offset": offset.tolist()}
+    raise ValueError(f"Kuantisasi tidak dikenal: {quantize} (pilih {', '.join(QUANTIZATIONS)})")
+
+
+def dequantize_reference(X_stored, quantization=None):
+    """Stored reference rows (see quantize_reference) as float64 in scaled space"""
+    if quantization and quantization["dtype"] == "uint8":
+        return X_stored * np.array(quantization["scale"]) + np.array(quantization["offset"])
+    return np.asarray(X_stored).astype(np.float64)
+
+
+def dequantize(artifact, rows=None):
+    """Reference rows (all, or the given index array) as float64 in scaled space"""
+    X = artifact.X_ref if rows is None else artifact.X_ref[rows]
+    return dequantize_reference(X, artifact.header.get("quantization"))
+
+
+def write_artifact(path, scaler_mean, scaler_scale, X_ref, y_ref, classes, quantize=None, members=None, **params):
+    """Write the fused artifact atomically; extra keyword arguments are stored as KNN params.
+
+    members: optional list of (row indices, feature indices) of ensemble members over X_ref.
+    """
+    X_stored, quantization = quantize_reference(X_ref, scaler_mean, scaler_scale, quantize)
+    sections = {
+        "scaler_mean": np.ascontiguousarray(scaler_mean, dtype="<f8"),
+        "scaler_scale": np.ascontiguousarray(scaler_scale, dtype="<f8"),
+        "X_ref": X_stored,
+        "y_ref": np.ascontiguousarray(y_ref, dtype="<i4"),
+    }
+    ensemble = None
+    if members:
+        n_features = X_stored.shape[1]
+        feature_mask = np.zeros((len(members), n_features), dtype="u1")
+        for m, (_, features) in enumerate(members):
+            feature_mask[m, features] = 1
+        sections["member_rows"] = np.ascontiguousarray(np.concatenate([rows for rows, _ in members]), dtype="<i4")
+        sections["member_offsets"] = np.cumsum([0] + [len(rows) for rows, _ in members], dtype="<i8")
+        sections["member_features"] = feature_mask
+        ensemble = {"n_members": len(members)}
+
+    # Offset relatif terhadap awal payload; dihitung dulu agar header bisa ditulis sekali
+    layout = {}
+    offset = 0
+    for name, array in sections.items():
+        layout[name] = {"offset": offset, "dtype": array.dtype.str, "shape": list(array.shape)}
+        offset += array.nbytes + _padding(array.nbytes)
+
+    header = {
+        "format_version": FORMAT_VERSION,
+        "feature_names": FEATURE_NAMES,
+        "classes": [str(c) for c in classes],
+        "params": params,
+        "quantization": quantization,
+        "ensemble": ensemble,
+        "sections": layout,
+    }
+    # Round-trip JSON agar field yang di-hash sama persis dengan yang dibaca open_artifact
+    digest = _model_digest(json.loads(json.dumps(header)))
+    for array in sections.values():
+        digest.update(memoryview(array).cast("B")) # Tanpa salinan, X_ref bisa berupa memmap besar
+    header["sha256"] = digest.hexdigest()
+    header_bytes = json.dumps(header, sort_keys=True).encode("utf-8")
+    header_bytes += b" " * _padding(_PREAMBLE.size + len(header_bytes))
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_PREAMBLE.pack(MAGIC, FORMAT_VERSION, len(header_bytes)))
+        f.write(header_bytes)
+        for array in sections.values():
+            f.write(memoryview(array).cast("B"))
+            f.write(b"\x00" * _padding(array.nbytes))
+    os.replace(tmp_path, path)
+    return header
+
+
+def open_artifact(path, verify=False):
+    """Memory-map an artifact written by write_artifact and return read-only array views"""
+    with open(path, "rb") as f:
+        buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    magic, version, header_len = _PREAMBLE.unpack_from(buf, 0)
+    if magic != MAGIC:
+        raise ValueError(f"{path} bukan artifact KNN (magic tidak cocok)")
+    if version not in SUPPORTED_VERSIONS:
+        raise ValueError(f"Versi format artifact {version} tidak didukung (harus salah satu dari {SUPPORTED_VERSIONS})")
+
+    header = json.loads(bytes(buf[_PREAMBLE.size:_PREAMBLE.size + header_len]))
+    payload_start = _PREAMBLE.size + header_len
+
+    arrays = {}
+    digest = _model_digest(header, version)
+    # Urutkan per offset agar hash dihitung dengan urutan yang sama seperti saat ditulis
+    for name, spec in sorted(header["sections"].items(), key=lambda item: item[1]["offset"]):
+        dtype = np.dtype(spec["dtype"])
+        count = int(np.prod(spec["shape"], dtype=np.int64))
+        array = np.frombuffer(buf, dtype=dtype, count=count, offset=payload_start + spec["offset"])
+        arrays[name] = array.reshape(spec["shape"])
+        if verify:
+            digest.update(memoryview(array).cast("B"))
+
+    if verify and digest.hexdigest() != header["sha256"]:
+        raise ValueError(f"Hash artifact {path} tidak cocok, file mungkin rusak")
+
+    return KNNArtifact(
+        header=header,
+        scaler_mean=arrays["scaler_mean"],
+        scaler_scale=arrays["scaler_scale"],
+        X_ref=arrays["X_ref"],
+        y_ref=arrays["y_ref"],
+        classes=np.array(header["classes"]),
+        member_rows=arrays.get("member_rows"),
+        member_offsets=arrays.get("member_offsets"),
+        member_features=arrays.get("member_features"),
+    )
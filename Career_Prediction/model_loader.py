@@ -0,0 +1,125 @@
+"""Process-wide cache for the trained KNN model artifacts.
+
+Streamlit re-executes ``app.py`` on every interaction, but imported modules
+stay in ``sys.modules``, so the bundle cached here is shared by every session
+of the server process. ``models/`` is resolved through the registry pointer
+(model_registry.py) on each call, so a newly promoted version is picked up
+without restarting the server, and the files of one call always come from
+one immutable version directory. A flat ``models/`` folder without the
+pointer (older trainings) is still read directly, with file mtimes checked
+on each call.
+"""
+import hashlib
+import os
+import threading
+from collections import namedtuple
+
+from model_artifact import open_artifact
+from model_registry import current_version, resolve_models_dir
+from prediction_table import TABLE_FILE, ensure_table
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+MODELS_DIR = os.path.join(BASE_DIR, "models")
+
+# Nama file sama dengan yang ditulis oleh train_knn_model.py
+MODEL_FILES = ("knn_model.joblib", "label_encoder.joblib", "scaler.joblib")
+ARTIFACT_FILE = "knn_model.bin"
+EVALUATION_FILE = "model_evaluation.json"
+
+ModelBundle = namedtuple("ModelBundle", ["knn", "le", "scaler", "mtimes"])
+
+_lock = threading.RLock()
+_cache = {}
+
+
+def _artifact_mtimes(paths):
+    """Return the mtimes of the given files (raises FileNotFoundError if one is missing)"""
+    return tuple(os.stat(path).st_mtime_ns for path in paths)
+
+
+def _cached_load(key, paths, load):
+    """Call load(mtimes) once per set of files and mtimes and share the result process-wide"""
+    paths = tuple(paths)
+    mtimes = _artifact_mtimes(paths)
+    entry = _cache.get(key)
+    if entry is not None and entry[0] == (paths, mtimes):
+        return entry[1]
+
+    with _lock:
+        entry = _cache.get(key)
+        if entry is not None and entry[0] == (paths, mtimes):
+            return entry[1]
+
+        while True:
+            value = load(mtimes)
+            # Jika training menimpa file saat sedang dibaca, ulangi agar tidak tercampur versi
+            loaded_mtimes = _artifact_mtimes(paths)
+            if loaded_mtimes == mtimes:
+                break
+            mtimes = loaded_mtimes
+
+        _cache[key] = ((paths, mtimes), value)
+        return value
+
+
+def load_model_bundle(models_dir=MODELS_DIR):
+    """Return the cached (knn, le, scaler) bundle, reloading it only when a file changed"""
+    import joblib # Hanya jalur joblib yang butuh (dan ikut memuat) sklearn
+
+    paths = [os.path.join(resolve_models_dir(models_dir), name) for name in MODEL_FILES]
+
+    def load(mtimes):
+        knn, le, scaler = (joblib.load(path) for path in paths)
+        return ModelBundle(knn=knn, le=le, scaler=scaler, mtimes=mtimes)
+
+    return _cached_load(("bundle", models_dir), paths, load)
+
+
+def _artifact_in(models_dir, version_dir):
+    path = os.path.join(version_dir, ARTIFACT_FILE)
+    return _cached_load(("artifact", models_dir), [path], lambda mtimes: open_artifact(path))
+
+
+def load_knn_artifact(models_dir=MODELS_DIR):
+    """Return the memory-mapped fused artifact, reopening it only when the file changed"""
+    return _artifact_in(models_dir, resolve_models_dir(models_dir))
+
+
+def load_prediction_table(models_dir=MODELS_DIR):
+    """Return the score lookup table for the current artifact, rebuilding it if stale"""
+    version_dir = resolve_models_dir(models_dir)
+    artifact_path = os.path.join(version_dir, ARTIFACT_FILE)
+    table_path = os.path.join(version_dir, TABLE_FILE)
+    return _cached_load(
+        ("table", models_dir), [artifact_path],
+        # Artifact dari direktori versi yang sama dengan tabel, walau CURRENT berganti di tengah jalan
+        lambda mtimes: ensure_table(_artifact_in(models_dir, version_dir), table_path),
+    )
+
+
+def model_version(models_dir=MODELS_DIR):
+    """Registry version currently served from models_dir (short content hash for the flat layout)"""
+    version = current_version(models_dir)
+    if version is not None:
+        return version
+    try:
+        return load_knn_artifact(models_dir).header["sha256"][:12]
+    except FileNotFoundError:
+        pass
+    # Model lama tanpa artifact gabungan: hash isi ketiga file joblib
+    paths = [os.path.join(resolve_models_dir(models_dir), name) for name in MODEL_FILES]
+
+    def load(mtimes):
+        digest = hashlib.sha256()
+        for path in paths:
+            with open(path, "rb") as f:
+                digest.update(f.read())
+        return digest.hexdigest()[:12]
+
+    return _cached_load(("version", models_dir), paths, load)
+
+
+def clear_cache():
+    """Drop every cached entry so the next call reloads from disk"""
+    with _lock:
+        _cache.clear()
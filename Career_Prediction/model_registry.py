@@ -0,0 +1,355 @@
+"""Versioned registry of trained models under models/.
+
+Layout::
+
+    models/
+        CURRENT                         {"version": ..., "previous": ..., "promoted_at": ...}
+        versions/
+            20261017-014038-c76ca0d96962/
+                knn_model.bin  knn_model.joblib  label_encoder.joblib  scaler.joblib
+                prediction_table.npz  model_evaluation.json  ...  manifest.json
+            .staging-<pid>-<time>/      training output in progress (never read)
+
+train_knn_model.py exports into a staging directory, writes manifest.json
+(SHA-256 and size of every file, dataset hash, metrics and training params)
+last and renames the directory into versions/, so a version directory is
+either complete or absent and is not modified afterwards. A version name
+already taken (two publishes of the same files within one second) gets a
+"-2", "-3", ... suffix instead of replacing that version. Promotion checks
+the files against the manifest, warms the version (opens the artifact and
+loads its prediction table, pulling the files into the OS page cache) and only
+then replaces CURRENT with ``os.replace``: readers see the old or the new
+version, never a mix. Rollback is the same swap back to ``previous``.
+
+update_model.py publishes versions the same way, adding new labelled rows to
+the active version without a full training run (manifest entry "update").
+
+model_loader.py resolves models/ through CURRENT; a models/ folder without
+CURRENT is read as the old flat layout.
+
+Contoh:
+    python model_registry.py list
+    python model_registry.py promote 20261017-014038-c76ca0d96962
+    python model_registry.py rollback
+    python model_registry.py verify
+    python model_registry.py gc --keep 5
+"""
+import argparse
+import hashlib
+import itertools
+import json
+import os
+import shutil
+import threading
+import time
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+MODELS_DIR = os.path.join(BASE_DIR, "models")
+
+POINTER_FILE = "CURRENT"
+VERSIONS_DIR = "versions"
+MANIFEST_FILE = "manifest.json"
+STAGING_PREFIX = ".staging-"
+# File turunan yang boleh dibangun ulang di dalam versi (tabel prediksi saat konfigurasi quiz berubah)
+DERIVED_FILES = ("prediction_table.npz",)
+
+_lock = threading.Lock()
+_pointer_cache = {}
+
+
+def _sha256(path, block_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _write_json_atomic(path, data):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def version_dir(models_dir, version):
+    return os.path.join(models_dir, VERSIONS_DIR, version)
+
+
+def read_pointer(models_dir=MODELS_DIR):
+    """Contents of models/CURRENT, or None for a flat (pre-registry) models folder"""
+    path = os.path.join(models_dir, POINTER_FILE)
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    # CURRENT selalu diganti dengan os.replace (inode baru), jadi inode + mtime cukup sebagai kunci cache
+    stamp = (stat.st_ino, stat.st_mtime_ns)
+    entry = _pointer_cache.get(models_dir)
+    if entry is not None and entry[0] == stamp:
+        return entry[1]
+    with open(path, encoding="utf-8") as f:
+        pointer = json.load(f)
+    _pointer_cache[models_dir] = (stamp, pointer)
+    return pointer
+
+
+def current_version(models_dir=MODELS_DIR):
+    pointer = read_pointer(models_dir)
+    return pointer["version"] if pointer else None
+
+
+def resolve_models_dir(models_dir=MODELS_DIR):
+    """Directory holding the files of the promoted version (models_dir itself for the flat layout)"""
+    version = current_version(models_dir)
+    if version is None:
+        return models_dir
+    path = version_dir(models_dir, version)
+    if not os.path.exists(os.path.join(path, MANIFEST_FILE)):
+        raise FileNotFoundError(f"Versi model {version} di {POINTER_FILE} tidak lengkap atau tidak ada")
+    return path
+
+
+def load_manifest(models_dir, version):
+    with open(os.path.join(version_dir(models_dir, version), MANIFEST_FILE), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def list_versions(models_dir=MODELS_DIR):
+    """Manifests of every complete version, oldest first (by publish time, not by name)"""
+    root = os.path.join(models_dir, VERSIONS_DIR)
+    if not os.path.isdir(root):
+        return []
+    manifests = []
+    for name in sorted(os.listdir(root)):
+        if name.startswith(STAGING_PREFIX) or not os.path.exists(os.path.join(root, name, MANIFEST_FILE)):
+            continue
+        manifests.append(load_manifest(models_dir, name))
+    # Nama versi hanya sampai detik; dalam satu detik urutan nama mengikuti hash. Manifest lama tanpa created_ns paling awal
+    return sorted(manifests, key=lambda manifest: (manifest.get("created_ns", 0), manifest["version"]))
+
+
+def new_staging_dir(models_dir=MODELS_DIR):
+    """Empty directory for a training run to export into (see publish)"""
+    path = os.path.join(models_dir, VERSIONS_DIR, f"{STAGING_PREFIX}{os.getpid()}-{time.time_ns()}")
+    os.makedirs(path)
+    return path
+
+
+def _metrics(evaluation):
+    metrics = {
+        "accuracy": evaluation.get("accuracy"),
+        "macro_f1": evaluation.get("macro_avg", {}).get("f1"),
+        "weighted_f1": evaluation.get("weighted_avg", {}).get("f1"),
+    }
+    if evaluation.get("ensemble"):
+        metrics["oob_accuracy"] = evaluation["ensemble"]["oob_accuracy"]
+    return metrics
+
+
+def publish(staging_dir, models_dir=MODELS_DIR, dataset_path=None, params=None, extra=None):
+    """Write the manifest of a finished export and move it into versions/; returns the version name.
+
+    extra: additional manifest entries, overriding the computed ones (e.g. the
+    "update" record and inherited "dataset" of an incremental update).
+    A dataset_path inside staging_dir is recorded at its path in the published version.
+    """
+    from model_loader import EVALUATION_FILE
+
+    files = {}
+    for name in sorted(os.listdir(staging_dir)):
+        path = os.path.join(staging_dir, name)
+        if name == MANIFEST_FILE or not os.path.isfile(path):
+            continue
+        files[name] = {"sha256": _sha256(path), "size": os.path.getsize(path)}
+    evaluation = {}
+    if EVALUATION_FILE in files:
+        with open(os.path.join(staging_dir, EVALUATION_FILE), encoding="utf-8") as f:
+            evaluation = json.load(f)
+
+    model_version = evaluation.get("model_version") or hashlib.sha256(
+        "".join(entry["sha256"] for entry in files.values()).encode("ascii")).hexdigest()[:12]
+    base_version = f"{time.strftime('%Y%m%d-%H%M%S')}-{model_version}"
+    manifest = {
+        "version": base_version,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "created_ns": time.time_ns(),
+        "model_version": model_version,
+        "parent": current_version(models_dir),
+        "files": files,
+        "derived": [name for name in DERIVED_FILES if name in files],
+        "dataset": {"path": os.path.abspath(dataset_path), "sha256": _sha256(dataset_path)} if dataset_path else None,
+        "metrics": _metrics(evaluation),
+        "params": params or {},
+        **(extra or {}),
+    }
+    for attempt in itertools.count(1):
+        version = base_version if attempt == 1 else f"{base_version}-{attempt}"
+        manifest["version"] = version
+        if dataset_path and os.path.dirname(os.path.abspath(dataset_path)) == os.path.abspath(staging_dir):
+            # Dataset yang diekspor bersama model (refit update_model.py) pindah bersama direktorinya
+            manifest["dataset"]["path"] = os.path.abspath(os.path.join(version_dir(models_dir, version),
+                                                                       os.path.basename(dataset_path)))
+        _write_json_atomic(os.path.join(staging_dir, MANIFEST_FILE), manifest)
+        # rename direktori bersifat atomik: versi lengkap atau tidak ada sama sekali.
+        # Nama yang sudah dipakai membuat rename gagal (direktori tujuan tidak kosong), tidak ditimpa
+        try:
+            os.rename(staging_dir, version_dir(models_dir, version))
+        except OSError:
+            if not os.path.exists(version_dir(models_dir, version)):
+                raise
+            continue
+        return version
+
+
+def verify(models_dir, version):
+    """List of problems (missing or changed files) of a version; empty when it matches its manifest"""
+    manifest = load_manifest(models_dir, version)
+    path = version_dir(models_dir, version)
+    problems = []
+    for name, entry in manifest["files"].items():
+        file_path = os.path.join(path, name)
+        if not os.path.exists(file_path):
+            problems.append(f"{name}: tidak ada")
+        elif name not in manifest.get("derived", ()) and _sha256(file_path) != entry["sha256"]:
+            problems.append(f"{name}: hash tidak cocok")
+    return problems
+
+
+def warm(models_dir, version):
+    """Open the version the way the app does (artifact and prediction table) before it is served"""
+    from model_loader import ARTIFACT_FILE, MODEL_FILES
+    from model_artifact import open_artifact
+    from prediction_table import TABLE_FILE, ensure_table
+
+    path = version_dir(models_dir, version)
+    artifact_path = os.path.join(path, ARTIFACT_FILE)
+    if os.path.exists(artifact_path):
+        artifact = open_artifact(artifact_path, verify=True) # Membaca seluruh file: halaman masuk page cache
+        ensure_table(artifact, os.path.join(path, TABLE_FILE))
+        return
+    import joblib
+    for name in MODEL_FILES:
+        joblib.load(os.path.join(path, name))
+
+
+def promote(models_dir, version, check=True):
+    """Verify and warm version, then atomically point CURRENT at it; returns the previous version"""
+    if not os.path.exists(os.path.join(version_dir(models_dir, version), MANIFEST_FILE)):
+        raise FileNotFoundError(f"Versi model {version} tidak ditemukan atau tidak lengkap")
+    if check:
+        problems = verify(models_dir, version)
+        if problems:
+            raise ValueError(f"Versi model {version} rusak: {'; '.join(problems)}")
+        warm(models_dir, version)
+    with _lock:
+        previous = current_version(models_dir)
+        if previous == version:
+            return previous
+        _write_json_atomic(os.path.join(models_dir, POINTER_FILE), {
+            "version": version,
+            "previous": previous,
+            "promoted_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        })
+    return previous
+
+
+def rollback(models_dir=MODELS_DIR):
+    """Point CURRENT back at the previously promoted version; returns that version"""
+    pointer = read_pointer(models_dir)
+    if not pointer or not pointer.get("previous"):
+        raise ValueError("Tidak ada versi sebelumnya untuk rollback")
+    promote(models_dir, pointer["previous"])
+    return pointer["previous"]
+
+
+def _referenced_version(models_dir, manifest):
+    """Version whose directory holds the dataset a manifest points at (refit_dataset.csv), or None"""
+    path = (manifest.get("dataset") or {}).get("path")
+    if not path:
+        return None
+    root = os.path.abspath(os.path.join(models_dir, VERSIONS_DIR))
+    parent = os.path.dirname(os.path.abspath(path))
+    return os.path.basename(parent) if os.path.dirname(parent) == root else None
+
+
+def gc(models_dir=MODELS_DIR, keep=5):
+    """Delete all but the newest keep versions; returns the removed names.
+
+    Never removes the current or previous version, nor a version whose dataset
+    file is still the training base of a surviving one (incremental versions
+    point at the refit_dataset.csv of their last full refit).
+    """
+    pointer = read_pointer(models_dir) or {}
+    protected = {pointer.get("version"), pointer.get("previous")}
+    manifests = {manifest["version"]: manifest for manifest in list_versions(models_dir)}
+    versions = list(manifests)
+    candidates = set(v for v in versions[:max(len(versions) - keep, 0)] if v not in protected)
+    while True:
+        # Versi yang tetap ada bisa merujuk dataset di versi kandidat: kandidat itu ikut dipertahankan
+        referenced = {_referenced_version(models_dir, manifests[v]) for v in versions if v not in candidates}
+        if not candidates & referenced:
+            break
+        candidates -= referenced
+    removed = [v for v in versions if v in candidates]
+    for version in removed:
+        shutil.rmtree(version_dir(models_dir, version))
+    return removed
+
+
+def _update_note(update):
+    if not update:
+        return ""
+    if update["type"] == "incremental":
+        return f"  +{update['rows_added']} baris ({update['pending_refit_rows']} menunggu refit)"
+    return f"  refit penuh ({update['reason']})"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Kelola versi model KNN (list, promote, rollback, verify, gc)")
+    parser.add_argument("--models-dir", default=MODELS_DIR, help="Folder model (default: models/)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("list", help="Tampilkan semua versi beserta metriknya")
+    promote_parser = commands.add_parser("promote", help="Jadikan versi ini versi yang dipakai app")
+    promote_parser.add_argument("version")
+    commands.add_parser("rollback", help="Kembali ke versi yang dipakai sebelumnya")
+    verify_parser = commands.add_parser("verify", help="Cek hash file sebuah versi (default: versi saat ini)")
+    verify_parser.add_argument("version", nargs="?")
+    gc_parser = commands.add_parser("gc", help="Hapus versi lama")
+    gc_parser.add_argument("--keep", type=int, default=5, help="Jumlah versi terbaru yang disimpan (default: 5)")
+    args = parser.parse_args(argv)
+
+    if args.command == "list":
+        current = current_version(args.models_dir)
+        for manifest in list_versions(args.models_dir):
+            accuracy = manifest["metrics"].get("accuracy")
+            print(f"{'*' if manifest['version'] == current else ' '} {manifest['version']}  "
+                  f"akurasi {accuracy * 100 if accuracy is not None else float('nan'):.2f}%  "
+                  f"dibuat {manifest['created_at']}  induk {manifest.get('parent') or '-'}"
+                  + _update_note(manifest.get("update")))
+    elif args.command in ("promote", "rollback"):
+        try:
+            if args.command == "promote":
+                previous = promote(args.models_dir, args.version)
+                print(f"Versi aktif: {args.version} (sebelumnya {previous or '-'})")
+            else:
+                print(f"Versi aktif: {rollback(args.models_dir)}")
+        except (FileNotFoundError, ValueError) as e:
+            parser.exit(1, f"Gagal: {e}\n") # CURRENT tidak berubah
+    elif args.command == "verify":
+        version = args.version or current_version(args.models_dir)
+        if version is None:
+            parser.error(f"Belum ada {POINTER_FILE}; sebutkan versinya")
+        problems = verify(args.models_dir, version)
+        print("\n".join(problems) if problems else f"Versi {version} sesuai manifest")
+        if problems:
+            raise SystemExit(1)
+    elif args.command == "gc":
+        removed = gc(args.models_dir, args.keep)
+        print(f"{len(removed)} versi dihapus" + (f": {', '.join(removed)}" if removed else ""))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+"""Model selection for the KNN career model: k, weighting and metric in one neighbour pass per fold.
+
+For every cross-validation fold and metric the sorted neighbour lists of the
+validation rows are computed once, up to ``k_max``. Votes for every k are
+then cumulative sums over those lists (uniform and distance weighting), so
+evaluating all k costs one ``kneighbors`` call per fold/metric instead of one
+fit + predict per configuration. Folds run in parallel worker processes.
+
+The output is an accuracy-versus-latency table with macro F1 and per-class
+recall; latency is the ``kneighbors`` time per query row (batched) for that
+k and metric on a fitted fold index.
+
+Contoh:
+    python model_selection.py
+    python model_selection.py --k-max 50 --folds 5 --workers 4 --metrics euclidean manhattan
+    python model_selection.py --dataset data/synthetic_1m.parquet --output seleksi_model.csv
+"""
+import argparse
+import os
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from dataset_io import DATASET_CACHE_DIR, open_dataset
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DATASET_PATH = os.path.join(BASE_DIR, "data", "combined_career_dataset.csv")
+
+WEIGHTS = ("uniform", "distance")
+# knn_engine / artifact hanya mendukung jarak euclidean
+ENGINE_METRICS = ("euclidean",)
+
+FoldResult = namedtuple("FoldResult", ["fold", "metric", "confusion", "latency", "seconds"])
+
+_X = None
+_y = None
+
+
+def _init_worker(X, y):
+    global _X, _y
+    _X, _y = X, y
+
+
+def cumulative_votes(distances, labels, n_classes):
+    """Votes per class for every k = 1..k_max at once, shape (2, n, k_max, n_classes) for WEIGHTS.
+
+    Distance weighting mirrors sklearn: if any of the first k neighbours is at
+    distance 0, only those exact matches vote (weight 1 each).
+    """
+    onehot = np.zeros(labels.shape + (n_classes,))
+    np.put_along_axis(onehot, labels[..., None], 1.0, axis=2)
+    uniform = np.cumsum(onehot, axis=1)
+
+    exact = distances == 0.0
+    with np.errstate(divide="ignore"):
+        inv = np.where(exact, 0.0, 1.0 / distances)
+    weighted = np.cumsum(onehot * inv[..., None], axis=1)
+    exact_votes = np.cumsum(onehot * exact[..., None], axis=1)
+    has_exact = exact_votes.sum(axis=2, keepdims=True) > 0
+    return np.stack([uniform, np.where(has_exact, exact_votes, weighted)])
+
+
+def confusion_for_all_k(distances, labels, y_true, n_classes):
+    """Confusion matrices for every (weights, k), shape (2, k_max, n_classes, n_classes)"""
+    k_max = distances.shape[1]
+    pred = np.argmax(cumulative_votes(distances, labels, n_classes), axis=3) # (2, n, k_max)
+    cell = (np.arange(2)[:, None, None] * k_max + np.arange(k_max)[None, None, :]) * n_classes * n_classes \
+        + y_true[None, :, None] * n_classes + pred
+    counts = np.bincount(cell.ravel(), minlength=2 * k_max * n_classes * n_classes)
+    return counts.reshape(2, k_max, n_classes, n_classes)
+
+
+def run_fold(fold, train_idx, val_idx, metric, k_max, n_classes, chunksize=20_000, latency_rows=100):
+    """Neighbour lists for one fold/metric computed once, evaluated for every k and weighting"""
+    from sklearn.neighbors import NearestNeighbors
+    from sklearn.preprocessing import StandardScaler
+
+    start = time.perf_counter()
+    scaler = StandardScaler().fit(_X[train_idx])
+    X_train = scaler.transform(_X[train_idx])
+    y_train = _y[train_idx]
+    index = NearestNeighbors(n_neighbors=k_max, metric=metric).fit(X_train)
+
+    confusion = np.zeros((2, k_max, n_classes, n_classes), dtype=np.int64)
+    for begin in range(0, len(val_idx), chunksize):
+        rows = val_idx[begin:begin + chunksize]
+        distances, neighbors = index.kneighbors(scaler.transform(_X[rows]))
+        confusion += confusion_for_all_k(distances, y_train[neighbors], _y[rows], n_classes)
+
+    # Latensi per baris query untuk setiap k (bobot tidak mengubah biaya pencarian tetangga)
+    sample = scaler.transform(_X[val_idx[:latency_rows]])
+    latency = np.empty(k_max)
+    for k in range(1, k_max + 1):
+        t = time.perf_counter()
+        index.kneighbors(sample, n_neighbors=k)
+        latency[k - 1] = (time.perf_counter() - t) / len(sample)
+    return FoldResult(fold, metric, confusion, latency, time.perf_counter() - start)
+
+
+def _scores(confusion):
+    """accuracy, macro F1 and per-class recall from a confusion matrix (rows = true class)"""
+    tp = np.diag(confusion).astype(np.float64)
+    support = confusion.sum(axis=1)
+    predicted = confusion.sum(axis=0)
+    recall = np.divide(tp, support, out=np.zeros_like(tp), where=support > 0)
+    precision = np.divide(tp, predicted, out=np.zeros_like(tp), where=predicted > 0)
+    f1 = np.divide(2 * precision * recall, precision + recall, out=np.zeros_like(tp), where=(precision + recall) > 0)
+    return tp.sum() / max(confusion.sum(), 1), f1.mean(), recall
+
+
+def select(X, y, classes, k_max=30, n_folds=5, metrics=ENGINE_METRICS, workers=1, random_state=42):
+    """Return a list of dict rows (one per metric, weights, k) with CV scores and latency"""
+    from sklearn.model_selection import StratifiedKFold
+
+    folds = list(StratifiedKFold(n_splits=n_folds, shuffle=True, random_state=random_state).split(X, y))
+    k_max = min(k_max, min(len(train_idx) for train_idx, _ in folds))
+    tasks = [(fold, train_idx, val_idx, metric, k_max, len(classes))
+             for metric in metrics for fold, (train_idx, val_idx) in enumerate(folds)]
+
+    if workers <= 1:
+        _init_worker(X, y)
+        results = [run_fold(*task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(X, y)) as pool:
+            results = list(pool.map(run_fold, *zip(*tasks)))
+
+    rows = []
+    for metric in metrics:
+        fold_results = [r for r in results if r.metric == metric]
+        confusion = sum(r.confusion for r in fold_results)
+        latency = np.mean([r.latency for r in fold_results], axis=0)
+        for w, weights in enumerate(WEIGHTS):
+            for k in range(1, k_max + 1):
+                accuracy, macro_f1, recall = _scores(confusion[w, k - 1])
+                rows.append({
+                    "metric": metric, "weights": weights, "n_neighbors": k,
+                    "accuracy": accuracy, "macro_f1": macro_f1,
+                    **{f"recall[{career}]": r for career, r in zip(classes, recall)},
+                    "latency_us": latency[k - 1] * 1e6,
+                })
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pilih k, pembobotan, dan metric KNN dengan cross-validation")
+    parser.add_argument("--dataset", default=DATASET_PATH, help="File CSV/Parquet dataset (default: data/combined_career_dataset.csv)")
+    parser.add_argument("--k-max", type=int, default=30, help="k terbesar yang dievaluasi (default: 30)")
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--metrics", nargs="+", default=list(ENGINE_METRICS),
+                        help="Metric jarak sklearn, mis. euclidean manhattan chebyshev (default: euclidean)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Jumlah proses paralel (default: jumlah CPU)")
+    parser.add_argument("--random-state", type=int, default=42)
+    parser.add_argument("--focus-class", default="Technical Specialist", help="Kelas yang recall-nya ditampilkan di tabel")
+    parser.add_argument("--top", type=int, default=15, help="Jumlah konfigurasi terbaik yang ditampilkan")
+    parser.add_argument("--output", help="Simpan seluruh tabel ke CSV")
+    args = parser.parse_args(argv)
+
+    dataset = open_dataset(args.dataset, DATASET_CACHE_DIR)
+    X = np.asarray(dataset.features, dtype=np.float64)
+    y = np.asarray(dataset.labels, dtype=np.intp)
+    if args.focus_class not in dataset.classes:
+        parser.error(f"Kelas tidak ada di dataset: {args.focus_class}")
+
+    start = time.perf_counter()
+    rows = select(X, y, dataset.classes, args.k_max, args.folds, args.metrics, args.workers, args.random_state)
+    print(f"{len(rows)} konfigurasi dari {args.folds} fold x {len(args.metrics)} metric dievaluasi "
+          f"dalam {time.perf_counter() - start:.2f} detik ({len(X):,} baris)\n")
+
+    focus = f"recall[{args.focus_class}]"
+    print(f"{'metric':<10} {'weights':<9} {'k':>3} {'akurasi':>8} {'macro F1':>9} {'recall ' + args.focus_class:>30} {'latensi/baris':>14}")
+    ranked = sorted(rows, key=lambda r: (-r["accuracy"], r["latency_us"]))
+    current = [r for r in rows if (r["metric"], r["weights"], r["n_neighbors"]) == ("euclidean", "distance", 5)]
+
+    def print_row(row):
+        print(f"{row['metric']:<10} {row['weights']:<9} {row['n_neighbors']:>3} {row['accuracy']:>8.4f} "
+              f"{row['macro_f1']:>9.4f} {row[focus]:>30.4f} {row['latency_us']:>11.1f} us")
+
+    for row in ranked[:args.top]:
+        print_row(row)
+    if current:
+        print("-- konfigurasi saat ini (train_knn_model.py default) --")
+        print_row(current[0])
+
+    best = next((r for r in ranked if r["metric"] in ENGINE_METRICS), None)
+    if best is not None:
+        print(f"\nTerbaik yang didukung knn_engine: python train_knn_model.py "
+              f"--n-neighbors {best['n_neighbors']} --weights {best['weights']}")
+
+    if args.output:
+        import pandas as pd
+        pd.DataFrame(rows).to_csv(args.output, index=False)
+        print(f"Tabel lengkap disimpan ke {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+"""On-disk cache for the stages of train_knn_model.py, keyed by content hash.
+
+Every stage key is a SHA-256 over the stage name, the code the stage runs,
+the keys of the stages it consumes, its parameters and the versions of the
+libraries that compute the results. The first stage is keyed on the dataset
+file contents, so a key changes exactly when something upstream of the stage
+changed.
+
+"The code the stage runs" is found from the bytecode of the stage function:
+the source of every function of the same module it calls (recursively) plus
+the full source of every project module it uses, directly or through the
+imports of those modules. Editing ``knn_ensemble.draw_members`` therefore
+invalidates the ensemble stage, and upgrading scikit-learn invalidates all of
+them.
+
+Stage outputs are stored with joblib under ``cache_dir``, together with what
+the stage printed, which is printed again when the cached value is reused.
+Stages that only write files (plots, model export) store a marker with the
+mtimes of the files they wrote and are skipped while those files are still
+exactly the ones this stage produced.
+"""
+import ast
+import contextlib
+import hashlib
+import importlib.metadata
+import inspect
+import io
+import json
+import os
+import platform
+import sys
+import types
+from collections import namedtuple
+from concurrent.futures import Future
+from functools import lru_cache
+
+import joblib
+
+StageResult = namedtuple("StageResult", ["key", "value"])
+
+# Distribusi yang ikut menentukan hasil tahap (versi berbeda = kunci berbeda)
+LIBRARIES = ("numpy", "pandas", "scikit-learn", "scipy", "joblib")
+
+
+def file_hash(path, block_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+@lru_cache(maxsize=None)
+def library_versions():
+    versions = {"python": platform.python_version()}
+    for name in LIBRARIES:
+        try:
+            versions[name] = importlib.metadata.version(name)
+        except importlib.metadata.PackageNotFoundError:
+            versions[name] = None
+    return versions
+
+
+def _code_names(code):
+    """Global, attribute and imported module names used by a code object and the functions nested in it"""
+    names = set(code.co_names)
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            names |= _code_names(const)
+    return names
+
+
+def _project_module(name, project_dir):
+    """Path of project_dir/<name>.py, or None if name is not a module of the project"""
+    path = os.path.join(project_dir, f"{name.split('.')[0]}.py")
+    return path if os.path.isfile(path) else None
+
+
+def _module_imports(path, project_dir):
+    """Project modules imported anywhere in a module file (also inside functions)"""
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read(), path)
+    names = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names.update(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            names.add(node.module)
+    return frozenset(p for p in (_project_module(n, project_dir) for n in names) if p)
+
+
+def code_fingerprint(fn):
+    """Source of fn and the same-module functions it calls, plus hashes of the project modules they use"""
+    module = sys.modules[fn.__module__]
+    project_dir = os.path.dirname(os.path.abspath(module.__file__))
+    sources = {}
+    modules = set()
+    stack = [fn]
+    while stack:
+        current = stack.pop()
+        if current.__name__ in sources:
+            continue
+        sources[current.__name__] = inspect.getsource(current)
+        for name in _code_names(current.__code__):
+            obj = vars(module).get(name)
+            if isinstance(obj, types.FunctionType) and obj.__module__ == fn.__module__:
+                stack.append(obj) # Helper di modul yang sama: cukup source fungsinya
+                continue
+            if isinstance(obj, types.ModuleType):
+                name = obj.__name__
+            elif obj is not None and getattr(obj, "__module__", None):
+                name = obj.__module__ # Fungsi/kelas yang di-import dari modul lain
+            path = _project_module(name, project_dir)
+            if path and os.path.abspath(path) != os.path.abspath(module.__file__):
+                modules.add(path)
+
+    # Modul proyek yang di-import oleh modul-modul tersebut juga ikut menentukan hasil
+    pending = list(modules)
+    while pending:
+        for path in _module_imports(pending.pop(), project_dir):
+            if path not in modules and os.path.abspath(path) != os.path.abspath(module.__file__):
+                modules.add(path)
+                pending.append(path)
+    return {
+        "functions": sources,
+        "modules": {os.path.basename(path): file_hash(path) for path in sorted(modules)},
+    }
+
+
+class _Tee(io.TextIOBase):
+    """Writes to the real stdout and keeps a copy"""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.buffer = io.StringIO()
+
+    def write(self, text):
+        self.buffer.write(text)
+        return self.stream.write(text)
+
+    def flush(self):
+        self.stream.flush()
+
+
+def _output_mtimes(paths):
+    return {path: os.stat(path).st_mtime_ns if os.path.exists(path) else None for path in paths}
+
+
+class PipelineCache:
+    def __init__(self, cache_dir, enabled=True, log=print):
+        self.cache_dir = cache_dir
+        self.enabled = enabled
+        self.log = log
+        if enabled:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def stage_key(self, name, fn, inputs=(), params=None, extra=None):
+        payload = {
+            "name": name,
+            "code": code_fingerprint(fn),
+            "libraries": library_versions(),
+            "inputs": [i.key for i in inputs],
+            "params": params or {},
+            "extra": extra,
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+    def _path(self, name, key, suffix):
+        return os.path.join(self.cache_dir, f"{name}-{key[:16]}{suffix}")
+
+    def run(self, name, fn, inputs=(), params=None, extra=None, runtime=None):
+        """Return fn(*input values, **params), loading it from disk if this exact stage already ran.
+
+        runtime: extra keyword arguments for fn that do not change its result
+        (e.g. the number of worker processes), so they are not part of the key.
+        What fn printed is stored with the value and printed again on reuse.
+        """
+        params = params or {}
+        key = self.stage_key(name, fn, inputs, params, extra)
+        path = self._path(name, key, ".joblib")
+        if self.enabled and os.path.exists(path):
+            value, output = joblib.load(path)
+            self.log(f"[cache] {name}: dipakai ulang ({key[:12]})")
+            print(output, end="")
+            return StageResult(key, value)
+
+        tee = _Tee(sys.stdout)
+        with contextlib.redirect_stdout(tee):
+            value = fn(*(i.value for i in inputs), **params, **(runtime or {}))
+        if self.enabled:
+            tmp_path = f"{path}.tmp"
+            joblib.dump((value, tee.buffer.getvalue()), tmp_path)
+            os.replace(tmp_path, path)
+        return StageResult(key, value)
+
+    def run_side_effect(self, name, fn, inputs=(), params=None, outputs=(), extra=None, runtime=None):
+        """Run a stage that only writes files, skipping it while its outputs are unchanged since it ran.
+
+        runtime: extra keyword arguments for fn that are not part of the key
+        (e.g. a process pool). If fn returns a Future (work continues in the
+        background), the marker is written once it completes successfully.
+        """
+        params = params or {}
+        key = self.stage_key(name, fn, inputs, params, extra)
+        marker = self._path(name, key, ".done")
+        if self.enabled and os.path.exists(marker):
+            with open(marker) as f:
+                recorded = json.load(f)
+            # File output bisa ditimpa run lain (mis. n_neighbors berbeda), jadi cocokkan mtime-nya
+            if recorded == _output_mtimes(outputs):
+                self.log(f"[cache] {name}: output masih terbaru, dilewati ({key[:12]})")
+                return StageResult(key, None)
+
+        def write_marker():
+            with open(marker, "w") as f:
+                json.dump(_output_mtimes(outputs), f)
+
+        def on_done(future):
+            if future.exception() is None:
+                write_marker()
+
+        result = fn(*(i.value for i in inputs), **params, **(runtime or {}))
+        if isinstance(result, Future):
+            if self.enabled:
+                result.add_done_callback(on_done)
+            return StageResult(key, result)
+        if self.enabled:
+            write_marker()
+        return StageResult(key, None)
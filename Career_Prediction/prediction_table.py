@@ -0,0 +1,104 @@
+"""Precomputed KNN predictions over every reachable quiz-score combination.
+
+Each quiz can only produce a handful of scores (see
+``quiz_bank.reachable_scores``), so the whole input space of
+``predict_career`` is a small 4-D grid. The table stores the encoded class of
+every grid point; serving becomes four dict lookups and one array index.
+
+A table is only valid for the quiz configuration and the model it was built
+from: it records ``quiz_bank.quiz_signature()`` and the artifact hash, and
+``ensure_table`` rebuilds it when either one changes. The codes follow
+knn_engine's index-order tie rule for grid points with equidistant k-th
+neighbours (see knn_engine). Training passes the fitted sklearn tree with
+that rule applied (``train_knn_model.index_order_predict_proba``), because the
+brute-force engine scans every reference row for each of the grid points;
+``ensure_table`` rebuilds with the engine.
+"""
+import os
+from collections import namedtuple
+
+import numpy as np
+
+import knn_engine
+from quiz_bank import quiz_signature, reachable_scores
+
+TABLE_FILE = "prediction_table.npz"
+
+# Urutan fitur sama dengan training: tech_score, soft_score, sjt_score, personality_score
+TABLE_AXES = ('tech', 'soft', 'sjt', 'personality')
+
+PredictionTable = namedtuple("PredictionTable", ["axes", "index", "codes", "classes", "signature", "model_sha"])
+
+
+def _score_key(score):
+    # Pembulatan agar 30.000000000000004 dan 30.0 dianggap sama
+    return round(float(score), 6)
+
+
+def _make_table(axes, codes, classes, signature, model_sha):
+    index = [{_score_key(v): i for i, v in enumerate(axis)} for axis in axes]
+    return PredictionTable(axes, index, codes, np.asarray(classes), str(signature), str(model_sha))
+
+
+def build_table(artifact, predict_proba_scaled=None):
+    """Batch-predict every reachable (tech, soft, sjt, personality) tuple once.
+
+    predict_proba_scaled: function of the standardized grid returning class
+    probabilities with knn_engine's tie rule; knn_engine itself by default.
+    """
+    axes = [np.array(reachable_scores(quiz_type)) for quiz_type in TABLE_AXES]
+    grid = np.stack(np.meshgrid(*axes, indexing="ij"), axis=-1).reshape(-1, len(axes))
+    grid_scaled = knn_engine.transform(artifact, grid)
+    proba = (predict_proba_scaled or (lambda X: knn_engine.predict_proba_scaled(artifact, X)))(grid_scaled)
+    codes = np.argmax(proba, axis=1).astype(np.uint8).reshape([len(a) for a in axes])
+    return _make_table(axes, codes, artifact.classes, quiz_signature(), artifact.header["sha256"])
+
+
+def save_table(table, path):
+    """Write the table atomically next to the model artifacts"""
+    tmp_path = f"{path}.tmp.npz"
+    np.savez(
+        tmp_path,
+        codes=table.codes,
+        classes=table.classes,
+        signature=np.array(table.signature),
+        model_sha=np.array(table.model_sha),
+        **{f"axis_{name}": axis for name, axis in zip(TABLE_AXES, table.axes)},
+    )
+    os.replace(tmp_path, path)
+
+
+def load_table(path):
+    with np.load(path) as data:
+        axes = [data[f"axis_{name}"] for name in TABLE_AXES]
+        return _make_table(axes, data["codes"], data["classes"], data["signature"], data["model_sha"])
+
+
+def is_current(table, artifact):
+    """True if the table matches both the quiz configuration and the model artifact"""
+    return table.signature == quiz_signature() and table.model_sha == artifact.header["sha256"]
+
+
+def ensure_table(artifact, path):
+    """Load the table at path, rebuilding and saving it if it is missing or stale"""
+    if os.path.exists(path):
+        table = load_table(path)
+        if is_current(table, artifact):
+            return table
+    table = build_table(artifact)
+    try:
+        save_table(table, path)
+    except OSError:
+        pass # Folder models read-only: tabel tetap dipakai dari memori
+    return table
+
+
+def lookup(table, tech_score, soft_score, sjt_score, personality_score):
+    """Career for the given scores, or None if the tuple is not on the grid"""
+    position = []
+    for index, score in zip(table.index, (tech_score, soft_score, sjt_score, personality_score)):
+        i = index.get(_score_key(score))
+        if i is None:
+            return None
+        position.append(i)
+    return table.classes[table.codes[tuple(position)]]
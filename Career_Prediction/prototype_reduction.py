@@ -0,0 +1,90 @@
+"""Prototype reduction for the KNN reference set.
+
+KNN keeps every training row, so model size and query cost grow linearly
+with the training set. These methods pick (or build) a much smaller set of
+reference rows that classifies the training data almost the same way:
+
+- ``enn``: edited nearest neighbours, drops rows whose k neighbours (without
+  the row itself) vote for another career. Removes noise and class overlap.
+- ``cnn``: condensed nearest neighbours (Hart), keeps only the rows needed
+  for 1-NN to classify the rest correctly. Rows are added in batches and the
+  index is rebuilt once per batch instead of once per row.
+- ``enn+cnn``: ENN first, then CNN on what is left (the usual combination;
+  CNN alone keeps every conflicting duplicate).
+- ``kmeans``: per-career MiniBatchKMeans centres as synthetic prototypes.
+"""
+import numpy as np
+
+METHODS = ("enn", "cnn", "enn+cnn", "kmeans")
+
+
+def edited_nearest_neighbours(X, y, n_neighbors=3):
+    """Indices of rows whose neighbours' majority vote agrees with their own label"""
+    from sklearn.neighbors import NearestNeighbors
+
+    n_neighbors = min(n_neighbors, len(X) - 1)
+    _, neighbors = NearestNeighbors(n_neighbors=n_neighbors).fit(X).kneighbors() # Tanpa baris itu sendiri
+    n_classes = int(y.max()) + 1
+    votes = np.zeros((len(X), n_classes), dtype=np.int32)
+    np.add.at(votes, (np.repeat(np.arange(len(X)), n_neighbors), y[neighbors].ravel()), 1)
+    # Seri dengan label sendiri tetap dipertahankan
+    return np.flatnonzero(votes[np.arange(len(X)), y] == votes.max(axis=1))
+
+
+def condensed_nearest_neighbours(X, y, batch_size=None, max_passes=10, random_state=42):
+    """Indices of a subset on which 1-NN classifies every other row correctly (or max_passes reached)"""
+    from sklearn.neighbors import NearestNeighbors
+
+    rng = np.random.default_rng(random_state)
+    order = rng.permutation(len(X))
+    batch_size = batch_size or max(256, len(X) // 200)
+    keep = np.zeros(len(X), dtype=bool)
+    for c in np.unique(y):
+        keep[order[np.argmax(y[order] == c)]] = True # Satu prototipe awal per kelas
+
+    for _ in range(max_passes):
+        added = 0
+        for start in range(0, len(order), batch_size):
+            batch = order[start:start + batch_size]
+            batch = batch[~keep[batch]]
+            if not len(batch):
+                continue
+            prototypes = np.flatnonzero(keep)
+            _, nearest = NearestNeighbors(n_neighbors=1).fit(X[prototypes]).kneighbors(X[batch])
+            wrong = batch[y[prototypes[nearest[:, 0]]] != y[batch]]
+            keep[wrong] = True
+            added += len(wrong)
+        if added == 0:
+            break
+    return np.flatnonzero(keep)
+
+
+def kmeans_prototypes(X, y, prototypes_per_class=50, random_state=42):
+    """(X_prototypes, y_prototypes) from per-class MiniBatchKMeans centres"""
+    from sklearn.cluster import MiniBatchKMeans
+
+    X_out, y_out = [], []
+    for c in np.unique(y):
+        X_c = X[y == c]
+        n_clusters = min(prototypes_per_class, len(np.unique(X_c, axis=0)))
+        kmeans = MiniBatchKMeans(n_clusters=n_clusters, random_state=random_state, n_init=3).fit(X_c)
+        X_out.append(kmeans.cluster_centers_)
+        y_out.append(np.full(n_clusters, c, dtype=y.dtype))
+    return np.vstack(X_out).astype(X.dtype), np.concatenate(y_out)
+
+
+def reduce_reference_set(X, y, method, prototypes_per_class=50, n_neighbors=3, random_state=42):
+    """Return the reduced (X_ref, y_ref) for one of METHODS"""
+    X = np.asarray(X)
+    y = np.asarray(y)
+    if method == "kmeans":
+        return kmeans_prototypes(X, y, prototypes_per_class, random_state)
+    if method not in METHODS:
+        raise ValueError(f"Metode reduksi tidak dikenal: {method} (pilih {', '.join(METHODS)})")
+
+    index = np.arange(len(X))
+    if method in ("enn", "enn+cnn"):
+        index = index[edited_nearest_neighbours(X, y, n_neighbors)]
+    if method in ("cnn", "enn+cnn"):
+        index = index[condensed_nearest_neighbours(X[index], y[index], random_state=random_state)]
+    return X[index], y[index]
@@ -0,0 +1,217 @@
+"""Question banks and scoring rules shared by the app and the training pipeline.
+
+``QUIZZES`` is the single source of truth for how many questions each quiz
+samples and how it is scored; the prediction table built by the training
+script is keyed on a signature of this configuration.
+
+The banks are read-only and shared by every session. A running quiz is kept
+in session state as a ``QuizState``: the sampled question ids and, for quizzes
+that shuffle their options, the displayed option order, both as ``bytes`` (a
+few dozen bytes per quiz instead of copied question dicts).
+"""
+import hashlib
+import json
+import random
+from collections import namedtuple
+from types import MappingProxyType
+
+# Bobot jawaban untuk scoring 'weighted' (opsi pertama = 100%, kedua = 50%, ketiga = 25%)
+WEIGHTED_SCORES = (100, 50, 25)
+
+# Opsi jawaban personality test (sama untuk semua pertanyaan)
+PERSONALITY_OPTIONS = ("Setuju", "Tidak Setuju")
+
+QuizState = namedtuple("QuizState", ["question_ids", "option_order"])
+
+
+def calculate_score(answers, selected_questions=None, scoring_type='percentage'):
+    """Calculate quiz score based on answers"""
+    if not answers or not selected_questions:
+        return 0
+    
+    if scoring_type == 'percentage_correct': # New scoring type for quizzes with explicit correct answers
+        correct_answers_count = 0
+        for i, answer_index in enumerate(answers):
+            if 'correct' in selected_questions[i] and answer_index == selected_questions[i]['correct']:
+                correct_answers_count += 1
+        return (correct_answers_count / len(selected_questions)) * 100
+    
+    elif scoring_type == 'weighted':
+        # Weight answers based on quality (first option = 100%, second = 50%, third = 25%)
+        # This assumes the first option is always the "best" for SJT/Soft Skills
+        total_score = 0
+        for answer_index in answers:
+            if 0 <= answer_index < len(WEIGHTED_SCORES):
+                total_score += WEIGHTED_SCORES[answer_index]
+        return total_score / len(answers)
+    else:
+        return 0 # Default to 0 if scoring_type is not recognized
+
+
+# Quiz data
+sjt_questions = [
+    {"q": "Atasan meminta kamu lembur padahal kamu memiliki rencana pribadi, apa yang kamu lakukan?", "options": ["Diskusi dan negosiasi", "Menolak", "Langsung lembur"]},
+    {"q": "Rekan kerja sering terlambat mengirim data yang kamu butuhkan, tindakanmu?", "options": ["Mengingatkan baik-baik", "Membiarkan saja", "Melapor atasan"]},
+    {"q": "Kamu melihat kesalahan prosedur yang dilakukan tim, tindakanmu?", "options": ["Memberi masukan", "Diam saja", "Mengikuti kesalahan"]},
+    {"q": "Saat meeting, ide kamu ditolak tim, apa sikapmu?", "options": ["Menerima dan diskusi", "Kesal", "Diam saja"]},
+    {"q": "Kamu mendapat tugas di luar jobdesc, apa yang kamu lakukan?", "options": ["Mengerjakan sambil diskusi", "Menolak", "Meninggalkan"]},
+    {"q": "Klien meminta revisi mendadak, apa yang kamu lakukan?", "options": ["Prioritaskan revisi", "Menunda", "Menolak"]},
+    {"q": "Rekan kerja meminta bantuan saat kamu sibuk, apa tindakanmu?", "options": ["Bantu jika bisa", "Menolak", "Menghindar"]},
+    {"q": "Atasan marah padamu karena kesalahan tim, tindakanmu?", "options": ["Menjelaskan", "Diam", "Menyalahkan tim"]},
+    {"q": "Kamu melihat rekan kerja melanggar aturan kantor, apa tindakanmu?", "options": ["Menegur baik-baik", "Membiarkan", "Melaporkan"]},
+    {"q": "Kamu ditugaskan project baru mendadak, apa yang kamu lakukan?", "options": ["Mengatur prioritas", "Menolak", "Mengeluh"]},
+]
+
+personality_questions = [
+    {"q": "Saya merasa senang bekerja dengan banyak orang.", "correct": 0}, 
+    {"q": "Saya suka membuat rencana kerja sebelum memulai tugas.", "correct": 0}, 
+    {"q": "Saya lebih suka pekerjaan yang stabil daripada yang penuh risiko.", "correct": 1}, 
+    {"q": "Saya senang belajar hal baru untuk pengembangan diri.", "correct": 0}, 
+    {"q": "Saya merasa nyaman ketika berbicara di depan banyak orang.", "correct": 0}, 
+    {"q": "Saya senang memimpin kelompok atau tim.", "correct": 0}, 
+    {"q": "Saya biasanya menyelesaikan pekerjaan tepat waktu.", "correct": 0}, 
+    {"q": "Saya merasa nyaman bekerja dalam kondisi tekanan.", "correct": 0}, 
+    {"q": "Saya suka menyelesaikan masalah yang kompleks.", "correct": 0}, 
+    {"q": "Saya suka bekerja dengan detail dan ketelitian tinggi.", "correct": 0}, 
+]
+
+tech_questions = [
+    {"q": "Apa itu Python?", "options": ["Bahasa Pemrograman", "Framework", "Database"], "correct": 0},
+    {"q": "Manakah yang termasuk database?", "options": ["MySQL", "Photoshop", "Premiere"], "correct": 0},
+    {"q": "Apa itu Git?", "options": ["Version Control", "Editor", "Bahasa Pemrograman"], "correct": 0},
+    {"q": "HTML digunakan untuk?", "options": ["Membuat tampilan web", "Database", "Analisis data"], "correct": 0},
+    {"q": "CSS digunakan untuk?", "options": ["Mengatur tampilan web", "Server", "Keamanan"], "correct": 0},
+    {"q": "JavaScript digunakan untuk?", "options": ["Interaktif website", "Mengatur server", "Membuat database"], "correct": 0},
+    {"q": "Framework untuk Machine Learning?", "options": ["TensorFlow", "Laravel", "Vue"], "correct": 0},
+    {"q": "Apa itu API?", "options": ["Interface komunikasi aplikasi", "Bahasa pemrograman", "Framework"], "correct": 0},
+    {"q": "Contoh NoSQL Database?", "options": ["MongoDB", "MySQL", "Oracle"], "correct": 0},
+    {"q": "IDE adalah?", "options": ["Lingkungan pengembangan", "Bahasa pemrograman", "Framework"], "correct": 0},
+    {"q": "Bahasa pemrograman untuk Data Science?", "options": ["Python", "HTML", "CSS"], "correct": 0},
+    {"q": "Untuk desain antarmuka biasa digunakan?", "options": ["Figma", "SQL", "TensorFlow"], "correct": 0},
+    {"q": "Untuk analisis data besar digunakan?", "options": ["Python", "Photoshop", "CorelDraw"], "correct": 0},
+    {"q": "Framework backend populer?", "options": ["Django", "Vue", "React"], "correct": 0},
+    {"q": "Manakah yang bukan bahasa pemrograman?", "options": ["Photoshop", "Python", "Java"], "correct": 0},
+    {"q": "Untuk pengolahan data digunakan?", "options": ["Pandas", "HTML", "CSS"], "correct": 0},
+    {"q": "Firebase digunakan untuk?", "options": ["Backend dan database", "Editor gambar", "Framework CSS"], "correct": 0},
+    {"q": "Untuk testing code digunakan?", "options": ["PyTest", "Premiere", "Figma"], "correct": 0},
+    {"q": "Bahasa untuk pengembangan Android?", "options": ["Kotlin", "HTML", "CSS"], "correct": 0},
+    {"q": "Untuk membuat REST API digunakan?", "options": ["Flask/Django", "HTML", "CSS"], "correct": 0},
+]
+
+soft_questions = [
+    {"q": "Bagaimana kamu menangani kritik?", "options": ["Menerima", "Menolak", "Menghindar"]},
+    {"q": "Bagaimana kamu menyelesaikan konflik tim?", "options": ["Diskusi solusi", "Menghindar", "Diam saja"]},
+    {"q": "Apa sikapmu terhadap deadline?", "options": ["Tepat waktu", "Menunda", "Menghindar"]},
+    {"q": "Bagaimana kamu beradaptasi dengan perubahan?", "options": ["Fleksibel", "Menolak", "Sulit beradaptasi"]},
+    {"q": "Bagaimana kamu mengatur waktu?", "options": ["Prioritas", "Menunda", "Acak"]},
+    {"q": "Bagaimana kamu mengatasi tekanan kerja?", "options": ["Tetap tenang", "Panik", "Mengeluh"]},
+    {"q": "Bagaimana kamu bekerja dalam tim?", "options": ["Kolaboratif", "Individu", "Menolak"]},
+    {"q": "Bagaimana kamu meningkatkan diri?", "options": ["Belajar hal baru", "Diam saja", "Menunda"]},
+    {"q": "Bagaimana kamu mengambil keputusan sulit?", "options": ["Analisis terlebih dahulu", "Asal memutuskan", "Menunda"]},
+    {"q": "Bagaimana kamu menghadapi kritik negatif?", "options": ["Evaluasi dan perbaikan", "Kesal", "Menolak"]},
+    {"q": "Bagaimana cara kamu memberi masukan pada teman kerja?", "options": ["Sopan dan jelas", "Menyindir", "Diam"]},
+    {"q": "Bagaimana kamu berkomunikasi dalam tim?", "options": ["Terbuka dan efektif", "Tertutup", "Pasif"]},
+    {"q": "Bagaimana kamu menyelesaikan masalah kompleks?", "options": ["Analisis dan diskusi", "Menghindar", "Menunda"]},
+    {"q": "Bagaimana kamu memimpin tim?", "options": ["Memberi contoh baik", "Memaksa", "Diam"]},
+    {"q": "Bagaimana kamu belajar hal baru?", "options": ["Inisiatif", "Menunda", "Menghindar"]},
+    {"q": "Bagaimana kamu menjaga hubungan dengan rekan kerja?", "options": ["Komunikasi baik", "Menjauh", "Pasif"]},
+    {"q": "Bagaimana kamu menangani tugas mendadak?", "options": ["Prioritaskan", "Mengeluh", "Menunda"]},
+    {"q": "Bagaimana kamu mengevaluasi diri?", "options": ["Refleksi rutin", "Mengabaikan", "Menunda"]},
+    {"q": "Bagaimana kamu memberi kritik membangun?", "options": ["Sopan dan jelas", "Menyindir", "Diam"]},
+    {"q": "Bagaimana kamu menghadapi ketidakpastian?", "options": ["Fleksibel dan siap", "Menolak", "Mengeluh"]},
+]
+
+
+
+def _freeze(questions):
+    """Read-only copy of a bank: tuple of read-only dicts with tuple options"""
+    return tuple(MappingProxyType({**q, **({'options': tuple(q['options'])} if 'options' in q else {})})
+                 for q in questions)
+
+
+QUIZZES = {
+    'sjt': {'questions': _freeze(sjt_questions), 'n_questions': 5, 'scoring_type': 'weighted'},
+    'personality': {'questions': _freeze(personality_questions), 'n_questions': 5, 'scoring_type': 'percentage_correct'},
+    'tech': {'questions': _freeze(tech_questions), 'n_questions': 10, 'scoring_type': 'percentage_correct',
+             'shuffle_options': True},
+    'soft': {'questions': _freeze(soft_questions), 'n_questions': 10, 'scoring_type': 'weighted'},
+}
+
+
+def _option_count(quiz_type, question):
+    return len(PERSONALITY_OPTIONS) if quiz_type == 'personality' else len(question['options'])
+
+
+def _question_options(quiz_type, question):
+    return PERSONALITY_OPTIONS if quiz_type == 'personality' else question['options']
+
+
+def new_quiz_state(quiz_type, rng=random):
+    """Sample the questions of one quiz run (and shuffle their options if the quiz does)"""
+    quiz = QUIZZES[quiz_type]
+    question_ids = rng.sample(range(len(quiz['questions'])), quiz['n_questions'])
+    option_order = []
+    if quiz.get('shuffle_options'):
+        for i in question_ids:
+            order = list(range(_option_count(quiz_type, quiz['questions'][i])))
+            rng.shuffle(order)
+            option_order.extend(order)
+    return QuizState(bytes(question_ids), bytes(option_order))
+
+
+def _option_orders(quiz_type, state):
+    """Per question: original option index at each displayed position"""
+    questions = QUIZZES[quiz_type]['questions']
+    start = 0
+    for i in state.question_ids:
+        n = _option_count(quiz_type, questions[i])
+        if state.option_order:
+            yield state.option_order[start:start + n]
+            start += n
+        else:
+            yield range(n)
+
+
+def quiz_questions(quiz_type, state):
+    """(question text, options in displayed order) for every question of a quiz run"""
+    questions = QUIZZES[quiz_type]['questions']
+    return [(questions[i]['q'], [_question_options(quiz_type, questions[i])[o] for o in order])
+            for i, order in zip(state.question_ids, _option_orders(quiz_type, state))]
+
+
+def score_quiz(quiz_type, state, answers):
+    """calculate_score for answers given as displayed option positions"""
+    quiz = QUIZZES[quiz_type]
+    original = [order[a] for a, order in zip(answers, _option_orders(quiz_type, state))]
+    return calculate_score(original, [quiz['questions'][i] for i in state.question_ids],
+                           scoring_type=quiz['scoring_type'])
+
+
+def reachable_scores(quiz_type):
+    """Every score calculate_score can return for a completed quiz, sorted ascending"""
+    quiz = QUIZZES[quiz_type]
+    n = quiz['n_questions']
+    if quiz['scoring_type'] == 'percentage_correct':
+        # Rumus sama dengan calculate_score agar nilai float identik
+        return sorted({(correct / n) * 100 for correct in range(n + 1)})
+
+    max_options = max(_option_count(quiz_type, q) for q in quiz['questions'])
+    answer_values = {WEIGHTED_SCORES[i] if i < len(WEIGHTED_SCORES) else 0 for i in range(max_options)}
+    totals = {0}
+    for _ in range(n):
+        totals = {total + value for total in totals for value in answer_values}
+    return sorted(total / n for total in totals)
+
+
+def quiz_signature():
+    """Hash of everything that determines the reachable score space"""
+    config = {
+        quiz_type: {
+            'n_questions': quiz['n_questions'],
+            'scoring_type': quiz['scoring_type'],
+            'option_counts': sorted({_option_count(quiz_type, q) for q in quiz['questions']}),
+        }
+        for quiz_type, quiz in QUIZZES.items()
+    }
+    config['weighted_scores'] = WEIGHTED_SCORES
+    return hashlib.sha256(json.dumps(config, sort_keys=True).encode("utf-8")).hexdigest()
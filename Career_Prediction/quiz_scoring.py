@@ -0,0 +1,74 @@
+"""Vectorized scoring of many quiz submissions at once.
+
+Each question bank in ``quiz_bank.QUIZZES`` is compiled once into NumPy
+arrays (per-option weights, correct-option index, option count), and
+``score_answers`` scores an ``(n_submissions, n_questions)`` answer matrix in
+one call with the same results as ``quiz_bank.calculate_score``. Options
+shown in a shuffled order (the tech quiz) are mapped back through a
+per-submission permutation. Meant for bulk scoring of submissions recorded
+elsewhere with their question ids, displayed answers and option order (the
+app itself stores only the final scores), for example after
+``WEIGHTED_SCORES`` changes.
+
+Kept out of quiz_bank.py so that the quiz pages do not import numpy.
+"""
+from collections import namedtuple
+from functools import lru_cache
+
+import numpy as np
+
+from quiz_bank import QUIZZES, WEIGHTED_SCORES, _option_count
+
+CompiledBank = namedtuple("CompiledBank", ["quiz_type", "scoring_type", "n_options", "option_weights", "correct"])
+
+
+@lru_cache(maxsize=None)
+def compile_bank(quiz_type, weighted_scores=WEIGHTED_SCORES):
+    """Compile one question bank into arrays indexed by question position in the bank.
+
+    n_options: options per question; option_weights: (n_bank, max_options)
+    credit per original option for 'weighted' scoring; correct: original
+    index of the correct option, -1 if the question has none.
+    """
+    quiz = QUIZZES[quiz_type]
+    questions = quiz['questions']
+    n_options = np.array([_option_count(quiz_type, q) for q in questions], dtype=np.intp)
+    max_options = int(n_options.max())
+    option_weights = np.zeros((len(questions), max_options))
+    n_weighted = min(len(weighted_scores), max_options)
+    option_weights[:, :n_weighted] = weighted_scores[:n_weighted]
+    # Opsi yang tidak ada di pertanyaan (bank dengan jumlah opsi berbeda) tidak bernilai
+    option_weights[np.arange(max_options)[None, :] >= n_options[:, None]] = 0.0
+    correct = np.array([q.get('correct', -1) for q in questions], dtype=np.intp)
+    return CompiledBank(quiz_type, quiz['scoring_type'], n_options, option_weights, correct)
+
+
+def score_answers(quiz_type, question_ids, answers, permutations=None, weighted_scores=WEIGHTED_SCORES):
+    """Scores for a batch of completed quizzes, shape (n_submissions,).
+
+    question_ids: (n, q) or (q,) positions in the bank of the questions each
+    submission was shown. answers: (n, q) option index as displayed, out of
+    range (e.g. -1 for unanswered) earns nothing. permutations: optional
+    (n, q, max_options) original option index at each displayed position.
+    """
+    bank = compile_bank(quiz_type, tuple(weighted_scores))
+    answers = np.atleast_2d(np.asarray(answers, dtype=np.intp))
+    question_ids = np.broadcast_to(np.asarray(question_ids, dtype=np.intp), answers.shape)
+    if answers.shape[1] == 0:
+        return np.zeros(len(answers))
+
+    valid = (answers >= 0) & (answers < bank.n_options[question_ids])
+    chosen = np.where(valid, answers, 0)
+    if permutations is not None:
+        # Posisi yang ditampilkan -> indeks opsi asli di bank
+        chosen = np.take_along_axis(np.asarray(permutations, dtype=np.intp), chosen[..., None], axis=2)[..., 0]
+
+    n_questions = answers.shape[1]
+    if bank.scoring_type == 'percentage_correct':
+        n_correct = np.count_nonzero(valid & (chosen == bank.correct[question_ids]), axis=1)
+        # Rumus sama dengan calculate_score agar nilai float identik
+        return (n_correct / n_questions) * 100
+    if bank.scoring_type == 'weighted':
+        total = np.where(valid, bank.option_weights[question_ids, chosen], 0.0).sum(axis=1)
+        return total / n_questions
+    return np.zeros(len(answers))
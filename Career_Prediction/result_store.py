@@ -0,0 +1,190 @@
+"""Durable store for assessment results behind the "Simpan Hasil" button.
+
+Results go to an embedded SQLite database in WAL mode. ``save()`` only puts
+the row on an in-memory queue; one background writer thread per process
+drains the queue and inserts rows in batches (one transaction per batch), so
+the Streamlit thread never waits on disk and concurrent sessions never
+contend for the write lock among themselves. WAL lets readers (export)
+run while the writer is busy.
+
+Contoh ekspor:
+    python result_store.py export hasil_assessment.csv --since 2026-01-01
+"""
+import argparse
+import atexit
+import csv
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_DB_PATH = os.environ.get("CAREER_RESULTS_DB", os.path.join(BASE_DIR, "data", "assessment_results.db"))
+
+COLUMNS = ("user_name", "created_at", "sjt_score", "personality_score", "tech_score", "soft_score",
+           "predicted_career", "model_version")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS assessment_results (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_name TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    sjt_score REAL,
+    personality_score REAL,
+    tech_score REAL,
+    soft_score REAL,
+    predicted_career TEXT,
+    model_version TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_results_user ON assessment_results (user_name, created_at);
+CREATE INDEX IF NOT EXISTS idx_results_created ON assessment_results (created_at);
+CREATE INDEX IF NOT EXISTS idx_results_career ON assessment_results (predicted_career);
+"""
+_INSERT = (f"INSERT INTO assessment_results ({', '.join(COLUMNS)}) "
+           f"VALUES ({', '.join('?' for _ in COLUMNS)})")
+
+_STOP = object()
+logger = logging.getLogger(__name__)
+
+
+def _connect(path):
+    conn = sqlite3.connect(path, timeout=30.0, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL") # Aman dengan WAL, fsync hanya saat checkpoint
+    return conn
+
+
+class ResultStore:
+    """SQLite result store with a batching background writer"""
+
+    def __init__(self, path=DEFAULT_DB_PATH, max_batch=500, flush_interval=0.05):
+        self.path = path
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.written = 0
+        self.failed = 0
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with _connect(path) as conn:
+            conn.executescript(_SCHEMA)
+        conn.close()
+
+        self._queue = queue.Queue()
+        self._writer = threading.Thread(target=self._run, name="result-store-writer", daemon=True)
+        self._writer.start()
+
+    def save(self, user_name, scores, predicted_career=None, model_version=None, created_at=None):
+        """Queue one result for writing and return immediately"""
+        created_at = created_at or datetime.now(timezone.utc).isoformat(timespec="milliseconds")
+        self._queue.put((
+            user_name or "", created_at,
+            scores.get('sjt'), scores.get('personality'), scores.get('tech'), scores.get('soft'),
+            predicted_career, model_version,
+        ))
+
+    def _next_batch(self):
+        """Block for the first row, then collect more until max_batch or flush_interval"""
+        batch = [self._queue.get()]
+        if batch[0] is _STOP:
+            return [], True
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.max_batch:
+            try:
+                row = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                break
+            if row is _STOP:
+                return batch, True
+            batch.append(row)
+        return batch, False
+
+    def _run(self):
+        conn = _connect(self.path)
+        stop = False
+        while not stop:
+            batch, stop = self._next_batch()
+            if batch:
+                try:
+                    with conn:
+                        conn.executemany(_INSERT, batch)
+                    self.written += len(batch)
+                except sqlite3.Error:
+                    self.failed += len(batch)
+                    logger.exception("Gagal menyimpan %d hasil assessment", len(batch))
+            for _ in range(len(batch) + stop):
+                self._queue.task_done()
+        conn.close()
+
+    def flush(self):
+        """Wait until every queued row has been written"""
+        self._queue.join()
+
+    def close(self):
+        """Flush pending rows and stop the writer thread"""
+        if self._writer.is_alive():
+            self._queue.put(_STOP)
+            self._writer.join()
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_result_store(path=DEFAULT_DB_PATH):
+    """Process-wide store shared by every Streamlit session (one writer thread per process)"""
+    global _store
+    with _store_lock:
+        if _store is None or _store.path != path:
+            _store = ResultStore(path)
+            # Baris yang masih di antrean ditulis dulu sebelum proses berhenti
+            atexit.register(_store.close)
+        return _store
+
+
+def export_csv(out_path, db_path=DEFAULT_DB_PATH, since=None):
+    """Stream all results (optionally created_at >= since) to a CSV file; returns row count"""
+    query = f"SELECT {', '.join(COLUMNS)} FROM assessment_results"
+    params = ()
+    if since:
+        query += " WHERE created_at >= ?"
+        params = (since,)
+    query += " ORDER BY created_at, id"
+
+    conn = _connect(db_path)
+    rows = 0
+    try:
+        with open(out_path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(COLUMNS)
+            cursor = conn.execute(query, params)
+            while True:
+                chunk = cursor.fetchmany(10_000)
+                if not chunk:
+                    break
+                writer.writerows(chunk)
+                rows += len(chunk)
+    finally:
+        conn.close()
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ekspor hasil assessment yang tersimpan")
+    sub = parser.add_subparsers(dest="command", required=True)
+    export = sub.add_parser("export", help="Ekspor hasil ke CSV")
+    export.add_argument("output", help="File CSV tujuan")
+    export.add_argument("--since", help="Hanya hasil dengan created_at >= nilai ini (ISO, mis. 2026-01-01)")
+    export.add_argument("--db", default=DEFAULT_DB_PATH, help="Lokasi database SQLite")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.db):
+        parser.error(f"Database tidak ditemukan: {args.db}")
+    rows = export_csv(args.output, args.db, since=args.since)
+    print(f"{rows} hasil diekspor ke {args.output}")
+
+
+if __name__ == "__main__":
+    main()
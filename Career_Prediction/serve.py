@@ -0,0 +1,280 @@
+"""Standalone HTTP inference service for the career KNN model.
+
+Pure asyncio (no web framework). Endpoints:
+
+    POST /predict   {"tech_score": .., "soft_score": .., "sjt_score": .., "personality_score": ..}
+                    -> {"career": "...", "probabilities": {"<career>": p, ...}}
+    GET  /healthz   process is up
+    GET  /readyz    model is loaded and requests can be served (503 before that)
+    GET  /metrics   Prometheus text format (see metrics.py), only with --metrics
+
+Concurrent /predict requests are coalesced by ``MicroBatcher`` into one
+vectorized KNN call per batch (``--max-batch-size`` / ``--max-wait-ms``).
+Scores are validated (finite numbers in 0..100) before they join a batch, so
+a bad request gets its own 400 and never reaches the model; if a batch call
+still fails, its rows are retried one by one so only the failing request
+gets a 500.
+
+Contoh:
+    python serve.py --port 8080 --max-batch-size 64 --max-wait-ms 2
+    python serve.py --metrics
+"""
+import argparse
+import asyncio
+import json
+import math
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+
+import numpy as np
+
+import knn_engine
+import metrics
+from model_artifact import SCORE_RANGE
+from model_loader import MODELS_DIR, load_knn_artifact, load_model_bundle
+
+FEATURE_COLUMNS = ['tech_score', 'soft_score', 'sjt_score', 'personality_score']
+
+
+def load_predictor(models_dir=MODELS_DIR):
+    """Return (classes, predict_proba) using the fused artifact, or the joblib bundle if it is missing"""
+    try:
+        artifact = load_knn_artifact(models_dir)
+    except FileNotFoundError:
+        import pandas as pd # Jalur sklearn: scaler di-fit dengan nama kolom
+
+        knn, le, scaler, _ = load_model_bundle(models_dir)
+        return le.classes_, lambda X: knn.predict_proba(scaler.transform(pd.DataFrame(X, columns=FEATURE_COLUMNS)))
+    return artifact.classes, lambda X: knn_engine.predict_proba(artifact, X)
+
+
+def parse_features(body):
+    """Scores of a /predict body in training order; ValueError with the reason if one is missing or invalid"""
+    def reject_constant(name):
+        raise ValueError(f"{name} bukan angka yang valid")
+
+    try:
+        payload = json.loads(body or b"{}", parse_constant=reject_constant)
+    except ValueError as e:
+        raise ValueError(f"Body bukan JSON yang valid: {e}") from None
+    if not isinstance(payload, dict):
+        raise ValueError("Body harus objek JSON dengan kolom " + ", ".join(FEATURE_COLUMNS))
+    missing = [name for name in FEATURE_COLUMNS if name not in payload]
+    if missing:
+        raise ValueError("Kolom tidak ada: " + ", ".join(missing))
+    low, high = SCORE_RANGE
+    features = []
+    for name in FEATURE_COLUMNS:
+        value = payload[name]
+        try:
+            if isinstance(value, bool):
+                raise TypeError
+            value = float(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"{name} harus angka") from None
+        if not math.isfinite(value) or not low <= value <= high:
+            raise ValueError(f"{name} harus angka {low:g}..{high:g}")
+        features.append(value)
+    return features
+
+
+class MicroBatcher:
+    """Coalesces concurrent single-row requests into batched predict_proba calls"""
+
+    def __init__(self, predict_proba, max_batch_size=64, max_wait_ms=2.0):
+        self.predict_proba = predict_proba
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.batches = 0
+        self.rows = 0
+        self._queue = asyncio.Queue()
+        # Satu thread khusus: prediksi tidak memblokir event loop dan batch dieksekusi berurutan
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="knn-batch")
+
+    async def submit(self, features):
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((features, future))
+        return await future
+
+    async def _collect(self):
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        deadline = loop.time() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    def _timed_predict_proba(self, X):
+        with metrics.timer("career_model_stage_seconds", stage="predict_batch", backend="serve"):
+            return self.predict_proba(X)
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            X = np.array([features for features, _ in batch], dtype=np.float64)
+            try:
+                proba = await loop.run_in_executor(self._executor, self._timed_predict_proba, X)
+            except Exception as e:
+                if len(batch) == 1:
+                    self._resolve(batch[0][1], exception=e)
+                    continue
+                # Satu baris yang gagal tidak boleh menggagalkan request lain di batch yang sama
+                for (_, future), row in zip(batch, X):
+                    try:
+                        row_proba = await loop.run_in_executor(self._executor, self.predict_proba, row[None, :])
+                    except Exception as row_error:
+                        self._resolve(future, exception=row_error)
+                    else:
+                        self._resolve(future, result=row_proba[0])
+                continue
+            self.batches += 1
+            self.rows += len(batch)
+            metrics.inc("career_serve_batches_total")
+            metrics.inc("career_serve_batch_rows_total", len(batch))
+            for (_, future), row in zip(batch, proba):
+                self._resolve(future, result=row)
+
+    @staticmethod
+    def _resolve(future, result=None, exception=None):
+        if future.done(): # Client sudah memutus koneksi
+            return
+        if exception is not None:
+            future.set_exception(exception)
+        else:
+            future.set_result(result)
+
+
+class InferenceServer:
+    def __init__(self, models_dir=MODELS_DIR, max_batch_size=64, max_wait_ms=2.0):
+        self.models_dir = models_dir
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.classes = None
+        self.batcher = None
+        self._batch_task = None
+
+    @property
+    def ready(self):
+        return self.batcher is not None
+
+    async def load_model(self):
+        """Load the model once, off the event loop, then start the batching task"""
+        classes, predict_proba = await asyncio.get_running_loop().run_in_executor(None, load_predictor, self.models_dir)
+        self.classes = [str(c) for c in classes]
+        self.batcher = MicroBatcher(predict_proba, self.max_batch_size, self.max_wait_ms)
+        self._batch_task = asyncio.create_task(self.batcher.run())
+
+    async def handle_predict(self, body):
+        try:
+            features = parse_features(body)
+        except ValueError as e:
+            return HTTPStatus.BAD_REQUEST, {"error": str(e)}
+        proba = await self.batcher.submit(features)
+        return HTTPStatus.OK, {
+            "career": self.classes[int(np.argmax(proba))],
+            "probabilities": dict(zip(self.classes, map(float, proba))),
+        }
+
+    async def route(self, method, path, body):
+        if path == "/healthz" and method == "GET":
+            return HTTPStatus.OK, {"status": "ok"}
+        if path == "/readyz" and method == "GET":
+            if not self.ready:
+                return HTTPStatus.SERVICE_UNAVAILABLE, {"status": "loading"}
+            return HTTPStatus.OK, {"status": "ready", "batches": self.batcher.batches, "rows": self.batcher.rows}
+        if path == "/metrics" and method == "GET" and metrics.enabled():
+            return HTTPStatus.OK, metrics.render()
+        if path == "/predict":
+            if method != "POST":
+                return HTTPStatus.METHOD_NOT_ALLOWED, {"error": "Gunakan POST"}
+            if not self.ready:
+                return HTTPStatus.SERVICE_UNAVAILABLE, {"error": "Model belum siap"}
+            return await self.handle_predict(body)
+        return HTTPStatus.NOT_FOUND, {"error": f"Path tidak dikenal: {path}"}
+
+    async def respond(self, method, path, body):
+        """(status, body bytes, content type); an error while handling the request is a 500"""
+        try:
+            status, payload = await self.route(method, path, body)
+            if isinstance(payload, str):
+                return status, payload.encode("utf-8"), "text/plain; version=0.0.4; charset=utf-8"
+            return status, json.dumps(payload, allow_nan=False).encode("utf-8"), "application/json"
+        except Exception as e:
+            print(f"Error saat memproses {method} {path}: {e!r}", file=sys.stderr, flush=True)
+            payload = {"error": "Terjadi kesalahan internal saat memproses request"}
+            return HTTPStatus.INTERNAL_SERVER_ERROR, json.dumps(payload).encode("utf-8"), "application/json"
+
+    async def handle_connection(self, reader, writer):
+        """Minimal HTTP/1.1 with keep-alive: one request at a time per connection"""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, version = request_line.decode("latin-1").split()
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+
+                status, data, content_type = await self.respond(method, path.split("?", 1)[0], body)
+                keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                writer.write(
+                    f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+                    f"Content-Type: {content_type}\r\n"
+                    f"Content-Length: {len(data)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1") + data
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass # Koneksi putus atau baris request/header rusak: tutup saja
+        finally:
+            writer.close()
+
+    async def serve(self, host, port):
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        await self.load_model()
+        print(f"Server siap di http://{host}:{port} (max batch {self.max_batch_size}, max wait {self.max_wait_ms} ms)", flush=True)
+        async with server:
+            await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="HTTP service prediksi karir dengan micro-batching")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--max-batch-size", type=int, default=64, help="Jumlah request maksimum per batch (default: 64)")
+    parser.add_argument("--max-wait-ms", type=float, default=2.0, help="Waktu tunggu maksimum untuk mengisi batch (default: 2 ms)")
+    parser.add_argument("--models-dir", default=MODELS_DIR, help="Folder artifact model (default: models/)")
+    parser.add_argument("--metrics", action="store_true", help="Aktifkan metrics dan endpoint GET /metrics")
+    args = parser.parse_args(argv)
+
+    if args.metrics:
+        metrics.enable()
+
+    server = InferenceServer(args.models_dir, args.max_batch_size, args.max_wait_ms)
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
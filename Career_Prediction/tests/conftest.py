@@ -0,0 +1,31 @@
+import os
+import sys
+
+import pytest
+
+# Modul proyek berada langsung di Career_Prediction/ (tanpa package)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+FEATURE_COLUMNS = ['tech_score', 'soft_score', 'sjt_score', 'personality_score']
+
+
+@pytest.fixture
+def sklearn_models_dir(tmp_path):
+    """Flat models folder with only the joblib bundle (no knn_model.bin), trained on random scores"""
+    import joblib
+    import numpy as np
+    import pandas as pd
+    from sklearn.neighbors import KNeighborsClassifier
+    from sklearn.preprocessing import LabelEncoder, StandardScaler
+
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.uniform(0, 100, (60, 4)), columns=FEATURE_COLUMNS)
+    careers = np.array(["Business Analyst", "Software Developer", "Project Manager"])[rng.integers(0, 3, len(X))]
+    le = LabelEncoder().fit(careers)
+    scaler = StandardScaler().fit(X)
+    knn = KNeighborsClassifier(n_neighbors=5, weights="distance").fit(scaler.transform(X), le.transform(careers))
+    models_dir = tmp_path / "models"
+    models_dir.mkdir()
+    for name, obj in (("knn_model.joblib", knn), ("label_encoder.joblib", le), ("scaler.joblib", scaler)):
+        joblib.dump(obj, models_dir / name)
+    return str(models_dir)
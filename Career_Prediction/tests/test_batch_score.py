@@ -0,0 +1,36 @@
+import numpy as np
+import pandas as pd
+
+from batch_score import ERROR_COLUMN, PREDICTION_COLUMN, run, score_chunk
+
+
+def _cohort():
+    return pd.DataFrame({
+        "tech_score": ["80", "abc", "55", "70", "20"],
+        "soft_score": [60.0, 50.0, np.nan, 40.0, 30.0],
+        "sjt_score": [70.0, 50.0, 50.0, 150.0, 30.0],
+        "personality_score": [40.0, 50.0, 50.0, 60.0, np.inf],
+        "career": ["Project Manager"] * 5,
+    })
+
+
+def test_score_chunk_keeps_career_and_flags_invalid_rows(sklearn_models_dir):
+    result = score_chunk(_cohort(), 2, sklearn_models_dir)
+
+    assert list(result["career"]) == ["Project Manager"] * 5
+    assert result[PREDICTION_COLUMN].notna().tolist() == [True, False, False, False, False]
+    assert result[ERROR_COLUMN].isna().tolist() == [True, False, False, False, False]
+    assert "tech_score=abc" in result[ERROR_COLUMN][1]
+    assert "sjt_score=150.0" in result[ERROR_COLUMN][3]
+    assert result[PREDICTION_COLUMN][0] == result["career_1"][0]
+    assert np.isnan(result["proba_1"][1:]).all()
+
+
+def test_run_continues_past_invalid_rows(tmp_path, sklearn_models_dir):
+    source = tmp_path / "cohort.csv"
+    _cohort().to_csv(source, index=False)
+    for output in (tmp_path / "hasil.csv", tmp_path / "hasil.parquet"):
+        rows, invalid, _ = run(str(source), str(output), chunksize=2, models_dir=sklearn_models_dir, log=None)
+        assert (rows, invalid) == (5, 4)
+        written = pd.read_parquet(output) if output.suffix == ".parquet" else pd.read_csv(output)
+        assert len(written) == 5 and written[ERROR_COLUMN].notna().sum() == 4
@@ -0,0 +1,24 @@
+import numpy as np
+import pytest
+
+from dataset_io import LABEL_COLUMN, open_dataset, to_frame
+
+HEADER = "tech_score,soft_score,sjt_score,personality_score,career\n"
+
+
+def test_missing_career_stops_conversion(tmp_path):
+    source = tmp_path / "data.csv"
+    source.write_text(HEADER + "80,60,70,40,Software Developer\n50,50,50,50,\n20,30,40,50,Project Manager\n")
+    cache_dir = tmp_path / "cache"
+    with pytest.raises(ValueError, match="baris data ke-2"):
+        open_dataset(str(source), cache_dir=str(cache_dir), chunksize=2)
+    assert not any(cache_dir.iterdir())
+
+
+def test_labels_are_sorted_codes_across_chunks(tmp_path):
+    source = tmp_path / "data.csv"
+    source.write_text(HEADER + "1,1,1,1,Zoologist\n2,2,2,2,Analyst\n3,3,3,3,Manager\n4,4,4,4,Zoologist\n")
+    dataset = open_dataset(str(source), cache_dir=str(tmp_path / "cache"), chunksize=2)
+    assert dataset.classes == ["Analyst", "Manager", "Zoologist"]
+    np.testing.assert_array_equal(dataset.labels, [2, 0, 1, 2])
+    assert list(to_frame(dataset)[LABEL_COLUMN]) == ["Zoologist", "Analyst", "Manager", "Zoologist"]
@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.model_selection import cross_val_score
+from sklearn.neighbors import KNeighborsClassifier
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
+
+from generate_dataset import DATASET_PATH, FEATURE_COLUMNS, LABEL_COLUMN, adjust_model, fit_class_model, generate_chunk
+
+
+@pytest.fixture(scope="module")
+def source():
+    return pd.read_csv(DATASET_PATH)
+
+
+def _knn():
+    return make_pipeline(StandardScaler(), KNeighborsClassifier(n_neighbors=5, weights="distance"))
+
+
+def test_per_class_marginals_match_source(source):
+    synthetic = generate_chunk(fit_class_model(source), 100_000, 42, 0)
+    for career, real in source.groupby(LABEL_COLUMN):
+        fake = synthetic.loc[synthetic[LABEL_COLUMN] == career, FEATURE_COLUMNS]
+        real = real[FEATURE_COLUMNS]
+        assert abs(len(fake) / len(synthetic) - len(real) / len(source)) < 0.01
+        np.testing.assert_allclose(fake.mean(), real.mean(), atol=1.5)
+        np.testing.assert_allclose(fake.std(), real.std(), atol=1.5)
+        # Massa titik di 100 dipertahankan, dan tidak ada massa titik baru di 0
+        np.testing.assert_allclose((fake == 100).mean(), (real == 100).mean(), atol=0.02)
+        assert ((fake == 0).mean() <= (real == 0).mean()).all()
+        assert fake.min().min() >= 0 and fake.max().max() <= 100
+
+
+def test_knn_accuracy_close_to_source(source):
+    model = fit_class_model(source)
+    real_accuracy = cross_val_score(_knn(), source[FEATURE_COLUMNS], source[LABEL_COLUMN], cv=5).mean()
+    sample = generate_chunk(model, len(source), 42, 0)
+    synthetic_accuracy = cross_val_score(_knn(), sample[FEATURE_COLUMNS], sample[LABEL_COLUMN], cv=5).mean()
+    assert abs(synthetic_accuracy - real_accuracy) < 0.05
+
+    # Model yang dilatih pada data sintetis tetap berguna untuk data asli
+    large = generate_chunk(model, 50_000, 7, 0)
+    transfer = _knn().fit(large[FEATURE_COLUMNS], large[LABEL_COLUMN]).score(source[FEATURE_COLUMNS], source[LABEL_COLUMN])
+    assert transfer > real_accuracy - 0.05
+
+
+def test_chunks_are_deterministic_and_full_overlap_merges_careers(source):
+    model = fit_class_model(source)
+    pd.testing.assert_frame_equal(generate_chunk(model, 1000, 3, 2), generate_chunk(model, 1000, 3, 2))
+
+    careers = ["Software Developer", "Technical Specialist"]
+    merged = generate_chunk(adjust_model(model, overlap=1.0, overlap_classes=careers), 40_000, 1, 0)
+    means = merged[merged[LABEL_COLUMN].isin(careers)].groupby(LABEL_COLUMN, observed=True)[FEATURE_COLUMNS].mean()
+    np.testing.assert_allclose(means.loc[careers[0]], means.loc[careers[1]], atol=1.0)
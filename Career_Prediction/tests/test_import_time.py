@@ -0,0 +1,18 @@
+"""Home and quiz pages of app.py must not import the heavy libraries (see check_import_time.py)."""
+import pytest
+
+pytest.importorskip("streamlit")
+
+from check_import_time import LIGHT_PAGES, heavy_imports, profile_page
+
+
+@pytest.mark.parametrize("page", LIGHT_PAGES)
+def test_light_page_imports_no_heavy_modules(page):
+    _, modules = profile_page(page)
+    assert heavy_imports(modules) == []
+
+
+def test_results_page_profile_detects_heavy_modules():
+    # Memastikan parsing -X importtime masih bekerja: halaman hasil memang memuat numpy
+    _, modules = profile_page("results")
+    assert "numpy" in heavy_imports(modules)
@@ -0,0 +1,143 @@
+"""knn_engine against sklearn's KNeighborsClassifier on tied and untied queries.
+
+The reference rows contain exact duplicates with different labels, so many
+queries have several rows at the distance of the k-th neighbour. Untied
+queries must match sklearn exactly; tied ones must match sklearn's distances
+with equidistant rows taken in index order (knn_engine's documented rule).
+"""
+import numpy as np
+import pytest
+from sklearn.neighbors import KNeighborsClassifier
+from sklearn.preprocessing import StandardScaler
+
+import knn_engine
+from knn_ensemble import fit_ensemble
+from model_artifact import dequantize, open_artifact, write_artifact
+from prediction_table import build_table
+from train_knn_model import evaluate_served, index_order_predict_proba, index_order_proba
+
+K = 5
+N_CLASSES = 5
+
+
+@pytest.fixture(scope="module")
+def dataset():
+    rng = np.random.default_rng(0)
+    base = rng.uniform(0, 100, (80, 4))
+    raw = np.repeat(base, rng.integers(1, 9, len(base)), axis=0)
+    raw = raw[rng.permutation(len(raw))]
+    y = rng.integers(0, N_CLASSES, len(raw))
+    queries = np.concatenate([rng.uniform(0, 100, (300, 4)), base[:40]])
+    return raw, y, queries, StandardScaler().fit(raw)
+
+
+def _artifact(tmp_path, dataset, quantize=None, members=None, X_ref=None):
+    raw, y, _, scaler = dataset
+    path = tmp_path / "knn_model.bin"
+    X_ref = scaler.transform(raw) if X_ref is None else X_ref
+    write_artifact(str(path), scaler.mean_, scaler.scale_, X_ref, y, [f"karir {c}" for c in range(N_CLASSES)],
+                   quantize=quantize, members=members, n_neighbors=K, weights="distance")
+    return open_artifact(str(path), verify=True)
+
+
+def _ranked(knn, X):
+    """sklearn distances and indices of every training row, ordered by (distance, index)"""
+    dist, idx = knn.kneighbors(X, n_neighbors=knn.n_samples_fit_)
+    order = np.lexsort((idx, dist))
+    return np.take_along_axis(dist, order, axis=1), np.take_along_axis(idx, order, axis=1)
+
+
+def _tied(knn, X):
+    dist, _ = knn.kneighbors(X, n_neighbors=K + 1)
+    return dist[:, K - 1] == dist[:, K]
+
+
+@pytest.mark.parametrize("quantize", [None, "float16", "uint8"])
+def test_matches_sklearn_on_tied_and_untied_queries(tmp_path, dataset, quantize):
+    _, y, queries, scaler = dataset
+    artifact = _artifact(tmp_path, dataset, quantize)
+    # sklearn di-fit pada referensi yang tersimpan (hasil dekuantisasi), sama seperti engine
+    knn = KNeighborsClassifier(n_neighbors=K, weights="distance").fit(dequantize(artifact).astype(np.float64), y)
+    X = scaler.transform(queries)
+    tied = _tied(knn, X)
+    assert 0 < tied.sum() < len(X)
+
+    proba = knn_engine.predict_proba(artifact, queries)
+    np.testing.assert_allclose(proba[~tied], knn.predict_proba(X)[~tied], rtol=0, atol=1e-12)
+    np.testing.assert_array_equal(knn_engine.predict(artifact, queries)[~tied], knn.predict(X)[~tied])
+
+    # Seri: tetangga = k baris pertama menurut (jarak sklearn, indeks)
+    dist, idx = knn_engine.kneighbors(artifact, X)
+    ref_dist, ref_idx = _ranked(knn, X)
+    np.testing.assert_allclose(dist, ref_dist[:, :K], rtol=0, atol=1e-9)
+    order = np.lexsort((idx, dist))
+    np.testing.assert_array_equal(np.take_along_axis(idx, order, axis=1), ref_idx[:, :K])
+    np.testing.assert_allclose(proba, index_order_proba(knn, X, y, N_CLASSES), rtol=0, atol=1e-12)
+
+
+def test_index_order_proba_is_sklearn_without_ties(dataset):
+    raw, y, queries, scaler = dataset
+    knn = KNeighborsClassifier(n_neighbors=K, weights="distance").fit(scaler.transform(raw), y)
+    X = scaler.transform(queries)
+    untied = ~_tied(knn, X)
+    np.testing.assert_allclose(index_order_proba(knn, X, y, N_CLASSES)[untied], knn.predict_proba(X)[untied],
+                               rtol=0, atol=1e-12)
+
+
+def test_ensemble_matches_members(tmp_path, dataset):
+    raw, y, queries, scaler = dataset
+    X_ref = scaler.transform(raw).astype(np.float32).astype(np.float64) # Nilai yang tersimpan di artifact
+    ensemble = fit_ensemble(X_ref, y, n_estimators=4, n_neighbors=K, max_features=3, workers=1)
+    artifact = _artifact(tmp_path, dataset, members=list(zip(ensemble.rows, ensemble.features)), X_ref=X_ref)
+    X = scaler.transform(queries)
+
+    proba = knn_engine.predict_proba(artifact, queries)
+    expected = sum(index_order_proba(member, X, y, N_CLASSES, rows, features)
+                   for member, rows, features in zip(ensemble.members, ensemble.rows, ensemble.features))
+    np.testing.assert_allclose(proba, expected / ensemble.n_estimators, rtol=0, atol=1e-12)
+    np.testing.assert_allclose(proba, index_order_predict_proba(ensemble, X, y, N_CLASSES), rtol=0, atol=1e-12)
+
+    untied = ~np.any([_tied(member, X[:, features]) for member, features in zip(ensemble.members, ensemble.features)],
+                     axis=0)
+    assert untied.any()
+    np.testing.assert_allclose(proba[untied], ensemble.predict_proba(X)[untied], rtol=0, atol=1e-12)
+
+    with pytest.raises(ValueError):
+        knn_engine.kneighbors(artifact, X)
+
+
+@pytest.mark.parametrize("algorithm", ["kd_tree", "brute"])
+@pytest.mark.parametrize("window", [0, 1, 3])
+def test_index_order_proba_resolves_ties_past_the_window(dataset, window, algorithm):
+    raw, y, queries, scaler = dataset
+    knn = KNeighborsClassifier(n_neighbors=K, weights="distance", algorithm=algorithm).fit(scaler.transform(raw), y)
+    X = scaler.transform(queries)
+    np.testing.assert_allclose(index_order_proba(knn, X, y, N_CLASSES, window=window, max_cells=500),
+                               index_order_proba(knn, X, y, N_CLASSES, window=len(raw)), rtol=0, atol=1e-12)
+
+
+@pytest.mark.parametrize("quantize", [None, "uint8"])
+def test_prediction_table_from_sklearn_tree_matches_engine(tmp_path, dataset, quantize):
+    _, y, _, _ = dataset
+    artifact = _artifact(tmp_path, dataset, quantize)
+    knn = KNeighborsClassifier(n_neighbors=K, weights="distance").fit(dequantize(artifact).astype(np.float64), y)
+    from_tree = build_table(artifact, lambda X: index_order_predict_proba(knn, X, y, N_CLASSES))
+    np.testing.assert_array_equal(from_tree.codes, build_table(artifact).codes)
+
+
+def test_evaluate_served_reports_the_quantized_artifact(tmp_path, dataset):
+    raw, y, queries, scaler = dataset
+    from sklearn.preprocessing import LabelEncoder
+
+    artifact = _artifact(tmp_path, dataset, "uint8")
+    le = LabelEncoder().fit([f"karir {c}" for c in range(N_CLASSES)])
+    knn = KNeighborsClassifier(n_neighbors=K, weights="distance").fit(scaler.transform(raw), y)
+    X_test = scaler.transform(queries)
+    y_test = np.random.default_rng(1).integers(0, N_CLASSES, len(queries))
+    float_accuracy = float(np.mean(knn.predict(X_test) == y_test))
+
+    served = evaluate_served(knn, (scaler.transform(raw), X_test, y, y_test), (le, None), (scaler, None),
+                             {"accuracy": float_accuracy}, "uint8", chunksize=64)
+    assert served["accuracy"] == np.mean(knn_engine.predict(artifact, queries) == y_test)
+    assert served["confusion_matrix"].sum() == len(y_test)
+    assert served["quantization"]["accuracy_float"] == float_accuracy
@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+from sklearn.neighbors import KNeighborsClassifier
+
+from knn_ensemble import draw_members, fit_ensemble
+
+
+@pytest.fixture(scope="module")
+def dataset():
+    rng = np.random.default_rng(0)
+    y = rng.integers(0, 3, 900)
+    X = rng.normal(0, 1, (len(y), 4)) + y[:, None] * [1.0, 0.5, 0.0, 1.5]
+    return X, y
+
+
+def test_members_are_distinct_bootstrap_rows():
+    members = draw_members(1000, 4, 8, max_features=2, random_state=3)
+    for rows, features in members:
+        assert np.all(np.diff(rows) > 0) # Unik dan terurut
+        assert 0.55 < len(rows) / 1000 < 0.71 # Sekitar 1 - 1/e baris berbeda
+        assert len(features) == 2 and np.all(np.diff(features) > 0)
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_oob_coverage_and_accuracy_match_a_direct_recomputation(dataset, workers):
+    X, y = dataset
+    ensemble = fit_ensemble(X, y, n_estimators=4, n_neighbors=5, max_features=3, workers=workers, random_state=1)
+
+    seen = np.zeros((ensemble.n_estimators, len(y)), dtype=bool)
+    for m, rows in enumerate(ensemble.rows):
+        seen[m, rows] = True
+    covered = ~seen.all(axis=0)
+    assert ensemble.oob_["oob_coverage"] == covered.mean()
+    assert ensemble.oob_["oob_coverage"] == pytest.approx(1 - (1 - np.exp(-1)) ** 4, abs=0.05)
+
+    # Prediksi out-of-bag ulang: rata-rata anggota yang tidak melihat baris itu
+    oob_sum = np.zeros((len(y), 3))
+    for m, (knn, features) in enumerate(zip(ensemble.members, ensemble.features)):
+        unseen = np.flatnonzero(~seen[m])
+        oob_sum[unseen[:, None], knn.classes_] += knn.predict_proba(X[unseen][:, features])
+    oob_pred = np.argmax(oob_sum[covered], axis=1)
+    assert ensemble.oob_["oob_accuracy"] == pytest.approx(np.mean(oob_pred == y[covered]), abs=1e-12)
+    assert ensemble.oob_["oob_confusion_matrix"].sum() == covered.sum()
+
+
+def test_oob_accuracy_estimates_holdout_accuracy(dataset):
+    X, y = dataset
+    rng = np.random.default_rng(5)
+    y_test = rng.integers(0, 3, 3000)
+    X_test = rng.normal(0, 1, (len(y_test), 4)) + y_test[:, None] * [1.0, 0.5, 0.0, 1.5]
+
+    ensemble = fit_ensemble(X, y, n_estimators=10, n_neighbors=5, random_state=2)
+    holdout = np.mean(ensemble.predict(X_test) == y_test)
+    assert ensemble.oob_["oob_coverage"] > 0.98
+    assert abs(ensemble.oob_["oob_accuracy"] - holdout) < 0.05
+    # Ensemble tidak lebih buruk dari satu model KNN pada data yang sama
+    single = np.mean(KNeighborsClassifier(n_neighbors=5, weights="distance").fit(X, y).predict(X_test) == y_test)
+    assert holdout > single - 0.03
@@ -0,0 +1,15 @@
+import urllib.request
+
+import metrics
+
+
+def test_http_server_is_local_by_default():
+    server = metrics.start_http_server(0)
+    try:
+        host, port = server.server_address
+        assert host == "127.0.0.1"
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics") as response:
+            assert response.status == 200
+    finally:
+        server.shutdown()
+        server.server_close()
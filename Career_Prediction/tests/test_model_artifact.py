@@ -0,0 +1,46 @@
+import json
+
+import numpy as np
+import pytest
+
+from model_artifact import _PREAMBLE, open_artifact, write_artifact
+
+CLASSES = ["Business Analyst", "Project Manager", "Software Developer"]
+
+
+def _write(path, classes=CLASSES, quantize=None, **params):
+    rng = np.random.default_rng(0)
+    X_ref = rng.normal(size=(30, 4))
+    y_ref = rng.integers(0, len(classes), len(X_ref))
+    params = {"n_neighbors": 5, "weights": "distance", **params}
+    return write_artifact(str(path), np.full(4, 50.0), np.full(4, 20.0), X_ref, y_ref, classes,
+                          quantize=quantize, **params)["sha256"]
+
+
+def test_hash_covers_params_classes_and_quantization(tmp_path):
+    base = _write(tmp_path / "base.bin")
+    assert _write(tmp_path / "same.bin") == base
+    variants = [
+        _write(tmp_path / "k7.bin", n_neighbors=7),
+        _write(tmp_path / "uniform.bin", weights="uniform"),
+        _write(tmp_path / "classes.bin", classes=["A", "B", "C"]),
+        _write(tmp_path / "float16.bin", quantize="float16"),
+    ]
+    assert len({base, *variants}) == 5
+    for name in ("base", "k7", "uniform", "classes", "float16"):
+        open_artifact(str(tmp_path / f"{name}.bin"), verify=True)
+
+
+def test_verify_detects_changed_header(tmp_path):
+    path = tmp_path / "knn_model.bin"
+    _write(path)
+    data = path.read_bytes()
+    magic, version, header_len = _PREAMBLE.unpack_from(data, 0)
+    header = json.loads(data[_PREAMBLE.size:_PREAMBLE.size + header_len])
+    header["params"]["n_neighbors"] = 7
+    header_bytes = json.dumps(header, sort_keys=True).encode("utf-8").ljust(header_len)
+    path.write_bytes(data[:_PREAMBLE.size] + header_bytes + data[_PREAMBLE.size + header_len:])
+
+    open_artifact(str(path)) # Tanpa verify tetap terbuka
+    with pytest.raises(ValueError, match="tidak cocok"):
+        open_artifact(str(path), verify=True)
@@ -0,0 +1,35 @@
+import model_registry
+
+
+def _export(models_dir):
+    staging = model_registry.new_staging_dir(models_dir)
+    with open(f"{staging}/knn_model.joblib", "wb") as f:
+        f.write(b"model")
+    return staging
+
+
+def test_publish_same_files_in_same_second_keeps_both(tmp_path, monkeypatch):
+    models_dir = str(tmp_path)
+    monkeypatch.setattr(model_registry.time, "strftime", lambda fmt: "20261017-120000" if "%H%M%S" in fmt else "")
+    first = model_registry.publish(_export(models_dir), models_dir)
+    second = model_registry.publish(_export(models_dir), models_dir)
+    third = model_registry.publish(_export(models_dir), models_dir)
+
+    assert second == f"{first}-2" and third == f"{first}-3"
+    assert [m["version"] for m in model_registry.list_versions(models_dir)] == [first, second, third]
+    for version in (first, second, third):
+        assert model_registry.verify(models_dir, version) == []
+
+
+def test_versions_are_listed_in_publish_order(tmp_path, monkeypatch):
+    models_dir = str(tmp_path)
+    monkeypatch.setattr(model_registry.time, "strftime", lambda fmt: "20261017-120000" if "%H%M%S" in fmt else "")
+    published = []
+    for content in (b"b", b"a", b"c"): # Hash menurun: urutan nama terbalik dari urutan publish
+        staging = model_registry.new_staging_dir(models_dir)
+        with open(f"{staging}/knn_model.joblib", "wb") as f:
+            f.write(content)
+        published.append(model_registry.publish(staging, models_dir))
+
+    assert sorted(published) != published
+    assert [m["version"] for m in model_registry.list_versions(models_dir)] == published
@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+from sklearn.model_selection import StratifiedKFold, cross_val_predict
+from sklearn.neighbors import KNeighborsClassifier
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
+
+from model_selection import select
+
+CLASSES = ["Business Analyst", "Project Manager", "Software Developer"]
+
+
+@pytest.fixture(scope="module")
+def dataset():
+    rng = np.random.default_rng(0)
+    y = rng.integers(0, len(CLASSES), 600)
+    X = rng.normal(0, 1, (len(y), 4)) * [10, 5, 20, 1] + y[:, None] * [4, 2, 0, 0.5] + [50, 40, 60, 3]
+    return X, y
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_select_matches_cross_val_predict(dataset, workers):
+    X, y = dataset
+    rows = select(X, y, CLASSES, k_max=12, n_folds=4, workers=workers, random_state=7)
+    by_config = {(row["weights"], row["n_neighbors"]): row for row in rows}
+    assert len(rows) == 2 * 12
+
+    folds = StratifiedKFold(n_splits=4, shuffle=True, random_state=7)
+    for weights in ("uniform", "distance"):
+        for k in (1, 4, 7, 12):
+            model = make_pipeline(StandardScaler(), KNeighborsClassifier(n_neighbors=k, weights=weights))
+            y_pred = cross_val_predict(model, X, y, cv=folds)
+            row = by_config[(weights, k)]
+            assert row["accuracy"] == pytest.approx(np.mean(y_pred == y), abs=1e-12)
+            for c, career in enumerate(CLASSES):
+                assert row[f"recall[{career}]"] == pytest.approx(np.mean(y_pred[y == c] == c), abs=1e-12)
@@ -0,0 +1,79 @@
+import importlib
+import sys
+import textwrap
+
+import pytest
+
+import pipeline_cache
+from pipeline_cache import PipelineCache
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    """Stage module whose result comes from a helper in another project module (helper imports constants)"""
+    def write(name, source):
+        (tmp_path / f"{name}.py").write_text(textwrap.dedent(source))
+
+    write("constants_mod", "OFFSET = 1\n")
+    write("helper_mod", """
+        from constants_mod import OFFSET
+
+        def value():
+            return 40 + OFFSET
+    """)
+    write("stage_mod", """
+        def double(x):
+            return 2 * x
+
+        def stage(scale):
+            from helper_mod import value
+            print("nilai:", value())
+            return double(value()) * scale
+    """)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    modules = ("constants_mod", "helper_mod", "stage_mod")
+    for name in modules:
+        sys.modules.pop(name, None)
+    yield write
+    for name in modules:
+        sys.modules.pop(name, None)
+
+
+def _key(cache):
+    stage_mod = importlib.import_module("stage_mod")
+    return cache.stage_key("stage", stage_mod.stage, params={"scale": 1})
+
+
+def test_key_follows_helpers_modules_and_libraries(tmp_path, project, monkeypatch):
+    cache = PipelineCache(str(tmp_path / "cache"))
+    key = _key(cache)
+    assert _key(cache) == key
+
+    project("constants_mod", "OFFSET = 2\n") # Modul yang di-import oleh modul helper
+    changed = _key(cache)
+    assert changed != key
+
+    monkeypatch.setattr(pipeline_cache, "library_versions", lambda: {"scikit-learn": "0.0"})
+    assert _key(cache) != changed
+
+
+def test_same_module_helper_is_part_of_key(tmp_path, project):
+    cache = PipelineCache(str(tmp_path / "cache"))
+    stage_mod = importlib.import_module("stage_mod")
+    key = cache.stage_key("stage", stage_mod.stage)
+    stage_mod.double = lambda x: 3 * x # Bukan fungsi dari modul ini lagi: source lama tidak ikut
+    assert cache.stage_key("stage", stage_mod.stage) != key
+
+
+def test_cached_run_replays_output(tmp_path, project, capsys):
+    logs = []
+    cache = PipelineCache(str(tmp_path / "cache"), log=logs.append)
+    stage_mod = importlib.import_module("stage_mod")
+
+    first = cache.run("stage", stage_mod.stage, params={"scale": 2})
+    assert first.value == 164 and capsys.readouterr().out == "nilai: 41\n"
+
+    second = cache.run("stage", stage_mod.stage, params={"scale": 2})
+    assert second == first
+    assert capsys.readouterr().out == "nilai: 41\n"
+    assert logs and "dipakai ulang" in logs[-1]
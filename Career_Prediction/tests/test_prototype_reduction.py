@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+from scipy.spatial.distance import cdist
+
+from prototype_reduction import (condensed_nearest_neighbours, edited_nearest_neighbours, kmeans_prototypes,
+                                 reduce_reference_set)
+
+
+@pytest.fixture(scope="module")
+def dataset():
+    rng = np.random.default_rng(0)
+    y = rng.integers(0, 3, 400)
+    X = rng.normal(0, 1, (len(y), 4)) + y[:, None] * 1.5 # Kelas tumpang tindih sebagian
+    return X, y
+
+
+def _neighbor_votes(X, y, k):
+    """Brute-force label votes of each row's k nearest other rows"""
+    distances = cdist(X, X)
+    np.fill_diagonal(distances, np.inf)
+    neighbors = np.argsort(distances, axis=1)[:, :k]
+    return np.stack([np.bincount(labels, minlength=int(y.max()) + 1) for labels in y[neighbors]])
+
+
+def test_enn_keeps_exactly_the_rows_their_neighbours_agree_with(dataset):
+    X, y = dataset
+    keep = edited_nearest_neighbours(X, y, n_neighbors=3)
+    votes = _neighbor_votes(X, y, 3)
+    agrees = votes[np.arange(len(y)), y] == votes.max(axis=1)
+    np.testing.assert_array_equal(keep, np.flatnonzero(agrees))
+    assert 0 < len(keep) < len(y)
+
+
+@pytest.mark.parametrize("batch_size", [None, 1, 37])
+def test_cnn_subset_classifies_every_row_with_1nn(dataset, batch_size):
+    X, y = dataset
+    keep = condensed_nearest_neighbours(X, y, batch_size=batch_size, max_passes=50)
+    assert len(np.unique(keep)) == len(keep) < len(y)
+    assert set(y[keep]) == set(y)
+    nearest = keep[np.argmin(cdist(X, X[keep]), axis=1)]
+    np.testing.assert_array_equal(y[nearest], y)
+
+
+def test_enn_then_cnn_is_smaller_than_cnn_alone(dataset):
+    X, y = dataset
+    X_enn, y_enn = reduce_reference_set(X, y, "enn")
+    X_both, y_both = reduce_reference_set(X, y, "enn+cnn")
+    X_cnn, _ = reduce_reference_set(X, y, "cnn")
+    assert len(X_both) < len(X_cnn) and len(X_both) < len(X_enn)
+    # Setiap prototipe enn+cnn adalah baris hasil ENN dengan label aslinya
+    rows = [np.flatnonzero((X_enn == row).all(axis=1))[0] for row in X_both]
+    np.testing.assert_array_equal(y_enn[rows], y_both)
+
+
+def test_kmeans_prototypes_per_class(dataset):
+    X, y = dataset
+    X_ref, y_ref = kmeans_prototypes(X, y, prototypes_per_class=10)
+    np.testing.assert_array_equal(np.bincount(y_ref), [10, 10, 10])
+    assert X_ref.dtype == X.dtype and X_ref.shape == (30, X.shape[1])
+
+
+def test_unknown_method_is_rejected(dataset):
+    X, y = dataset
+    with pytest.raises(ValueError):
+        reduce_reference_set(X, y, "acak")
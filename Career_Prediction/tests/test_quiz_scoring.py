@@ -0,0 +1,50 @@
+import random
+
+import numpy as np
+import pytest
+
+from quiz_bank import QUIZZES, _option_count, _option_orders, calculate_score, new_quiz_state, score_quiz
+from quiz_scoring import score_answers
+
+
+def _submissions(quiz_type, n, seed, unanswered=0.0):
+    """n quiz runs with random displayed answers; a fraction left unanswered (-1)"""
+    rng = random.Random(seed)
+    questions = QUIZZES[quiz_type]['questions']
+    max_options = max(_option_count(quiz_type, q) for q in questions)
+    states, answers, permutations = [], [], []
+    for _ in range(n):
+        state = new_quiz_state(quiz_type, rng)
+        orders = [list(order) for order in _option_orders(quiz_type, state)]
+        states.append(state)
+        answers.append([-1 if rng.random() < unanswered else rng.randrange(len(order)) for order in orders])
+        permutations.append([order + [0] * (max_options - len(order)) for order in orders])
+    # Bank tanpa acak opsi dinilai tanpa permutasi, seperti pemanggil biasa
+    return states, np.array(answers), np.array(permutations) if QUIZZES[quiz_type].get('shuffle_options') else None
+
+
+@pytest.mark.parametrize("quiz_type", sorted(QUIZZES))
+def test_matches_score_quiz_for_completed_quizzes(quiz_type):
+    states, answers, permutations = _submissions(quiz_type, 300, seed=0)
+    question_ids = np.array([list(state.question_ids) for state in states])
+
+    scores = score_answers(quiz_type, question_ids, answers, permutations)
+    expected = [score_quiz(quiz_type, state, list(row)) for state, row in zip(states, answers)]
+    np.testing.assert_array_equal(scores, expected)
+
+
+@pytest.mark.parametrize("quiz_type", sorted(QUIZZES))
+def test_unanswered_questions_earn_nothing(quiz_type):
+    quiz = QUIZZES[quiz_type]
+    states, answers, permutations = _submissions(quiz_type, 300, seed=1, unanswered=0.3)
+    question_ids = np.array([list(state.question_ids) for state in states])
+    assert (answers == -1).any()
+
+    scores = score_answers(quiz_type, question_ids, answers, permutations)
+    expected = []
+    for state, row in zip(states, answers):
+        # Jawaban -1 tetap -1 di indeks opsi asli; calculate_score tidak memberi nilai
+        original = [order[a] if a >= 0 else -1 for a, order in zip(row, _option_orders(quiz_type, state))]
+        expected.append(calculate_score(original, [quiz['questions'][i] for i in state.question_ids],
+                                        scoring_type=quiz['scoring_type']))
+    np.testing.assert_array_equal(scores, expected)
@@ -0,0 +1,91 @@
+import csv
+import shutil
+import sqlite3
+import threading
+
+import model_registry
+from model_loader import clear_cache, model_version
+from result_store import COLUMNS, ResultStore, export_csv
+
+SCORES = {"sjt": 70.0, "personality": 40.0, "tech": 80.0, "soft": 60.0}
+
+
+def _rows(path):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute(f"SELECT {', '.join(COLUMNS)} FROM assessment_results ORDER BY id").fetchall()
+    finally:
+        conn.close()
+
+
+def test_save_returns_before_the_write_and_flush_waits_for_it(tmp_path, monkeypatch):
+    path = str(tmp_path / "hasil.db")
+    release = threading.Event()
+    next_batch = ResultStore._next_batch
+
+    def blocked_batch(self):
+        release.wait() # Writer ditahan: save() tetap harus langsung kembali
+        return next_batch(self)
+
+    monkeypatch.setattr(ResultStore, "_next_batch", blocked_batch)
+    store = ResultStore(path)
+    store._queue.put(("warmup", "2026-01-01T00:00:00", None, None, None, None, None, None))
+    store.save("ana", SCORES, "Project Manager", "v1")
+    assert _rows(path) == []
+
+    release.set()
+    store.flush()
+    assert [row[0] for row in _rows(path)] == ["warmup", "ana"]
+    store.close()
+    assert not store._writer.is_alive()
+
+
+def test_rows_are_written_in_batches(tmp_path, monkeypatch):
+    path = str(tmp_path / "hasil.db")
+    batches = []
+    next_batch = ResultStore._next_batch
+
+    def recorded_batch(self):
+        batch, stop = next_batch(self)
+        batches.append(len(batch))
+        return batch, stop
+
+    monkeypatch.setattr(ResultStore, "_next_batch", recorded_batch)
+    store = ResultStore(path, max_batch=7, flush_interval=1.0)
+    for i in range(20):
+        store.save(f"user {i}", SCORES, "Software Developer", "v1", created_at=f"2026-01-01T00:00:{i:02d}")
+    store.close()
+
+    assert store.written == 20 and store.failed == 0
+    assert max(batches) == 7 and sum(batches) == 20
+    assert [row[0] for row in _rows(path)] == [f"user {i}" for i in range(20)]
+
+
+def test_export_csv_filters_by_created_at(tmp_path):
+    path = str(tmp_path / "hasil.db")
+    store = ResultStore(path)
+    store.save("lama", SCORES, "Business Analyst", "v1", created_at="2025-12-31T23:59:59")
+    store.save("baru", {"tech": 55.0}, None, None, created_at="2026-01-02T08:00:00")
+    store.close()
+
+    out = tmp_path / "hasil.csv"
+    assert export_csv(str(out), path, since="2026-01-01") == 1
+    with open(out, newline="") as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == list(COLUMNS)
+    assert rows[1][0] == "baru" and rows[1][4] == "55.0" and rows[1][2] == ""
+    assert export_csv(str(out), path) == 2
+
+
+def test_model_version_is_the_promoted_registry_version(sklearn_models_dir):
+    clear_cache()
+    flat_hash = model_version(sklearn_models_dir)
+    assert len(flat_hash) == 12 # Layout datar: hash isi model
+
+    staging = model_registry.new_staging_dir(sklearn_models_dir)
+    for name in ("knn_model.joblib", "label_encoder.joblib", "scaler.joblib"):
+        shutil.copy(f"{sklearn_models_dir}/{name}", staging)
+    version = model_registry.publish(staging, sklearn_models_dir)
+    model_registry.promote(sklearn_models_dir, version, check=False)
+    assert model_version(sklearn_models_dir) == version
+    clear_cache()
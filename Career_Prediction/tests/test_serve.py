@@ -0,0 +1,81 @@
+import asyncio
+import json
+
+import pytest
+
+from serve import InferenceServer, parse_features
+
+VALID = {"tech_score": 80, "soft_score": 60, "sjt_score": 70, "personality_score": 40}
+
+
+def _body(**scores):
+    return json.dumps({**VALID, **scores}).encode("utf-8")
+
+
+def _strict_json(data):
+    def reject_constant(name):
+        raise AssertionError(f"JSON tidak valid: {name}")
+    return json.loads(data, parse_constant=reject_constant)
+
+
+@pytest.mark.parametrize("body", [
+    b'{"tech_score": NaN, "soft_score": 1, "sjt_score": 1, "personality_score": 1}',
+    b'{"tech_score": Infinity, "soft_score": 1, "sjt_score": 1, "personality_score": 1}',
+    b'{"tech_score": 1e400, "soft_score": 1, "sjt_score": 1, "personality_score": 1}',
+    _body(tech_score=100.5), _body(soft_score=-1), _body(sjt_score="abc"), _body(personality_score=True),
+    b'{"tech_score": 1}', b"[1, 2, 3, 4]", b"bukan json",
+])
+def test_parse_features_rejects_invalid_scores(body):
+    with pytest.raises(ValueError):
+        parse_features(body)
+
+
+def test_parse_features_accepts_range_bounds():
+    assert parse_features(_body(tech_score=0, soft_score=100, sjt_score="55.5")) == [0.0, 100.0, 55.5, 40.0]
+
+
+async def _request(port, body):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(f"POST /predict HTTP/1.1\r\nContent-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode("latin-1") + body)
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, data = response.partition(b"\r\n\r\n")
+    return int(head.split()[1]), _strict_json(data)
+
+
+async def _serve(models_dir, requests, fail_on=None):
+    server = InferenceServer(models_dir, max_batch_size=len(requests), max_wait_ms=200)
+    await server.load_model()
+    if fail_on is not None:
+        predict_proba = server.batcher.predict_proba
+
+        def failing(X):
+            if (X[:, 0] == fail_on).any():
+                raise RuntimeError("gagal")
+            return predict_proba(X)
+        server.batcher.predict_proba = failing
+    listener = await asyncio.start_server(server.handle_connection, "127.0.0.1", 0)
+    port = listener.sockets[0].getsockname()[1]
+    async with listener:
+        return await asyncio.gather(*(_request(port, body) for body in requests))
+
+
+def test_invalid_request_does_not_affect_batch(sklearn_models_dir):
+    responses = asyncio.run(_serve(sklearn_models_dir, [
+        _body(), b'{"tech_score": NaN, "soft_score": 1, "sjt_score": 1, "personality_score": 1}',
+        _body(tech_score=1e300), _body(tech_score=20),
+    ]))
+    assert [status for status, _ in responses] == [200, 400, 400, 200]
+    for status, payload in responses:
+        if status == 200:
+            assert set(payload) == {"career", "probabilities"}
+            assert abs(sum(payload["probabilities"].values()) - 1) < 1e-9
+        else:
+            assert payload["error"]
+
+
+def test_prediction_error_is_500_for_that_request_only(sklearn_models_dir):
+    responses = asyncio.run(_serve(sklearn_models_dir, [_body(), _body(tech_score=13), _body(tech_score=20)], fail_on=13))
+    assert [status for status, _ in responses] == [200, 500, 200]
+    assert set(responses[1][1]) == {"error"}
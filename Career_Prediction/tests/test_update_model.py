@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+from update_model import REFIT_DATASET_FILE, read_pending, read_rows, write_refit_dataset
+
+HEADER = "tech_score,soft_score,sjt_score,personality_score,career\n"
+
+
+@pytest.mark.parametrize("row", ["150,50,50,50,A", "-1,50,50,50,A", "inf,50,50,50,A", "1e400,50,50,50,A"])
+def test_scores_outside_range_are_rejected(tmp_path, row):
+    path = tmp_path / "rows.csv"
+    path.write_text(HEADER + "50,50,50,50,A\n" + row + "\n")
+    with pytest.raises(ValueError, match="baris data ke-2"):
+        read_rows(str(path), ["A"])
+    with pytest.raises(ValueError, match="baris data ke-2"):
+        read_pending(str(path))
+
+
+def test_refit_dataset_is_written_to_the_given_directory(tmp_path):
+    base = tmp_path / "base.csv"
+    base.write_text(HEADER + "10,20,30,40,A\n")
+    out_dir = tmp_path / "staging"
+    out_dir.mkdir()
+    path = write_refit_dataset(str(base), np.array([[0.0, 100.0, 50.0, 25.0]]), np.array(["B"]), str(out_dir))
+
+    assert path == str(out_dir / REFIT_DATASET_FILE)
+    assert sorted(p.name for p in out_dir.iterdir()) == [REFIT_DATASET_FILE]
+    X, labels = read_pending(path)
+    np.testing.assert_array_equal(X, [[10, 20, 30, 40], [0, 100, 50, 25]])
+    assert list(labels) == ["A", "B"]
+
+
+def _rows(path, frame):
+    frame.to_csv(path, index=False)
+    return str(path)
+
+
+def test_gc_keeps_the_refit_dataset_of_surviving_versions(tmp_path, monkeypatch):
+    import pandas as pd
+
+    import model_registry
+    import train_knn_model
+    from update_model import BASE_DIR, update
+
+    # Cache tahap dan dataset di tmp_path, bukan di .cache/ repo
+    monkeypatch.setattr(train_knn_model, "CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setattr(train_knn_model.load_dataset, "__defaults__", (str(tmp_path / "datasets"),))
+    source = pd.read_csv(f"{BASE_DIR}/data/combined_career_dataset.csv").groupby("career").head(40)
+    dataset = _rows(tmp_path / "base.csv", source.iloc[::2])
+    models_dir = str(tmp_path / "models")
+    args = train_knn_model.parse_args(["--dataset", dataset, "--models-dir", models_dir, "--no-reports",
+                                       "--report-workers", "0"])
+    model_registry.promote(models_dir, train_knn_model.train_version(args))
+
+    batches = [_rows(tmp_path / f"new{i}.csv", source.iloc[1 + i::6]) for i in range(3)]
+    refit, _ = update(batches[0], models_dir, full_refit=True, reports=False)
+    model_registry.promote(models_dir, refit)
+    for rows in batches[1:]:
+        version, record = update(rows, models_dir, drift_threshold=float("inf"), reports=False)
+        assert record["type"] == "incremental"
+        model_registry.promote(models_dir, version)
+
+    # Refit tidak lagi current/previous, tapi dataset-nya masih dasar versi inkremental yang aktif
+    removed = model_registry.gc(models_dir, keep=2)
+    assert refit not in removed and len(removed) == 1
+    version, record = update(batches[0], models_dir, full_refit=True, reports=False)
+    assert record["type"] == "full_refit"
+    assert model_registry.verify(models_dir, version) == []
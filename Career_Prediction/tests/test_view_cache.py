@@ -0,0 +1,66 @@
+import json
+import os
+
+import pytest
+
+import view_cache
+from view_cache import EVALUATION_CACHE_SIZE, clear_cache, load_evaluation
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    clear_cache()
+    yield
+    clear_cache()
+
+
+def _write_evaluation(models_dir, accuracy, mtime_ns=None):
+    os.makedirs(models_dir, exist_ok=True)
+    path = os.path.join(models_dir, "model_evaluation.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"accuracy": accuracy}, f)
+    if mtime_ns is not None:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+    return path
+
+
+def test_evaluation_is_cached_until_the_file_changes(tmp_path):
+    models_dir = str(tmp_path)
+    _write_evaluation(models_dir, 0.5, mtime_ns=1_000_000_000)
+    first = load_evaluation(models_dir)
+    assert first == {"accuracy": 0.5}
+    assert load_evaluation(models_dir) is first
+    assert view_cache._read_evaluation.cache_info().hits == 1
+
+    # Ukuran sama, mtime berbeda: tetap dibaca ulang
+    _write_evaluation(models_dir, 0.7, mtime_ns=2_000_000_000)
+    assert load_evaluation(models_dir) == {"accuracy": 0.7}
+
+
+def test_legacy_text_evaluation_and_missing_file(tmp_path):
+    with open(tmp_path / "model_evaluation_detailed.txt", "w", encoding="utf-8") as f:
+        f.write("Akurasi: 80%")
+    assert load_evaluation(str(tmp_path)) == {"text": "Akurasi: 80%"}
+    with pytest.raises(FileNotFoundError):
+        load_evaluation(str(tmp_path / "kosong"))
+
+
+def test_evaluation_cache_is_bounded(tmp_path):
+    dirs = [str(tmp_path / f"v{i}") for i in range(EVALUATION_CACHE_SIZE + 3)]
+    for i, models_dir in enumerate(dirs):
+        _write_evaluation(models_dir, i / 100)
+        load_evaluation(models_dir)
+    assert view_cache._read_evaluation.cache_info().currsize == EVALUATION_CACHE_SIZE
+
+    # Entri terbaru masih di cache, entri tertua sudah dibuang (LRU)
+    misses = view_cache._read_evaluation.cache_info().misses
+    load_evaluation(dirs[-1])
+    assert view_cache._read_evaluation.cache_info().misses == misses
+    load_evaluation(dirs[0])
+    assert view_cache._read_evaluation.cache_info().misses == misses + 1
+
+
+def test_radar_figure_is_shared_for_scores_equal_at_display_precision():
+    figure = view_cache.radar_figure(80.0, 60.0, 70.0, 55.0)
+    assert view_cache.radar_figure(80.04, 60, 70.0, 54.96) is figure
+    assert view_cache.radar_figure(80.1, 60, 70.0, 55.0) is not figure
@@ -1,145 +1,836 @@
-import pandas as pd
+"""Training pipeline untuk model KNN prediksi karir.
+
+Tahapan: load -> validate -> encode -> scale -> split -> fit -> evaluate -> plot/export.
+Output tiap tahap di-cache di disk (lihat pipeline_cache.py) dengan kunci hash dari
+input dan parameternya, jadi menjalankan ulang setelah hanya mengganti --n-neighbors
+memakai ulang data yang sudah di-scale dan melewati plot distribusi.
+
+Hasil export disimpan sebagai versi baru di models/versions/ dan langsung dipromosikan
+menjadi versi aktif (lihat model_registry.py); --no-promote hanya menyimpan versinya.
+
+Contoh:
+    python train_knn_model.py
+    python train_knn_model.py --n-neighbors 7 --weights uniform
+    python train_knn_model.py --no-cache
+    python train_knn_model.py --no-reports
+    python train_knn_model.py --no-promote
+    python train_knn_model.py --ensemble 25 --max-features 3 --ensemble-workers 8
+    python train_knn_model.py --dataset data/synthetic_10m.parquet --streaming --chunksize 500000
+"""
+import argparse
+import json
 import os
-import matplotlib.pyplot as plt
-import seaborn as sns
-from sklearn.model_selection import train_test_split
-from sklearn.neighbors import KNeighborsClassifier
-from sklearn.preprocessing import StandardScaler, LabelEncoder
-from sklearn.metrics import accuracy_score, classification_report, confusion_matrix
-import joblib
-
-# Buat folder models jika belum ada
-os.makedirs("models", exist_ok=True)
-# Buat folder visualizations jika belum ada
-os.makedirs("visualizations", exist_ok=True)
-
-# Load dataset dari folder data/
-dataset_path = os.path.join("data", "combined_career_dataset.csv")
-df = pd.read_csv(dataset_path)
-
-# --- Tambahan untuk Pembersihan dan Validasi Data (Bukti Hasil untuk 3.3.2) ---
-print("\n--- Informasi Dataset (df.info()) ---")
-df.info() # Ini akan mencetak informasi ringkasan DataFrame ke konsol
-
-print("\n--- Statistik Deskriptif Dataset (df.describe()) ---")
-print(df.describe().to_string()) # .to_string() agar semua baris/kolom tampil lengkap di konsol
-# --- Akhir Tambahan untuk Pembersihan dan Validasi Data ---
-
-
-# Pisahkan fitur dan label
-X = df[['tech_score', 'soft_score', 'sjt_score', 'personality_score']]
-y = df['career']
-
-# Encode label karier
-le = LabelEncoder()
-y_encoded = le.fit_transform(y)
-
-# --- Tambahan untuk Encoding Label Kategori Karier (Bukti Hasil untuk 3.3.3) ---
-print("\n--- Encoding Label Kategori Karier ---")
-print("Kelas Karir Asli:", le.classes_)
-print("Contoh Mapping (5 label pertama):")
-# Ambil beberapa contoh label asli dan hasil encodingnya
-# Pastikan y.unique() ada isinya sebelum mengambil slice
-if len(y.unique()) > 0:
-    sample_labels = y.unique()[:min(5, len(y.unique()))] # Ambil hingga 5 label unik pertama, atau kurang jika tidak cukup
-    for label in sample_labels:
-        encoded_value = le.transform([label])[0]
-        print(f"  '{label}' -> {encoded_value}")
-else:
-    print("Tidak ada label unik ditemukan di kolom 'career'.")
-
-
-# Contoh inverse transform (ambil nilai encoded pertama jika ada)
-if len(y_encoded) > 0:
-    example_encoded_value = y_encoded[0]
-    decoded_label = le.inverse_transform([example_encoded_value])[0]
-    print(f"  Encoded '{example_encoded_value}' -> Decoded '{decoded_label}'")
-else:
-    print("Tidak ada data terenkode untuk contoh inverse transform.")
-# --- Akhir Tambahan untuk Encoding Label ---
-
-
-# Normalisasi data
-scaler = StandardScaler()
-X_scaled = scaler.fit_transform(X) # Lakukan scaling pada seluruh X untuk visualisasi
-
-# --- Visualisasi Distribusi Fitur Sebelum Normalisasi ---
-plt.figure(figsize=(15, 5))
-features_list = ['tech_score', 'soft_score', 'sjt_score', 'personality_score']
-for i, feature in enumerate(features_list):
-    plt.subplot(1, 4, i + 1)
-    sns.histplot(X[feature], kde=True)
-    plt.title(f'Distribusi {feature} (Sebelum Scaling)')
-    plt.xlabel('Nilai Skor')
-    plt.ylabel('Frekuensi')
-plt.tight_layout()
-plt.savefig('visualizations/distribusi_sebelum_scaling.png')
-plt.close()
-
-# --- Visualisasi Distribusi Fitur Setelah Normalisasi ---
-df_scaled_viz = pd.DataFrame(X_scaled, columns=features_list)
-plt.figure(figsize=(15, 5))
-for i, feature in enumerate(features_list):
-    plt.subplot(1, 4, i + 1)
-    sns.histplot(df_scaled_viz[feature], kde=True)
-    plt.title(f'Distribusi {feature} (Setelah Scaling)')
-    plt.xlabel('Nilai Skor (Skala)')
-    plt.ylabel('Frekuensi')
-    plt.xlim(-3, 3) # Batasi sumbu X untuk melihat efek scaling lebih jelas
-plt.tight_layout()
-plt.savefig('visualizations/distribusi_setelah_scaling.png')
-plt.close()
-
-print("Visualisasi distribusi sebelum dan setelah scaling telah disimpan di folder 'visualizations/'.")
-
-# Split data (gunakan X_scaled yang sudah dinormalisasi)
-X_train_scaled, X_test_scaled, y_train, y_test = train_test_split(X_scaled, y_encoded, test_size=0.2, stratify=y_encoded, random_state=42)
-
-# --- Tambahan untuk Pemisahan Data (Bukti Hasil untuk 3.3.5) ---
-print("\n--- Ukuran Data Training dan Testing Set ---")
-print(f"X_train_scaled shape: {X_train_scaled.shape}")
-print(f"X_test_scaled shape: {X_test_scaled.shape}")
-print(f"y_train shape: {y_train.shape}")
-print(f"y_test shape: {y_test.shape}")
-# --- Akhir Tambahan untuk Pemisahan Data ---
-
-
-# Latih model KNN
-knn = KNeighborsClassifier(n_neighbors=5, weights='distance')
-knn.fit(X_train_scaled, y_train)
-
-# Evaluasi model
-y_pred = knn.predict(X_test_scaled)
-accuracy = accuracy_score(y_test, y_pred)
-report = classification_report(y_test, y_pred, target_names=le.classes_)
-cm = confusion_matrix(y_test, y_pred)
-
-# Simpan model dan encoder
-joblib.dump(knn, "models/knn_model.joblib")
-joblib.dump(le, "models/label_encoder.joblib")
-joblib.dump(scaler, "models/scaler.joblib")
-
-# Simpan evaluasi ke file teks
-df_cm = pd.DataFrame(cm, index=le.classes_, columns=le.classes_)
-output_lines = [
-    f"Akurasi: {accuracy*100:.2f}%\n",
-    "Classification Report:\n",
-    report,
-    "\nConfusion Matrix:\n",
-    df_cm.to_string()
-]
-with open("models/model_evaluation_detailed.txt", "w") as f:
-    f.write("\n".join(output_lines))
-
-# Simpan confusion matrix sebagai gambar PNG
-plt.figure(figsize=(8, 6))
-sns.heatmap(df_cm, annot=True, fmt="d", cmap="Blues", cbar=True)
-plt.title("Confusion Matrix")
-plt.xlabel("Predicted Label")
-plt.ylabel("True Label")
-plt.xticks(rotation=45, ha='right')
-plt.tight_layout()
-plt.savefig("models/confusion_matrix.png")
-plt.close() # Penting: Tutup plot setelah disimpan
-
-print("✅ Model, evaluasi, dan gambar confusion matrix berhasil disimpan ke folder 'models'.")
\ No newline at end of file
+import shutil
+
+import numpy as np
+import pandas as pd
+
+from dataset_io import DATASET_CACHE_DIR, FEATURE_COLUMNS, LABEL_COLUMN, open_dataset, to_frame
+from model_registry import new_staging_dir, promote, publish
+from pipeline_cache import PipelineCache, StageResult, file_hash
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DATASET_PATH = os.path.join(BASE_DIR, "data", "combined_career_dataset.csv")
+MODELS_DIR = os.path.join(BASE_DIR, "models")
+VISUALIZATIONS_DIR = os.path.join(BASE_DIR, "visualizations")
+CACHE_DIR = os.path.join(BASE_DIR, ".cache", "pipeline")
+
+# Di atas jumlah baris ini plot distribusi memakai histogram yang sudah di-bin (KDE dari titik tengah bin)
+REPORT_MAX_ROWS = 100_000
+REPORT_BINS = 50
+# Jumlah tetangga ekstra yang diminta ke KD-tree agar seri di jarak ke-k terlihat (index_order_proba)
+TIE_WINDOW = 16
+
+SAVED_MESSAGE = "✅ Model, evaluasi, dan gambar confusion matrix berhasil disimpan sebagai versi {version}."
+SAVED_MESSAGE_NO_REPORTS = "✅ Model dan evaluasi berhasil disimpan sebagai versi {version} (gambar dilewati: --no-reports)."
+
+# Argumen CLI yang dicatat di manifest versi model
+TRAINING_PARAMS = ("n_neighbors", "weights", "test_size", "random_state", "reduce", "prototypes_per_class",
+                   "reduce_tolerance", "quantize", "streaming", "chunksize", "ensemble", "max_features")
+
+
+def load_dataset(dataset_path, dataset_cache_dir=DATASET_CACHE_DIR):
+    """Load dataset dari folder data/ (float32 + career kategorikal, lewat cache kolumnar di dataset_io.py)"""
+    return to_frame(open_dataset(dataset_path, dataset_cache_dir))
+
+
+def validate_dataset(df):
+    """Cek kolom dan nilai kosong; kembalikan ringkasan df.info() dan df.describe() (Bukti Hasil 3.3.2)"""
+    import io
+
+    missing = [c for c in FEATURE_COLUMNS + [LABEL_COLUMN] if c not in df.columns]
+    if missing:
+        raise ValueError(f"Kolom tidak ditemukan di dataset: {', '.join(missing)}")
+    n_null = int(df[FEATURE_COLUMNS + [LABEL_COLUMN]].isna().sum().sum())
+    if n_null:
+        raise ValueError(f"Dataset berisi {n_null} nilai kosong pada kolom fitur/label")
+
+    info = io.StringIO()
+    df.info(buf=info) # Ringkasan DataFrame (sama dengan df.info() di konsol)
+    return (
+        "\n--- Informasi Dataset (df.info()) ---\n" + info.getvalue()
+        + "\n--- Statistik Deskriptif Dataset (df.describe()) ---\n"
+        + df.describe().to_string() # .to_string() agar semua baris/kolom tampil lengkap di konsol
+    )
+
+
+def encode_labels(df):
+    """Encode label karier (Bukti Hasil 3.3.3)"""
+    from sklearn.preprocessing import LabelEncoder
+
+    y = df[LABEL_COLUMN]
+    le = LabelEncoder()
+    y_encoded = le.fit_transform(y)
+
+    print("\n--- Encoding Label Kategori Karier ---")
+    print("Kelas Karir Asli:", le.classes_)
+    print("Contoh Mapping (5 label pertama):")
+    # Ambil hingga 5 label unik pertama, atau kurang jika tidak cukup
+    for label in y.unique()[:5]:
+        print(f"  '{label}' -> {le.transform([label])[0]}")
+    if len(y_encoded) > 0:
+        print(f"  Encoded '{y_encoded[0]}' -> Decoded '{le.inverse_transform([y_encoded[0]])[0]}'")
+    return le, y_encoded
+
+
+def scale_features(df):
+    """Normalisasi data (scaling pada seluruh X, juga dipakai untuk visualisasi)"""
+    from sklearn.preprocessing import StandardScaler
+
+    scaler = StandardScaler()
+    X_scaled = scaler.fit_transform(df[FEATURE_COLUMNS])
+    return scaler, X_scaled
+
+
+class ReportRenderer:
+    """Render report figures in worker processes (Agg backend) while training continues.
+
+    workers=0 renders in the calling process. submit() returns a Future either way.
+    """
+
+    def __init__(self, workers=1):
+        from concurrent.futures import ProcessPoolExecutor
+
+        self.pool = ProcessPoolExecutor(max_workers=workers) if workers > 0 else None
+        self.futures = []
+
+    def submit(self, fn, *args):
+        from concurrent.futures import Future
+
+        if self.pool is not None:
+            future = self.pool.submit(fn, *args)
+        else:
+            future = Future()
+            try:
+                future.set_result(fn(*args))
+            except Exception as e:
+                future.set_exception(e)
+        self.futures.append(future)
+        return future
+
+    def close(self):
+        """Wait for every figure; re-raise the first rendering error"""
+        try:
+            for future in self.futures:
+                future.result()
+        finally:
+            if self.pool is not None:
+                self.pool.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        elif self.pool is not None:
+            # Training gagal: jangan tutupi error aslinya dengan error gambar
+            self.pool.shutdown(wait=True, cancel_futures=True)
+        return False
+
+
+def feature_histograms(X, max_rows=REPORT_MAX_ROWS, bins=REPORT_BINS):
+    """Per feature: the raw values for small data, else (edges, counts) pre-binned over every row.
+
+    Only this summary is sent to the report worker, so large datasets are not pickled.
+    """
+    X = np.asarray(X)
+    if len(X) <= max_rows:
+        return [X[:, i].copy() for i in range(X.shape[1])]
+    histograms = []
+    for i in range(X.shape[1]):
+        counts, edges = np.histogram(X[:, i], bins=bins)
+        histograms.append((edges, counts))
+    return histograms
+
+
+def render_distributions(histograms, path, stage_label, xlabel, xlim=None):
+    """Histogram + KDE grid of the features (runs in a report worker)"""
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    plt.figure(figsize=(15, 5))
+    for i, (feature, data) in enumerate(zip(FEATURE_COLUMNS, histograms)):
+        plt.subplot(1, 4, i + 1)
+        if isinstance(data, tuple):
+            # Data besar: histogram dari jumlah per bin, KDE berbobot dari titik tengah bin
+            edges, counts = data
+            binned = pd.DataFrame({feature: (edges[:-1] + edges[1:]) / 2, "count": counts})
+            sns.histplot(binned, x=feature, weights="count", bins=edges.tolist(), kde=True)
+        else:
+            sns.histplot(data, kde=True)
+        plt.title(f'Distribusi {feature} ({stage_label})')
+        plt.xlabel(xlabel)
+        plt.ylabel('Frekuensi')
+        if xlim:
+            plt.xlim(*xlim)
+    plt.tight_layout()
+    plt.savefig(path)
+    plt.close()
+
+
+def render_distribution_reports(before, after, visualizations_dir):
+    render_distributions(before, os.path.join(visualizations_dir, 'distribusi_sebelum_scaling.png'),
+                         'Sebelum Scaling', 'Nilai Skor')
+    # Batasi sumbu X untuk melihat efek scaling lebih jelas
+    render_distributions(after, os.path.join(visualizations_dir, 'distribusi_setelah_scaling.png'),
+                         'Setelah Scaling', 'Nilai Skor (Skala)', xlim=(-3, 3))
+    print("Visualisasi distribusi sebelum dan setelah scaling telah disimpan di folder 'visualizations/'.")
+
+
+def plot_distributions(df, scaled, visualizations_dir, renderer):
+    """Visualisasi distribusi fitur sebelum dan setelah normalisasi (dirender di background)"""
+    _, X_scaled = scaled
+    os.makedirs(visualizations_dir, exist_ok=True)
+    before = feature_histograms(df[FEATURE_COLUMNS].to_numpy())
+    after = feature_histograms(X_scaled)
+    return renderer.submit(render_distribution_reports, before, after, visualizations_dir)
+
+
+def split_data(scaled, encoded, test_size, random_state):
+    """Split data stratified (gunakan X_scaled yang sudah dinormalisasi)"""
+    from sklearn.model_selection import train_test_split
+
+    _, X_scaled = scaled
+    _, y_encoded = encoded
+    return train_test_split(X_scaled, y_encoded, test_size=test_size, stratify=y_encoded, random_state=random_state)
+
+
+def reduce_prototypes(split, method, prototypes_per_class, random_state):
+    """Perkecil set referensi training (lihat prototype_reduction.py); data test tidak diubah"""
+    from prototype_reduction import reduce_reference_set
+
+    X_train_scaled, X_test_scaled, y_train, y_test = split
+    X_reduced, y_reduced = reduce_reference_set(X_train_scaled, y_train, method, prototypes_per_class,
+                                                random_state=random_state)
+    return X_reduced, X_test_scaled, y_reduced, y_test
+
+
+def reduction_summary(method, split, reduced, evaluation_full, evaluation, tolerance):
+    """Rasio kompresi dan penurunan akurasi; RuntimeError jika penurunan melebihi tolerance"""
+    n_before, n_after = len(split[2]), len(reduced[2])
+    summary = {
+        "method": method,
+        "n_before": n_before,
+        "n_after": n_after,
+        "compression_ratio": n_before / max(n_after, 1),
+        "accuracy_full": evaluation_full["accuracy"],
+        "accuracy_drop": evaluation_full["accuracy"] - evaluation["accuracy"],
+    }
+    print(f"\nReduksi prototipe ({method}): {n_before:,} -> {n_after:,} baris referensi "
+          f"(kompresi {summary['compression_ratio']:.1f}x), akurasi {evaluation_full['accuracy']*100:.2f}% "
+          f"-> {evaluation['accuracy']*100:.2f}%")
+    if summary["accuracy_drop"] > tolerance:
+        raise RuntimeError(f"Akurasi turun {summary['accuracy_drop']*100:.2f} poin setelah reduksi prototipe "
+                           f"(toleransi {tolerance*100:.2f}); model tidak disimpan")
+    return summary
+
+
+def fit_knn(split, n_neighbors, weights):
+    """Latih model KNN"""
+    from sklearn.neighbors import KNeighborsClassifier
+
+    X_train_scaled, _, y_train, _ = split
+    knn = KNeighborsClassifier(n_neighbors=n_neighbors, weights=weights)
+    knn.fit(X_train_scaled, y_train)
+    return knn
+
+
+def fit_knn_ensemble(split, n_neighbors, weights, n_estimators, max_features, random_state, workers=1):
+    """Latih ensemble KNN (bagging) dengan anggota paralel; akurasi out-of-bag dari data training (lihat knn_ensemble.py)"""
+    from knn_ensemble import fit_ensemble
+
+    X_train_scaled, _, y_train, _ = split
+    ensemble = fit_ensemble(X_train_scaled, y_train, n_estimators, n_neighbors, weights, max_features, workers,
+                            random_state)
+    oob = ensemble.oob_
+    print(f"\nEnsemble {n_estimators} anggota KNN (rata-rata {oob['rows_per_member']:.0f} baris, {oob['max_features']} fitur "
+          f"per anggota) dilatih dalam {oob['fit_seconds']:.2f} detik dengan {workers} proses "
+          f"(total waktu anggota {oob['member_seconds']:.2f} detik)")
+    print(f"Akurasi out-of-bag: {oob['oob_accuracy']*100:.2f}% "
+          f"({oob['oob_coverage']*100:.1f}% baris training punya prediksi out-of-bag)")
+    return ensemble
+
+
+def ensemble_summary(ensemble, encoded):
+    """Parameter ensemble dan metrik out-of-bag per karir untuk file evaluasi"""
+    le, _ = encoded
+    summary = dict(ensemble.oob_)
+    confusion = summary.pop("oob_confusion_matrix")
+    summary["oob_per_class"] = class_metrics(confusion, le.classes_)["per_class"]
+    summary["oob_confusion_matrix"] = np.asarray(confusion).tolist()
+    print("Recall out-of-bag per karir: " + ", ".join(
+        f"{career} {metrics['recall']:.2f}" for career, metrics in summary["oob_per_class"].items()))
+    return summary
+
+
+def evaluate_knn(knn, split, encoded):
+    """Evaluasi model pada test set"""
+    from sklearn.metrics import accuracy_score, classification_report, confusion_matrix
+
+    _, X_test_scaled, _, y_test = split
+    le, _ = encoded
+    y_pred = knn.predict(X_test_scaled)
+    return {
+        "accuracy": accuracy_score(y_test, y_pred),
+        "report": classification_report(y_test, y_pred, target_names=le.classes_),
+        "confusion_matrix": confusion_matrix(y_test, y_pred),
+    }
+
+
+def _index_order_kneighbors(knn, X_scaled, max_cells=1 << 22, window=TIE_WINDOW):
+    """(distances, indices) of the k nearest training rows, equidistant rows in index order.
+
+    The fitted tree is asked for k + window neighbours. A query whose tie at
+    the k-th distance may continue past that window gets every row within that
+    distance from the tree's radius query (tie groups of duplicated rows can
+    hold thousands of rows); a brute-force model instead asks again with a
+    window four times larger, up to every training row.
+    """
+    n_fit, k = knn.n_samples_fit_, knn.n_neighbors
+    distances = np.empty((len(X_scaled), k))
+    indices = np.empty((len(X_scaled), k), dtype=np.intp)
+    tree = getattr(knn, "_tree", None) # KDTree/BallTree hasil fit; None untuk algorithm='brute'
+    todo = np.arange(len(X_scaled))
+    n = min(n_fit, k + window)
+    while len(todo):
+        step = max(1, max_cells // n)
+        unresolved = []
+        for start in range(0, len(todo), step):
+            part = todo[start:start + step]
+            dist, idx = knn.kneighbors(X_scaled[part], n_neighbors=n)
+            order = np.lexsort((idx, dist))
+            dist, idx = np.take_along_axis(dist, order, axis=1), np.take_along_axis(idx, order, axis=1)
+            # Jendela memuat semua baris berjarak <= jarak ke-k jika baris terakhirnya lebih jauh
+            done = (dist[:, -1] > dist[:, k - 1]) | (n == n_fit)
+            distances[part[done]] = dist[done, :k]
+            indices[part[done]] = idx[done, :k]
+            if tree is not None and not done.all():
+                rows, kth = part[~done], dist[~done, k - 1]
+                # Satu grup seri bisa sebesar seluruh data training: query radius per potongan kecil
+                radius_step = max(1, max_cells // n_fit)
+                for r_start in range(0, len(rows), radius_step):
+                    r_rows, r_kth = rows[r_start:r_start + radius_step], kth[r_start:r_start + radius_step]
+                    # Radius sedikit dilebarkan; jarak hasil query tree sama persis dengan kneighbors, lalu disaring
+                    ind_list, dist_list = tree.query_radius(X_scaled[r_rows], r=r_kth * (1 + 1e-9) + 1e-300,
+                                                            return_distance=True)
+                    for row, kth_row, ind_row, dist_row in zip(r_rows, r_kth, ind_list, dist_list):
+                        keep = dist_row <= kth_row
+                        ind_row, dist_row = ind_row[keep], dist_row[keep]
+                        order = np.lexsort((ind_row, dist_row))[:k]
+                        distances[row], indices[row] = dist_row[order], ind_row[order]
+                continue
+            unresolved.append(part[~done])
+        todo = np.concatenate(unresolved) if unresolved else todo[:0]
+        n = min(n_fit, 4 * n)
+    return distances, indices
+
+
+def index_order_proba(knn, X_scaled, y_ref, n_classes, rows=None, cols=None, max_cells=1 << 22, window=TIE_WINDOW):
+    """predict_proba of a fitted KNeighborsClassifier with equidistant neighbours taken in index order.
+
+    This is knn_engine's tie rule, applied to sklearn's own distances (training
+    rows at the distance of the k-th neighbour are ranked by index). rows/cols:
+    the training rows and features of an ensemble member, rows also mapping its
+    indices to y_ref.
+    """
+    X_scaled = X_scaled if cols is None else X_scaled[:, cols]
+    dist, idx = _index_order_kneighbors(knn, X_scaled, max_cells, window)
+    if knn.weights == "distance":
+        with np.errstate(divide="ignore"):
+            w = 1.0 / dist
+        exact = dist == 0.0
+        exact_row = exact.any(axis=1)
+        w[exact_row] = exact[exact_row]
+    else:
+        w = np.ones_like(dist)
+    labels = y_ref[idx if rows is None else rows[idx]]
+    proba = np.zeros((len(X_scaled), n_classes))
+    np.add.at(proba, (np.repeat(np.arange(len(idx)), idx.shape[1]), labels.ravel()), w.ravel())
+    proba /= proba.sum(axis=1, keepdims=True)
+    return proba
+
+
+def index_order_predict_proba(knn, X_scaled, y_ref, n_classes):
+    """index_order_proba of a model or the mean over the members of a KNNEnsemble (like knn_engine)"""
+    members = list(zip(knn.members, knn.rows, knn.features)) if hasattr(knn, "members") else [(knn, None, None)]
+    return sum(index_order_proba(member, X_scaled, y_ref, n_classes, rows, cols)
+               for member, rows, cols in members) / len(members)
+
+
+def check_engine_parity(knn, scaler, X, artifact, max_rows=5000, max_cells=50_000_000):
+    """Cek paritas engine NumPy (dipakai app, tanpa sklearn) terhadap model sklearn pada dataset.
+
+    Dataset besar diambil sampel (deterministik) maksimal max_rows baris dan max_cells / n_train
+    baris, karena engine brute-force O(n x n_train).
+
+    Jika tetangga ke-k dan ke-(k+1) berjarak sama (data duplikat), urutan sklearn (KD-tree) tidak
+    tentu, sedangkan knn_engine memilih indeks terkecil. Baris seri itu dibandingkan dengan
+    index_order_proba (jarak sklearn, aturan indeks terkecil); jumlah prediksi yang berbeda dari
+    knn.predict dilaporkan sebagai deviasi yang disengaja. knn boleh berupa KNNEnsemble
+    (knn_ensemble.py) untuk artifact ensemble.
+    """
+    import knn_engine
+
+    max_rows = max(100, min(max_rows, max_cells // len(artifact.y_ref)))
+    if len(X) > max_rows:
+        X = X.sample(max_rows, random_state=0)
+    # Query float64 untuk kedua sisi, sama seperti skor dari app (dataset disimpan float32)
+    X = X.astype(np.float64)
+    X_all_scaled = scaler.transform(X)
+    sk_dist, _ = knn.kneighbors(X_all_scaled, n_neighbors=knn.n_neighbors + 1)
+    tied = np.isclose(sk_dist[..., -2], sk_dist[..., -1], rtol=0, atol=1e-6)
+    n_classes = len(artifact.classes)
+    y_ref = np.asarray(artifact.y_ref)
+    if artifact.member_offsets is None:
+        engine_dist, _ = knn_engine.kneighbors(artifact, X_all_scaled)
+    else:
+        # Ensemble: jarak dicek per anggota; baris dianggap seri jika seri di anggota mana pun
+        engine_dist = np.stack([knn_engine.kneighbors(artifact, X_all_scaled, member=m)[0]
+                                for m in range(len(artifact.member_offsets) - 1)])
+        tied = tied.any(axis=0)
+    engine_proba = knn_engine.predict_proba(artifact, X.to_numpy())
+    engine_pred = np.argmax(engine_proba, axis=1)
+    sk_pred = knn.predict(X_all_scaled)
+
+    expected = knn.predict_proba(X_all_scaled)
+    if tied.any():
+        expected[tied] = index_order_predict_proba(knn, X_all_scaled[tied], y_ref, n_classes)
+    # Prediksi engine harus kelas dengan proba tertinggi referensi (seri antar kelas boleh salah satunya)
+    engine_score = np.take_along_axis(expected, engine_pred[:, None], axis=1)[:, 0]
+    n_mismatch = int((engine_score < expected.max(axis=1) - 1e-9).sum())
+    max_proba_diff = float(np.abs(engine_proba - expected).max(initial=0.0))
+    max_dist_diff = float(np.abs(engine_dist - sk_dist[..., :-1]).max())
+    n_deviation = int((engine_pred != sk_pred)[tied].sum())
+    print(f"Paritas knn_engine vs sklearn: {n_mismatch} prediksi berbeda dari {len(X)} baris "
+          f"({int(tied.sum())} baris seri dibandingkan dengan aturan indeks terkecil), selisih proba maks "
+          f"{max_proba_diff:.2e}, selisih jarak maks {max_dist_diff:.2e}; "
+          f"{n_deviation} baris seri diprediksi berbeda oleh urutan KD-tree sklearn")
+    if n_mismatch > 0 or max_proba_diff > 1e-4 or max_dist_diff > 1e-4:
+        raise RuntimeError("knn_engine tidak sama dengan KNeighborsClassifier, artifact tidak boleh dipakai")
+
+
+def evaluate_served(knn, split, encoded, scaled, evaluation, quantize, chunksize=1 << 16):
+    """Evaluasi model yang benar-benar dilayani knn_model.bin terkuantisasi.
+
+    Referensi dikuantisasi seperti di artifact, lalu diprediksi dengan aturan seri knn_engine
+    (index_order_predict_proba). Akurasi, report dan confusion matrix diganti metrik ini; angka
+    model float hanya disimpan di bagian "quantization" sebagai paritas.
+    """
+    from sklearn.metrics import classification_report
+    from sklearn.neighbors import KNeighborsClassifier
+
+    from knn_ensemble import KNNEnsemble
+    from model_artifact import dequantize_reference, quantize_reference
+
+    le, _ = encoded
+    scaler, _ = scaled
+    X_train_scaled, X_test_scaled, y_train, y_test = split
+    X_stored, quantization = quantize_reference(X_train_scaled, scaler.mean_, scaler.scale_, quantize)
+    X_served = dequantize_reference(X_stored, quantization)
+    if isinstance(knn, KNNEnsemble):
+        knn_served = knn.refit(X_served, np.asarray(y_train))
+    else:
+        knn_served = KNeighborsClassifier(n_neighbors=knn.n_neighbors, weights=knn.weights).fit(X_served, y_train)
+
+    n_classes = len(le.classes_)
+    y_test = np.asarray(y_test)
+    y_float = np.empty(len(y_test), dtype=np.intp)
+    y_served = np.empty(len(y_test), dtype=np.intp)
+    max_proba_diff = 0.0
+    for start in range(0, len(y_test), chunksize):
+        X = np.asarray(X_test_scaled[start:start + chunksize])
+        proba_float = knn.predict_proba(X)
+        proba_served = index_order_predict_proba(knn_served, X, np.asarray(y_train), n_classes)
+        y_float[start:start + len(X)] = np.argmax(proba_float, axis=1)
+        y_served[start:start + len(X)] = np.argmax(proba_served, axis=1)
+        max_proba_diff = max(max_proba_diff, float(np.abs(proba_float - proba_served).max(initial=0.0)))
+
+    confusion = np.bincount(y_test * n_classes + y_served, minlength=n_classes * n_classes).reshape(n_classes, n_classes)
+    n_ref, n_features = X_stored.shape
+    report = {
+        "dtype": quantization["dtype"],
+        "nbytes": int(X_stored.nbytes),
+        "nbytes_float32": n_ref * n_features * 4,
+        "nbytes_float64": n_ref * n_features * 8,
+        "accuracy_float": float(evaluation["accuracy"]),
+        "accuracy_quantized": float(np.mean(y_served == y_test)),
+        "agreement": float(np.mean(y_float == y_served)),
+        "n_test": len(y_test),
+        "max_proba_diff": max_proba_diff,
+    }
+    print("\n--- Paritas Kuantisasi (test set) ---\n" + "\n".join(quantization_lines(report)))
+    return {
+        **evaluation,
+        "accuracy": report["accuracy_quantized"],
+        "report": classification_report(y_test, y_served, labels=np.arange(n_classes), target_names=le.classes_,
+                                        zero_division=0),
+        "confusion_matrix": confusion,
+        "quantization": report,
+    }
+
+
+def quantization_lines(report):
+    """Baris teks laporan kuantisasi untuk konsol dan model_evaluation_detailed.txt"""
+    return [
+        f"Tipe matriks referensi: {report['dtype']} "
+        f"({report['nbytes']:,} byte; float32 {report['nbytes_float32']:,} byte, "
+        f"float64 {report['nbytes_float64']:,} byte, {report['nbytes_float64'] / report['nbytes']:.0f}x lebih kecil dari float64)",
+        f"Akurasi model float: {report['accuracy_float']*100:.2f}%",
+        f"Akurasi model terkuantisasi: {report['accuracy_quantized']*100:.2f}%",
+        f"Prediksi sama dengan model float: {report['agreement']*100:.2f}% dari {report['n_test']} baris test "
+        f"(selisih proba maks {report['max_proba_diff']:.2e})",
+    ]
+
+
+def class_metrics(confusion, classes):
+    """Precision, recall, F1 dan support per karir plus rata-rata macro/weighted dari confusion matrix"""
+    confusion = np.asarray(confusion)
+    tp = np.diag(confusion).astype(np.float64)
+    support = confusion.sum(axis=1)
+    predicted = confusion.sum(axis=0)
+    precision = np.divide(tp, predicted, out=np.zeros_like(tp), where=predicted > 0)
+    recall = np.divide(tp, support, out=np.zeros_like(tp), where=support > 0)
+    f1 = np.divide(2 * precision * recall, precision + recall, out=np.zeros_like(tp), where=(precision + recall) > 0)
+    weights = support / max(support.sum(), 1)
+    return {
+        "per_class": {str(career): {"precision": float(p), "recall": float(r), "f1": float(f), "support": int(n)}
+                      for career, p, r, f, n in zip(classes, precision, recall, f1, support)},
+        "macro_avg": {"precision": float(precision.mean()), "recall": float(recall.mean()), "f1": float(f1.mean())},
+        "weighted_avg": {"precision": float(precision @ weights), "recall": float(recall @ weights),
+                         "f1": float(f1 @ weights)},
+    }
+
+
+def export_model(knn, encoded, scaled, split, evaluation, df, models_dir, quantize=None):
+    """Simpan model, encoder, scaler, artifact gabungan, tabel prediksi dan evaluasi (teks dan JSON)"""
+    import joblib
+    from knn_ensemble import KNNEnsemble
+    from model_loader import EVALUATION_FILE
+    from model_artifact import dequantize, write_artifact, open_artifact
+    from prediction_table import TABLE_FILE, build_table, save_table
+
+    le, _ = encoded
+    scaler, _ = scaled
+    X_train_scaled, X_test_scaled, y_train, y_test = split
+    os.makedirs(models_dir, exist_ok=True)
+
+    joblib.dump(knn, os.path.join(models_dir, "knn_model.joblib"))
+    joblib.dump(le, os.path.join(models_dir, "label_encoder.joblib"))
+    joblib.dump(scaler, os.path.join(models_dir, "scaler.joblib"))
+
+    # Artifact gabungan (scaler + matriks referensi float32 + label) yang bisa di-mmap oleh app.
+    # Ensemble: baris training disimpan sekali, ditambah indeks baris dan fitur tiap anggota
+    is_ensemble = isinstance(knn, KNNEnsemble)
+    artifact_path = os.path.join(models_dir, "knn_model.bin")
+    artifact_header = write_artifact(
+        artifact_path,
+        scaler.mean_, scaler.scale_,
+        X_train_scaled, y_train, le.classes_, quantize=quantize,
+        members=list(zip(knn.rows, knn.features)) if is_ensemble else None,
+        n_neighbors=knn.n_neighbors, weights=knn.weights,
+    )
+    print(f"Artifact gabungan disimpan: models/knn_model.bin (sha256 {artifact_header['sha256'][:12]})")
+
+    artifact = open_artifact(artifact_path, verify=True)
+    # Metrik terkuantisasi dan paritasnya dengan model float dihitung evaluate_served sebelum export
+    quantization = evaluation.get("quantization")
+    knn_served = knn # Model sklearn dengan referensi yang sama persis dengan artifact
+    if quantize:
+        # Engine dicek terhadap KNN sklearn pada referensi hasil dekuantisasi
+        from sklearn.neighbors import KNeighborsClassifier
+        if is_ensemble:
+            knn_dequantized = knn.refit(dequantize(artifact), artifact.y_ref)
+        else:
+            knn_dequantized = KNeighborsClassifier(n_neighbors=knn.n_neighbors, weights=knn.weights)
+            knn_dequantized.fit(dequantize(artifact), artifact.y_ref)
+        check_engine_parity(knn_dequantized, scaler, df[FEATURE_COLUMNS], artifact)
+        knn_served = knn_dequantized
+    else:
+        check_engine_parity(knn, scaler, df[FEATURE_COLUMNS], artifact)
+
+    # Tabel prediksi untuk semua kombinasi skor quiz yang mungkin (dibangun ulang app jika konfigurasi quiz berubah).
+    # Dicari lewat KD-tree sklearn yang sudah di-fit dengan aturan seri knn_engine, bukan brute-force O(grid x n_train)
+    prediction_table = build_table(artifact, lambda X: index_order_predict_proba(
+        knn_served, X, np.asarray(artifact.y_ref), len(artifact.classes)))
+    save_table(prediction_table, os.path.join(models_dir, TABLE_FILE))
+    print(f"Tabel prediksi disimpan: models/{TABLE_FILE} ({prediction_table.codes.size} kombinasi skor)")
+
+    # Simpan evaluasi ke file teks
+    df_cm = pd.DataFrame(evaluation["confusion_matrix"], index=le.classes_, columns=le.classes_)
+    output_lines = [
+        f"Akurasi: {evaluation['accuracy']*100:.2f}%\n",
+        "Classification Report:\n",
+        evaluation["report"],
+        "\nConfusion Matrix:\n",
+        df_cm.to_string()
+    ]
+    if quantization:
+        output_lines += ["\nKuantisasi Artifact (knn_model.bin):\n"] + quantization_lines(quantization)
+    reduction = evaluation.get("reduction")
+    if reduction:
+        output_lines += [
+            "\nReduksi Prototipe:\n",
+            f"Metode: {reduction['method']}",
+            f"Baris referensi: {reduction['n_before']} -> {reduction['n_after']} "
+            f"(rasio kompresi {reduction['compression_ratio']:.1f}x)",
+            f"Akurasi tanpa reduksi: {reduction['accuracy_full']*100:.2f}% "
+            f"(turun {reduction['accuracy_drop']*100:.2f} poin)",
+        ]
+    ensemble = evaluation.get("ensemble")
+    if ensemble:
+        output_lines += [
+            "\nEnsemble KNN (bagging):\n",
+            f"Anggota: {ensemble['n_estimators']} (rata-rata {ensemble['rows_per_member']:.0f} baris, "
+            f"{ensemble['max_features']} fitur per anggota)",
+            f"Akurasi out-of-bag: {ensemble['oob_accuracy']*100:.2f}% "
+            f"(cakupan {ensemble['oob_coverage']*100:.1f}% baris training)",
+            "Recall out-of-bag per karir:",
+        ] + [f"  {career}: {metrics['recall']:.2f}" for career, metrics in ensemble["oob_per_class"].items()]
+    with open(os.path.join(models_dir, "model_evaluation_detailed.txt"), "w") as f:
+        f.write("\n".join(output_lines))
+
+    # Evaluasi terstruktur untuk app (ditampilkan tanpa parsing teks)
+    evaluation_json = {
+        "model_version": artifact_header["sha256"][:12],
+        "params": {"n_neighbors": int(knn.n_neighbors), "weights": knn.weights,
+                   "n_train": len(y_train), "n_test": len(y_test)},
+        "accuracy": float(evaluation["accuracy"]),
+        "classes": [str(career) for career in le.classes_],
+        **class_metrics(evaluation["confusion_matrix"], le.classes_),
+        "confusion_matrix": np.asarray(evaluation["confusion_matrix"]).tolist(),
+        "report": evaluation["report"],
+        "quantization": quantization,
+        "reduction": reduction or None,
+        "ensemble": ensemble or None,
+    }
+    with open(os.path.join(models_dir, EVALUATION_FILE), "w", encoding="utf-8") as f:
+        json.dump(evaluation_json, f, indent=2, ensure_ascii=False)
+
+
+def render_confusion_matrix(confusion, classes, path):
+    """Heatmap confusion matrix (runs in a report worker)"""
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    df_cm = pd.DataFrame(confusion, index=classes, columns=classes)
+    plt.figure(figsize=(8, 6))
+    sns.heatmap(df_cm, annot=True, fmt="d", cmap="Blues", cbar=True)
+    plt.title("Confusion Matrix")
+    plt.xlabel("Predicted Label")
+    plt.ylabel("True Label")
+    plt.xticks(rotation=45, ha='right')
+    plt.tight_layout()
+    plt.savefig(path)
+    plt.close() # Penting: Tutup plot setelah disimpan
+
+
+def plot_confusion_matrix(evaluation, encoded, models_dir, renderer):
+    """Simpan confusion matrix sebagai gambar PNG (dirender di background)"""
+    le, _ = encoded
+    os.makedirs(models_dir, exist_ok=True)
+    return renderer.submit(render_confusion_matrix, np.asarray(evaluation["confusion_matrix"]), list(le.classes_),
+                           os.path.join(models_dir, "confusion_matrix.png"))
+
+
+def run_pipeline(dataset_path=DATASET_PATH, models_dir=MODELS_DIR, visualizations_dir=VISUALIZATIONS_DIR,
+                 n_neighbors=5, weights='distance', test_size=0.2, random_state=42,
+                 cache_dir=CACHE_DIR, use_cache=True, reduce=None, prototypes_per_class=50, reduce_tolerance=0.01,
+                 quantize=None, reports=True, report_workers=1, ensemble=None, max_features=None, ensemble_workers=1):
+    """Run every stage, reusing cached outputs whose inputs and parameters did not change.
+
+    Report figures are rendered by report_workers background processes while
+    the model is fitted and exported (the call returns once they are written);
+    reports=False skips them entirely. ensemble=N fits a bagged ensemble of N
+    KNN members in ensemble_workers processes instead of a single model.
+    """
+    from quiz_bank import quiz_signature
+
+    cache = PipelineCache(cache_dir, enabled=use_cache)
+    # Keluar dari blok with menunggu semua gambar selesai dirender
+    with ReportRenderer(report_workers) as renderer:
+        # Kunci tahap pertama = hash isi file dataset, tahap berikutnya berantai dari kunci ini
+        source = StageResult(file_hash(dataset_path), dataset_path)
+        # Dataset sudah di-cache dalam bentuk kolumnar (.npy), jadi tahap load tidak disimpan ulang lewat joblib
+        loaded = StageResult(cache.stage_key("load", load_dataset, [source]), load_dataset(dataset_path))
+        validated = cache.run("validate", validate_dataset, [loaded])
+        print(validated.value)
+
+        encoded = cache.run("encode", encode_labels, [loaded])
+        scaled = cache.run("scale", scale_features, [loaded])
+        if reports:
+            # Plot distribusi dirender di proses lain selama split, fit dan export berjalan
+            cache.run_side_effect(
+                "plot_distributions", plot_distributions, [loaded, scaled], {"visualizations_dir": visualizations_dir},
+                outputs=[os.path.join(visualizations_dir, name)
+                         for name in ("distribusi_sebelum_scaling.png", "distribusi_setelah_scaling.png")],
+                runtime={"renderer": renderer},
+            )
+
+        split = cache.run("split", split_data, [scaled, encoded], {"test_size": test_size, "random_state": random_state})
+        X_train_scaled, X_test_scaled, y_train, y_test = split.value
+        # --- Ukuran Data Training dan Testing Set (Bukti Hasil untuk 3.3.5) ---
+        print("\n--- Ukuran Data Training dan Testing Set ---")
+        print(f"X_train_scaled shape: {X_train_scaled.shape}")
+        print(f"X_test_scaled shape: {X_test_scaled.shape}")
+        print(f"y_train shape: {y_train.shape}")
+        print(f"y_test shape: {y_test.shape}")
+
+        if ensemble:
+            fitted = cache.run("fit_ensemble", fit_knn_ensemble, [split],
+                               {"n_neighbors": n_neighbors, "weights": weights, "n_estimators": ensemble,
+                                "max_features": max_features, "random_state": random_state},
+                               runtime={"workers": ensemble_workers})
+        else:
+            fitted = cache.run("fit", fit_knn, [split], {"n_neighbors": n_neighbors, "weights": weights})
+        evaluation = cache.run("evaluate", evaluate_knn, [fitted, split, encoded])
+        print(f"\nAkurasi: {evaluation.value['accuracy']*100:.2f}%")
+        if ensemble:
+            evaluation = StageResult(evaluation.key, {**evaluation.value,
+                                                      "ensemble": ensemble_summary(fitted.value, encoded.value)})
+
+        if reduce:
+            # Model hasil reduksi menggantikan model penuh hanya jika akurasinya masih dalam toleransi
+            reduced = cache.run("reduce", reduce_prototypes, [split],
+                                {"method": reduce, "prototypes_per_class": prototypes_per_class, "random_state": random_state})
+            evaluation_full = evaluation
+            fitted = cache.run("fit", fit_knn, [reduced], {"n_neighbors": n_neighbors, "weights": weights})
+            evaluation = cache.run("evaluate", evaluate_knn, [fitted, reduced, encoded])
+            summary = reduction_summary(reduce, split.value, reduced.value, evaluation_full.value, evaluation.value,
+                                        reduce_tolerance)
+            evaluation = StageResult(evaluation.key, {**evaluation.value, "reduction": summary})
+            split = reduced
+
+        if quantize:
+            # Metrik versi = artifact terkuantisasi yang dilayani, bukan model float
+            evaluation = cache.run("evaluate_served", evaluate_served, [fitted, split, encoded, scaled, evaluation],
+                                   {"quantize": quantize})
+            print(f"Akurasi artifact {quantize}: {evaluation.value['accuracy']*100:.2f}%")
+
+        if reports:
+            cache.run_side_effect(
+                "plot_confusion_matrix", plot_confusion_matrix, [evaluation, encoded], {"models_dir": models_dir},
+                outputs=[os.path.join(models_dir, "confusion_matrix.png")],
+                runtime={"renderer": renderer},
+            )
+        cache.run_side_effect(
+            "export", export_model, [fitted, encoded, scaled, split, evaluation, loaded],
+            {"models_dir": models_dir, "quantize": quantize},
+            outputs=[os.path.join(models_dir, name) for name in (
+                "knn_model.joblib", "label_encoder.joblib", "scaler.joblib", "knn_model.bin",
+                "prediction_table.npz", "model_evaluation_detailed.txt", "model_evaluation.json")],
+            extra=quiz_signature(),
+        )
+        return fitted.value, evaluation.value
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Latih model KNN prediksi karir")
+    parser.add_argument("--dataset", default=DATASET_PATH, help="File CSV dataset (default: data/combined_career_dataset.csv)")
+    parser.add_argument("--models-dir", default=MODELS_DIR, help="Folder registry model (default: models/)")
+    parser.add_argument("--no-promote", action="store_true",
+                        help="Simpan versi baru tanpa menjadikannya versi aktif (promosikan nanti dengan model_registry.py)")
+    parser.add_argument("--n-neighbors", type=int, default=5)
+    parser.add_argument("--weights", choices=["distance", "uniform"], default="distance")
+    parser.add_argument("--test-size", type=float, default=0.2)
+    parser.add_argument("--random-state", type=int, default=42)
+    parser.add_argument("--no-cache", action="store_true", help="Jalankan semua tahap tanpa cache")
+    parser.add_argument("--cache-dir", default=CACHE_DIR)
+    parser.add_argument("--reduce", choices=["enn", "cnn", "enn+cnn", "kmeans"],
+                        help="Perkecil set referensi KNN dengan reduksi prototipe (lihat prototype_reduction.py)")
+    parser.add_argument("--prototypes-per-class", type=int, default=50, help="Jumlah prototipe per karir untuk --reduce kmeans")
+    parser.add_argument("--reduce-tolerance", type=float, default=0.01,
+                        help="Penurunan akurasi maksimum (0.01 = 1 poin) sebelum model hasil reduksi ditolak")
+    parser.add_argument("--quantize", choices=["float16", "uint8"],
+                        help="Simpan matriks referensi knn_model.bin sebagai float16 atau kode uint8 (default: float32)")
+    parser.add_argument("--streaming", action="store_true",
+                        help="Mode out-of-core: scaler, split dan evaluasi per chunk (lihat train_streaming.py)")
+    parser.add_argument("--chunksize", type=int, default=1_000_000, help="Jumlah baris per chunk untuk --streaming")
+    parser.add_argument("--no-reports", action="store_true",
+                        help="Jangan buat gambar distribusi dan confusion matrix (retrain cepat untuk CI)")
+    parser.add_argument("--report-workers", type=int, default=1,
+                        help="Jumlah proses pembuat gambar yang berjalan bersamaan dengan training (0 = di proses utama)")
+    parser.add_argument("--ensemble", type=int, metavar="N",
+                        help="Latih ensemble bagging N anggota KNN dengan akurasi out-of-bag (lihat knn_ensemble.py)")
+    parser.add_argument("--max-features", type=int,
+                        help="Jumlah fitur acak per anggota --ensemble (default: semua fitur)")
+    parser.add_argument("--ensemble-workers", type=int, default=os.cpu_count() or 1,
+                        help="Jumlah proses paralel untuk anggota --ensemble (default: jumlah CPU)")
+    args = parser.parse_args(argv)
+    if args.ensemble is not None and args.ensemble < 1:
+        parser.error("--ensemble harus minimal 1")
+    if args.ensemble and (args.streaming or args.reduce):
+        parser.error("--ensemble belum bisa digabung dengan --streaming atau --reduce")
+    return args
+
+
+def train_version(args, extra=None, staging_dir=None):
+    """Run the pipeline for parsed CLI args and publish the result as a new (not yet promoted) version.
+
+    extra: additional manifest entries (see model_registry.publish). staging_dir: an
+    existing staging directory to export into (e.g. already holding the dataset);
+    a new one by default. Returns the version name.
+    """
+    # Export ke direktori staging; baru terlihat oleh app setelah publish (rename) dan promote (ganti CURRENT)
+    staging_dir = staging_dir or new_staging_dir(args.models_dir)
+    try:
+        if args.streaming:
+            from train_streaming import run_streaming
+            run_streaming(args.dataset, staging_dir, n_neighbors=args.n_neighbors, weights=args.weights,
+                          test_size=args.test_size, random_state=args.random_state, chunksize=args.chunksize,
+                          reduce=args.reduce, prototypes_per_class=args.prototypes_per_class,
+                          reduce_tolerance=args.reduce_tolerance, quantize=args.quantize,
+                          reports=not args.no_reports, report_workers=args.report_workers)
+        else:
+            run_pipeline(args.dataset, models_dir=staging_dir, n_neighbors=args.n_neighbors, weights=args.weights,
+                         test_size=args.test_size, random_state=args.random_state, cache_dir=args.cache_dir,
+                         use_cache=not args.no_cache, reduce=args.reduce, prototypes_per_class=args.prototypes_per_class,
+                         reduce_tolerance=args.reduce_tolerance, quantize=args.quantize,
+                         reports=not args.no_reports, report_workers=args.report_workers,
+                         ensemble=args.ensemble, max_features=args.max_features, ensemble_workers=args.ensemble_workers)
+        version = publish(staging_dir, args.models_dir, args.dataset,
+                          {name: getattr(args, name) for name in TRAINING_PARAMS}, extra=extra)
+    except BaseException:
+        shutil.rmtree(staging_dir, ignore_errors=True)
+        raise
+    return version
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    version = train_version(args)
+    print((SAVED_MESSAGE if not args.no_reports else SAVED_MESSAGE_NO_REPORTS).format(version=version))
+
+    if args.no_promote:
+        print(f"Versi belum aktif. Promosikan dengan: python model_registry.py promote {version}")
+        return
+    previous = promote(args.models_dir, version)
+    print(f"Versi aktif: {version} (sebelumnya {previous or '-'}; rollback: python model_registry.py rollback)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+"""Out-of-core training mode for train_knn_model.py (``--streaming``).
+
+Works on the memory-mapped columnar copy of the dataset (dataset_io.py) in
+fixed-size chunks instead of a DataFrame:
+
+1. ``StandardScaler.partial_fit`` over chunks, plus per-class row counts.
+2. Stratified split without shuffling the whole dataset: within each class,
+   rows are assigned to the test set by systematic sampling (a random offset
+   per class, then every ``1/test_size``-th row), so each class gets exactly
+   ``round(n_class * test_size)`` test rows and the state is a few counters.
+3. Scaled train and test rows are written to ``.npy`` memmaps in a work dir.
+4. The KNN index is fitted on the train memmap; test predictions are made per
+   chunk and only the confusion matrix is accumulated, from which the
+   accuracy and classification report are derived.
+
+Apart from the fitted KNN index (which, for KNN, is the training data) peak
+memory is bounded by ``chunksize``, not by the dataset size. The distribution
+plots of the in-memory pipeline are skipped in this mode. ``reduce`` applies
+the same prototype reduction as the in-memory pipeline to the train memmap.
+"""
+import os
+import shutil
+import time
+
+import numpy as np
+import pandas as pd
+
+from dataset_io import DATASET_CACHE_DIR, FEATURE_COLUMNS, open_dataset, to_frame
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+WORK_DIR = os.path.join(BASE_DIR, ".cache", "streaming")
+
+
+def _chunks(n_rows, chunksize):
+    for start in range(0, n_rows, chunksize):
+        yield start, min(start + chunksize, n_rows)
+
+
+def _feature_frame(dataset, start, stop):
+    # Scaler di-fit dengan nama kolom, sama seperti pipeline biasa (df[FEATURE_COLUMNS])
+    return pd.DataFrame(np.asarray(dataset.features[start:stop], dtype=np.float64), columns=FEATURE_COLUMNS)
+
+
+def fit_scaler(dataset, n_classes, chunksize):
+    """Incremental StandardScaler fit and per-class counts in one pass"""
+    from sklearn.preprocessing import StandardScaler
+
+    scaler = StandardScaler()
+    class_counts = np.zeros(n_classes, dtype=np.int64)
+    for start, stop in _chunks(len(dataset.labels), chunksize):
+        scaler.partial_fit(_feature_frame(dataset, start, stop))
+        class_counts += np.bincount(dataset.labels[start:stop], minlength=n_classes)
+    return scaler, class_counts
+
+
+class StratifiedSplitter:
+    """Streaming stratified split: exact per-class test quota, O(n_classes) state"""
+
+    def __init__(self, class_counts, test_size, random_state):
+        rng = np.random.default_rng(random_state)
+        self.class_counts = class_counts
+        self.test_counts = np.rint(class_counts * test_size).astype(np.int64)
+        self.offsets = rng.random(len(class_counts)) # Offset acak per kelas untuk sampling sistematis
+        self.seen = np.zeros(len(class_counts), dtype=np.int64)
+
+    def is_test(self, labels):
+        """Boolean test mask for the next chunk of labels (call in file order)"""
+        labels = np.asarray(labels, dtype=np.intp)
+        mask = np.empty(len(labels), dtype=bool)
+        for c in np.unique(labels):
+            rows = np.flatnonzero(labels == c)
+            position = self.seen[c] + np.arange(len(rows))
+            # Baris ke-p masuk test jika floor((p + 1 + u) * t / n) naik dibanding floor((p + u) * t / n)
+            rate = self.test_counts[c] / max(self.class_counts[c], 1)
+            mask[rows] = np.floor((position + 1 + self.offsets[c]) * rate) > np.floor((position + self.offsets[c]) * rate)
+            self.seen[c] += len(rows)
+        return mask
+
+
+def split_to_memmaps(dataset, scaler, splitter, work_dir, chunksize):
+    """Write scaled train/test rows and labels to .npy memmaps; returns (X_train, X_test, y_train, y_test)"""
+    n_test = int(splitter.test_counts.sum())
+    n_train = len(dataset.labels) - n_test
+    n_features = len(FEATURE_COLUMNS)
+    open_memmap = np.lib.format.open_memmap
+    X_train = open_memmap(os.path.join(work_dir, "X_train.npy"), mode="w+", dtype=np.float32, shape=(n_train, n_features))
+    X_test = open_memmap(os.path.join(work_dir, "X_test.npy"), mode="w+", dtype=np.float32, shape=(n_test, n_features))
+    y_train = open_memmap(os.path.join(work_dir, "y_train.npy"), mode="w+", dtype=np.int32, shape=(n_train,))
+    y_test = open_memmap(os.path.join(work_dir, "y_test.npy"), mode="w+", dtype=np.int32, shape=(n_test,))
+
+    i_train = i_test = 0
+    for start, stop in _chunks(len(dataset.labels), chunksize):
+        labels = np.asarray(dataset.labels[start:stop])
+        scaled = scaler.transform(_feature_frame(dataset, start, stop))
+        test = splitter.is_test(labels)
+        n_chunk_test = int(test.sum())
+        X_test[i_test:i_test + n_chunk_test] = scaled[test]
+        y_test[i_test:i_test + n_chunk_test] = labels[test]
+        X_train[i_train:i_train + len(test) - n_chunk_test] = scaled[~test]
+        y_train[i_train:i_train + len(test) - n_chunk_test] = labels[~test]
+        i_test += n_chunk_test
+        i_train += len(test) - n_chunk_test
+    for array in (X_train, X_test, y_train, y_test):
+        array.flush()
+    return X_train, X_test, y_train, y_test
+
+
+def evaluate_streaming(knn, X_test, y_test, n_classes, chunksize):
+    """Confusion matrix accumulated over test chunks"""
+    confusion = np.zeros((n_classes, n_classes), dtype=np.int64)
+    for start, stop in _chunks(len(y_test), chunksize):
+        y_pred = knn.predict(X_test[start:stop])
+        confusion += np.bincount(np.asarray(y_test[start:stop]) * n_classes + y_pred,
+                                 minlength=n_classes * n_classes).reshape(n_classes, n_classes)
+    return confusion
+
+
+def report_from_confusion(confusion, target_names, digits=2):
+    """classification_report text (same layout as sklearn) computed from a confusion matrix"""
+    from sklearn.metrics import classification_report
+
+    true, pred = np.indices(confusion.shape)
+    report = classification_report(true.ravel(), pred.ravel(), labels=np.arange(len(target_names)),
+                                   target_names=target_names, sample_weight=confusion.ravel(),
+                                   output_dict=True, zero_division=0)
+    headers = ["precision", "recall", "f1-score", "support"]
+    width = max(max(len(name) for name in target_names), len("weighted avg"), digits)
+    row_fmt = "{:>{width}s} " + " {:>9.{digits}f}" * 3 + " {:>9}\n"
+    lines = [("{:>{width}s} " + " {:>9}" * len(headers) + "\n\n").format("", *headers, width=width)]
+    for name in target_names:
+        r = report[name]
+        lines.append(row_fmt.format(name, r["precision"], r["recall"], r["f1-score"], int(round(r["support"])),
+                                    width=width, digits=digits))
+    total = int(confusion.sum())
+    lines.append("\n")
+    lines.append(("{:>{width}s} " + " {:>9}" * 2 + " {:>9.{digits}f} {:>9}\n").format(
+        "accuracy", "", "", report["accuracy"], total, width=width, digits=digits))
+    for average in ("macro avg", "weighted avg"):
+        r = report[average]
+        lines.append(row_fmt.format(average, r["precision"], r["recall"], r["f1-score"], total,
+                                    width=width, digits=digits))
+    return "".join(lines)
+
+
+def run_streaming(dataset_path, models_dir, n_neighbors=5, weights='distance', test_size=0.2, random_state=42,
+                  chunksize=1_000_000, work_dir=WORK_DIR, reduce=None, prototypes_per_class=50, reduce_tolerance=0.01,
+                  quantize=None, reports=True, report_workers=1):
+    """Train, evaluate and export the model with memory bounded by chunksize (plus the KNN index)"""
+    from sklearn.neighbors import KNeighborsClassifier
+    from sklearn.preprocessing import LabelEncoder
+
+    from train_knn_model import (ReportRenderer, evaluate_served, export_model, plot_confusion_matrix,
+                                 reduce_prototypes, reduction_summary)
+
+    start = time.perf_counter()
+    dataset = open_dataset(dataset_path, DATASET_CACHE_DIR, chunksize)
+    n_classes = len(dataset.classes)
+    le = LabelEncoder().fit(dataset.classes) # Kelas di cache sudah urut alfabet, sama dengan kode label
+
+    scaler, class_counts = fit_scaler(dataset, n_classes, chunksize)
+    print(f"Scaler di-fit bertahap pada {len(dataset.labels):,} baris "
+          f"({', '.join(f'{c}: {n:,}' for c, n in zip(dataset.classes, class_counts))})")
+
+    run_dir = os.path.join(work_dir, f"{dataset.source_hash[:16]}-{os.getpid()}")
+    os.makedirs(run_dir, exist_ok=True)
+    try:
+        # Keluar dari blok with menunggu gambar selesai dirender
+        with ReportRenderer(report_workers) as renderer:
+            splitter = StratifiedSplitter(class_counts, test_size, random_state)
+            X_train, X_test, y_train, y_test = split_to_memmaps(dataset, scaler, splitter, run_dir, chunksize)
+            print(f"X_train_scaled shape: {X_train.shape}")
+            print(f"X_test_scaled shape: {X_test.shape}")
+
+            def fit_and_evaluate(X_ref, y_ref):
+                knn = KNeighborsClassifier(n_neighbors=n_neighbors, weights=weights).fit(X_ref, y_ref)
+                confusion = evaluate_streaming(knn, X_test, y_test, n_classes, chunksize)
+                return knn, {
+                    "accuracy": np.trace(confusion) / max(confusion.sum(), 1),
+                    "report": report_from_confusion(confusion, list(le.classes_)),
+                    "confusion_matrix": confusion,
+                }
+
+            knn, evaluation = fit_and_evaluate(X_train, y_train)
+            print(f"\nAkurasi: {evaluation['accuracy']*100:.2f}%")
+
+            if reduce:
+                split = (X_train, X_test, y_train, y_test)
+                reduced = reduce_prototypes(split, reduce, prototypes_per_class, random_state)
+                evaluation_full = evaluation
+                knn, evaluation = fit_and_evaluate(reduced[0], reduced[2])
+                summary = reduction_summary(reduce, split, reduced, evaluation_full, evaluation, reduce_tolerance)
+                evaluation["reduction"] = summary
+                X_train, y_train = reduced[0], reduced[2]
+
+            if quantize:
+                # Metrik versi = artifact terkuantisasi yang dilayani, bukan model float
+                evaluation = evaluate_served(knn, (X_train, X_test, y_train, y_test), (le, None), (scaler, None),
+                                             evaluation, quantize, chunksize)
+                print(f"Akurasi artifact {quantize}: {evaluation['accuracy']*100:.2f}%")
+
+            if reports:
+                # Gambar confusion matrix dirender di proses lain selama export berjalan
+                plot_confusion_matrix(evaluation, (le, None), models_dir, renderer)
+            # Paritas engine dicek pada sampel kecil dari awal dataset (export_model membatasi jumlah baris)
+            sample = to_frame(dataset, 0, min(len(dataset.labels), 5000))
+            export_model(knn, (le, None), (scaler, None), (X_train, X_test, y_train, y_test), evaluation, sample, models_dir,
+                         quantize=quantize)
+    finally:
+        shutil.rmtree(run_dir, ignore_errors=True)
+    print(f"Training streaming selesai dalam {time.perf_counter() - start:.2f} detik")
+    return knn, evaluation
@@ -0,0 +1,308 @@
+"""Incremental update of the active model with newly labelled assessments.
+
+A KNN model is its scaler plus its reference rows, so new labelled rows
+(four scores + career) can be scaled with the ``scaler.joblib`` of the active
+version and appended to its reference set without re-running the training
+pipeline. The result is published as a new version (model_registry.py) whose
+manifest records its parent, the rows added and how many rows are pending a
+full refit. The appended rows are kept in ``pending_rows.csv`` of each version
+(carried forward from the parent), so a later full refit can include them.
+
+The scaler is not refitted on appended rows. Every update merges the
+statistics of all pending rows with the scaler's own (row count, mean,
+variance) and measures per feature how far the mean moves and how much the
+standard deviation changes, both relative to the current standard deviation.
+When the largest change exceeds ``--drift-threshold`` (or with
+``--full-refit``), the base dataset and the pending rows are written to
+``refit_dataset.csv`` inside the new version and the full train_knn_model.py
+pipeline is run on it with the parameters of the active version; the file is
+part of that version's manifest and is removed with it by ``gc``. New and
+pending rows must have finite scores in 0..100 before they are used.
+
+An incremental version keeps the test metrics of the version they were
+measured on (``evaluated_on`` in model_evaluation.json); a full refit measures
+them again. Ensemble members take each new row with the inclusion rate of a
+bootstrap sample.
+
+Contoh:
+    python update_model.py data/penilaian_baru.csv
+    python update_model.py data/penilaian_baru.csv --drift-threshold 0.05 --no-promote
+    python update_model.py data/penilaian_baru.csv --full-refit --no-reports
+"""
+import argparse
+import json
+import os
+import shutil
+import time
+
+import numpy as np
+import pandas as pd
+
+from dataset_io import FEATURE_COLUMNS, LABEL_COLUMN, read_chunks
+from model_artifact import SCORE_RANGE
+from model_loader import ARTIFACT_FILE, EVALUATION_FILE, MODELS_DIR
+from model_registry import (_sha256, current_version, load_manifest, new_staging_dir, promote, publish,
+                            version_dir)
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+PENDING_FILE = "pending_rows.csv"
+REFIT_DATASET_FILE = "refit_dataset.csv"
+DRIFT_THRESHOLD = 0.1
+# Peluang sebuah baris masuk sampel bootstrap (baris unik): 1 - (1 - 1/n)^n -> 1 - 1/e
+BOOTSTRAP_INCLUSION = 1 - np.exp(-1)
+# File versi induk yang disalin apa adanya ke versi inkremental
+COPIED_FILES = ("label_encoder.joblib", "scaler.joblib", "confusion_matrix.png")
+
+
+def _scores(frame, path):
+    """float64 scores of frame; ValueError with the data row numbers unless all are finite and in SCORE_RANGE"""
+    X = frame[FEATURE_COLUMNS].apply(pd.to_numeric, errors="coerce").to_numpy(dtype=np.float64, copy=True)
+    low, high = SCORE_RANGE
+    with np.errstate(invalid="ignore"):
+        bad = np.flatnonzero((~np.isfinite(X) | (X < low) | (X > high)).any(axis=1))
+    if len(bad):
+        shown = ", ".join(map(str, bad[:10] + 1)) + (", ..." if len(bad) > 10 else "")
+        raise ValueError(f"{path}: {len(bad)} baris dengan skor bukan angka {low:g}..{high:g} (baris data ke-{shown})")
+    return X
+
+
+def read_rows(path, classes):
+    """New labelled rows as (float64 scores in training order, career labels); unknown careers are an error"""
+    frame = pd.concat(list(read_chunks(path)), ignore_index=True)
+    n_null = int(frame.isna().sum().sum())
+    if n_null:
+        raise ValueError(f"{path} berisi {n_null} nilai kosong pada kolom fitur/label")
+    unknown = sorted(set(frame[LABEL_COLUMN].astype(str)) - set(classes))
+    if unknown:
+        raise ValueError(f"Karir baru tidak dikenal model: {', '.join(unknown)}; jalankan train_knn_model.py penuh")
+    return _scores(frame, path), frame[LABEL_COLUMN].astype(str).to_numpy()
+
+
+def read_pending(path):
+    """Rows appended since the last full refit (empty for a version straight from training)"""
+    if not os.path.exists(path):
+        return np.empty((0, len(FEATURE_COLUMNS))), np.empty(0, dtype=object)
+    frame = pd.read_csv(path)
+    return _scores(frame, path), frame[LABEL_COLUMN].astype(str).to_numpy()
+
+
+def scaler_drift(scaler, X_pending):
+    """Per-feature drift of the scaler statistics if the pending rows were included in its fit.
+
+    mean_shift: |merged mean - scaler mean| / scaler std; std_change: |merged std / scaler std - 1|.
+    """
+    n0 = np.broadcast_to(np.asarray(scaler.n_samples_seen_, dtype=np.float64), scaler.mean_.shape)
+    n1 = len(X_pending)
+    if n1 == 0:
+        mean, var = scaler.mean_, scaler.var_
+    else:
+        m1, v1 = X_pending.mean(axis=0), X_pending.var(axis=0)
+        n = n0 + n1
+        mean = (n0 * scaler.mean_ + n1 * m1) / n
+        var = (n0 * (scaler.var_ + (scaler.mean_ - mean) ** 2) + n1 * (v1 + (m1 - mean) ** 2)) / n
+    mean_shift = np.abs(mean - scaler.mean_) / scaler.scale_
+    std_change = np.abs(np.sqrt(var) / scaler.scale_ - 1)
+    return {
+        "max": float(max(mean_shift.max(), std_change.max())),
+        "features": {name: {"mean_shift": float(shift), "std_change": float(change)}
+                     for name, shift, change in zip(FEATURE_COLUMNS, mean_shift, std_change)},
+    }
+
+
+def _append_members(artifact, knn, n_old, n_new, random_state):
+    """Ensemble: member row indices extended with a bootstrap-like share of the new rows"""
+    from knn_ensemble import KNNEnsemble
+
+    if artifact.member_offsets is None:
+        return None, None
+    rng = np.random.default_rng([random_state, n_old]) # Deterministik per ukuran set referensi
+    rows = []
+    for m in range(len(artifact.member_offsets) - 1):
+        old = np.asarray(artifact.member_rows[artifact.member_offsets[m]:artifact.member_offsets[m + 1]])
+        new = n_old + np.flatnonzero(rng.random(n_new) < BOOTSTRAP_INCLUSION)
+        rows.append(np.concatenate([old, new]))
+    ensemble = KNNEnsemble(knn.members, rows, knn.features, knn.n_neighbors, knn.weights, knn.n_classes)
+    return list(zip(rows, knn.features)), ensemble
+
+
+def append_version(parent_dir, staging_dir, X_new, labels_new, update, random_state=42):
+    """Write the parent model plus the new rows as a complete model directory in staging_dir"""
+    import joblib
+    from sklearn.neighbors import KNeighborsClassifier
+
+    from model_artifact import dequantize, open_artifact, write_artifact
+    from prediction_table import TABLE_FILE, build_table, save_table
+    from train_knn_model import index_order_predict_proba
+
+    artifact = open_artifact(os.path.join(parent_dir, ARTIFACT_FILE), verify=True)
+    scaler = joblib.load(os.path.join(parent_dir, "scaler.joblib"))
+    le = joblib.load(os.path.join(parent_dir, "label_encoder.joblib"))
+    knn = joblib.load(os.path.join(parent_dir, "knn_model.joblib"))
+
+    # Baris baru di-scale dengan scaler versi induk (tanpa fit ulang), lalu ditambahkan ke set referensi
+    X_new_scaled = scaler.transform(pd.DataFrame(X_new, columns=FEATURE_COLUMNS))
+    n_old = len(artifact.y_ref)
+    X_ref = np.concatenate([dequantize(artifact), X_new_scaled])
+    y_ref = np.concatenate([np.asarray(artifact.y_ref), le.transform(labels_new)])
+
+    members, ensemble = _append_members(artifact, knn, n_old, len(y_ref) - n_old, random_state)
+    quantization = artifact.header.get("quantization")
+    artifact_path = os.path.join(staging_dir, ARTIFACT_FILE)
+    header = write_artifact(
+        artifact_path, scaler.mean_, scaler.scale_, X_ref, y_ref, le.classes_,
+        quantize=quantization["dtype"] if quantization else None, members=members, **artifact.header["params"],
+    )
+    # Model joblib di-fit pada referensi yang tersimpan di artifact, agar sama dengan yang dipakai knn_engine
+    artifact = open_artifact(artifact_path, verify=True)
+    X_stored = dequantize(artifact)
+    if ensemble is not None:
+        knn = ensemble.refit(X_stored, y_ref)
+    else:
+        knn = KNeighborsClassifier(n_neighbors=knn.n_neighbors, weights=knn.weights).fit(X_stored, y_ref)
+    joblib.dump(knn, os.path.join(staging_dir, "knn_model.joblib"))
+    for name in COPIED_FILES:
+        if os.path.exists(os.path.join(parent_dir, name)):
+            shutil.copy2(os.path.join(parent_dir, name), os.path.join(staging_dir, name))
+    # Tabel lewat KD-tree model joblib (aturan seri knn_engine), bukan brute-force atas seluruh referensi
+    save_table(build_table(artifact, lambda X: index_order_predict_proba(knn, X, y_ref, len(le.classes_))),
+               os.path.join(staging_dir, TABLE_FILE))
+
+    # Evaluasi induk dibawa, ditandai versi tempat metrik test diukur
+    with open(os.path.join(parent_dir, EVALUATION_FILE), encoding="utf-8") as f:
+        evaluation = json.load(f)
+    evaluation["evaluated_on"] = evaluation.get("evaluated_on") or evaluation["model_version"]
+    evaluation["model_version"] = header["sha256"][:12]
+    evaluation["params"]["n_train"] = len(y_ref)
+    evaluation["update"] = update
+    with open(os.path.join(staging_dir, EVALUATION_FILE), "w", encoding="utf-8") as f:
+        json.dump(evaluation, f, indent=2, ensure_ascii=False)
+    detailed = os.path.join(parent_dir, "model_evaluation_detailed.txt")
+    if os.path.exists(detailed):
+        with open(detailed, encoding="utf-8") as f:
+            text = f.read()
+        text += (f"\n\nUpdate Inkremental:\n\n"
+                 f"{update['rows_added']} baris ditambahkan ke set referensi ({len(y_ref)} baris), "
+                 f"{update['pending_refit_rows']} baris menunggu refit penuh (drift scaler {update['drift']['max']:.3f}). "
+                 f"Metrik test di atas diukur pada versi model {evaluation['evaluated_on']}.")
+        with open(os.path.join(staging_dir, "model_evaluation_detailed.txt"), "w", encoding="utf-8") as f:
+            f.write(text)
+
+
+def write_refit_dataset(base_path, X_pending, labels_pending, out_dir):
+    """Base dataset followed by the pending rows, as refit_dataset.csv in out_dir; returns its path"""
+    path = os.path.join(out_dir, REFIT_DATASET_FILE)
+    tmp_path = f"{path}.tmp"
+    header = True
+    for chunk in read_chunks(base_path):
+        chunk[FEATURE_COLUMNS + [LABEL_COLUMN]].to_csv(tmp_path, mode="w" if header else "a", header=header, index=False)
+        header = False
+    pending = pd.DataFrame(X_pending, columns=FEATURE_COLUMNS)
+    pending[LABEL_COLUMN] = labels_pending
+    pending.to_csv(tmp_path, mode="w" if header else "a", header=header, index=False)
+    os.replace(tmp_path, path)
+    return path
+
+
+def _training_argv(params):
+    """train_knn_model.py arguments reproducing the recorded training params"""
+    argv = []
+    for name, value in params.items():
+        if value is None or value is False:
+            continue
+        flag = "--" + name.replace("_", "-")
+        argv += [flag] if value is True else [flag, str(value)]
+    return argv
+
+
+def update(rows_path, models_dir=MODELS_DIR, drift_threshold=DRIFT_THRESHOLD, full_refit=False, reports=True):
+    """Publish a new version with the rows of rows_path added; returns (version, update record)"""
+    import joblib
+
+    parent = current_version(models_dir)
+    if parent is None:
+        raise FileNotFoundError("Belum ada versi model aktif di registry; jalankan train_knn_model.py terlebih dahulu")
+    parent_dir = version_dir(models_dir, parent)
+    manifest = load_manifest(models_dir, parent)
+    scaler = joblib.load(os.path.join(parent_dir, "scaler.joblib"))
+    le = joblib.load(os.path.join(parent_dir, "label_encoder.joblib"))
+
+    X_new, labels_new = read_rows(rows_path, [str(c) for c in le.classes_])
+    X_old, labels_old = read_pending(os.path.join(parent_dir, PENDING_FILE))
+    X_pending = np.concatenate([X_old, X_new])
+    labels_pending = np.concatenate([labels_old, labels_new])
+    drift = scaler_drift(scaler, X_pending)
+    record = {
+        "parent": parent,
+        "source": {"path": os.path.abspath(rows_path), "sha256": _sha256(rows_path)},
+        "rows_added": len(X_new),
+        "drift": drift,
+        "drift_threshold": drift_threshold,
+    }
+
+    if full_refit or drift["max"] > drift_threshold:
+        import train_knn_model
+
+        record.update(type="full_refit", reason="diminta" if full_refit else "drift", pending_refit_rows=0)
+        # Dataset refit ditulis di dalam versi baru: ikut manifest, ikut terhapus oleh gc
+        staging_dir = new_staging_dir(models_dir)
+        try:
+            dataset_path = write_refit_dataset(manifest["dataset"]["path"], X_pending, labels_pending, staging_dir)
+        except BaseException:
+            shutil.rmtree(staging_dir, ignore_errors=True)
+            raise
+        args = train_knn_model.parse_args(["--dataset", dataset_path, "--models-dir", models_dir]
+                                          + _training_argv(manifest["params"]) + ([] if reports else ["--no-reports"]))
+        return train_knn_model.train_version(args, extra={"update": record}, staging_dir=staging_dir), record
+
+    record.update(type="incremental", pending_refit_rows=len(X_pending))
+    staging_dir = new_staging_dir(models_dir)
+    try:
+        append_version(parent_dir, staging_dir, X_new, labels_new, record, manifest["params"].get("random_state") or 42)
+        pending = pd.DataFrame(X_pending, columns=FEATURE_COLUMNS)
+        pending[LABEL_COLUMN] = labels_pending
+        pending.to_csv(os.path.join(staging_dir, PENDING_FILE), index=False)
+        # Dataset dasar tetap milik induk (tidak di-hash ulang); baris tambahan ada di pending_rows.csv
+        version = publish(staging_dir, models_dir, params=manifest["params"],
+                          extra={"dataset": manifest["dataset"], "update": record})
+    except BaseException:
+        shutil.rmtree(staging_dir, ignore_errors=True)
+        raise
+    return version, record
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Tambahkan data berlabel baru ke model aktif tanpa training ulang penuh")
+    parser.add_argument("rows", help="File CSV/Parquet berisi tech_score, soft_score, sjt_score, personality_score, career")
+    parser.add_argument("--models-dir", default=MODELS_DIR, help="Folder registry model (default: models/)")
+    parser.add_argument("--drift-threshold", type=float, default=DRIFT_THRESHOLD,
+                        help="Perubahan mean/std fitur maksimum (dalam satuan std scaler) sebelum refit penuh "
+                             f"(default: {DRIFT_THRESHOLD})")
+    parser.add_argument("--full-refit", action="store_true", help="Selalu jalankan training penuh dengan semua baris")
+    parser.add_argument("--no-reports", action="store_true", help="Tanpa gambar saat refit penuh")
+    parser.add_argument("--no-promote", action="store_true", help="Simpan versi baru tanpa menjadikannya versi aktif")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    try:
+        version, record = update(args.rows, args.models_dir, args.drift_threshold, args.full_refit, not args.no_reports)
+    except (FileNotFoundError, ValueError) as e:
+        parser.exit(1, f"Gagal: {e}\n")
+    drifted = max(record["drift"]["features"].items(), key=lambda item: max(item[1].values()))
+    print(f"{record['rows_added']} baris baru, drift scaler maks {record['drift']['max']:.3f} ({drifted[0]}, "
+          f"ambang {args.drift_threshold})")
+    if record["type"] == "incremental":
+        print(f"Versi inkremental {version}: {record['pending_refit_rows']} baris menunggu refit penuh")
+    else:
+        dataset_path = load_manifest(args.models_dir, version)["dataset"]["path"]
+        print(f"Refit penuh ({record['reason']}) dengan dataset {os.path.relpath(dataset_path, BASE_DIR)}: versi {version}")
+    if args.no_promote:
+        print(f"Versi belum aktif. Promosikan dengan: python model_registry.py promote {version}")
+    else:
+        promote(args.models_dir, version)
+        print(f"Versi aktif: {version} (rollback: python model_registry.py rollback)")
+    print(f"Selesai dalam {time.perf_counter() - start:.2f} detik")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Bounded, process-wide caches for the views of the results page.
+
+Streamlit re-runs ``display_results`` on every interaction, but its radar
+chart only depends on the four quiz scores and the evaluation view only on
+the evaluation file written by train_knn_model.py. Both are memoized here
+with ``functools.lru_cache`` (shared by every session of the server process):
+
+- the radar chart ``go.Figure``, keyed by the scores rounded to one decimal
+  (the precision shown on the page);
+- the evaluation content, keyed by path, mtime and size of the file, so a
+  newly promoted version is picked up and old entries age out of the LRU.
+"""
+import json
+import os
+from functools import lru_cache
+
+from model_loader import EVALUATION_FILE, MODELS_DIR
+from model_registry import resolve_models_dir
+
+RADAR_CATEGORIES = ('SJT', 'Personality', 'Technical', 'Soft Skills')
+RADAR_CACHE_SIZE = 1024
+EVALUATION_CACHE_SIZE = 8
+
+# Evaluasi teks dari training lama (sebelum ada model_evaluation.json)
+LEGACY_EVALUATION_FILE = "model_evaluation_detailed.txt"
+
+
+@lru_cache(maxsize=RADAR_CACHE_SIZE)
+def _radar_figure(values):
+    import plotly.graph_objects as go
+
+    fig = go.Figure()
+    fig.add_trace(go.Scatterpolar(
+        r=list(values),
+        theta=list(RADAR_CATEGORIES),
+        fill='toself',
+        name='Your Profile',
+        line=dict(color='#667eea')
+    ))
+    fig.update_layout(
+        polar=dict(
+            radialaxis=dict(
+                visible=True,
+                range=[0, 100]
+            )),
+        showlegend=True,
+        title="Profil Kompetensi Anda",
+        height=400
+    )
+    return fig
+
+
+def radar_figure(sjt_score, personality_score, tech_score, soft_score):
+    """Cached radar chart of the four scores (shared object: do not modify it)"""
+    return _radar_figure(tuple(round(float(score), 1)
+                               for score in (sjt_score, personality_score, tech_score, soft_score)))
+
+
+@lru_cache(maxsize=EVALUATION_CACHE_SIZE)
+def _read_evaluation(path, mtime_ns, size):
+    with open(path, "r", encoding="utf-8") as f:
+        if path.endswith(".json"):
+            return json.load(f)
+        return {"text": f.read()}
+
+
+def load_evaluation(models_dir=MODELS_DIR):
+    """Evaluation written by train_knn_model.py: the JSON dict, or {"text": ...} for an old text-only model.
+
+    Raises FileNotFoundError when neither file exists.
+    """
+    models_dir = resolve_models_dir(models_dir)
+    for name in (EVALUATION_FILE, LEGACY_EVALUATION_FILE):
+        path = os.path.join(models_dir, name)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            continue
+        return _read_evaluation(path, stat.st_mtime_ns, stat.st_size)
+    raise FileNotFoundError(os.path.join(models_dir, EVALUATION_FILE))
+
+
+def clear_cache():
+    """Drop every cached figure and evaluation"""
+    _radar_figure.cache_clear()
+    _read_evaluation.cache_clear()